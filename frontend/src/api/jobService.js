@@ -31,6 +31,35 @@ export const getAllJobData = async (params = {}) => {
   }
 };
 
+// 获取所有招聘数据的列式编码（体积更小，适合批量分析）
+export const getAllJobDataColumnar = async (params = {}) => {
+  try {
+    const response = await api.get('job_postings/all_data/', { params: { ...params, format: 'columnar' } });
+    return response.data;
+  } catch (error) {
+    console.error('获取列式招聘数据失败:', error);
+    throw error;
+  }
+};
+
+// 将列式数据中的字典编码字段还原为取值数组
+export const decodeColumn = (data, field) => {
+  const column = data.columns[field];
+  const dictionary = data.dictionaries[field];
+  return dictionary ? column.map(code => dictionary[code]) : column;
+};
+
+// 获取招聘数据统计分布（由后端聚合，用于数据分析）
+export const getJobStats = async (params = {}) => {
+  try {
+    const response = await api.get('job_postings/stats/', { params });
+    return response.data;
+  } catch (error) {
+    console.error('获取招聘统计数据失败:', error);
+    throw error;
+  }
+};
+
 // 获取单个招聘详情
 export const getJobDetail = async (id) => {
   try {
@@ -53,6 +82,17 @@ export const predictSalary = async (jobInfo) => {
   }
 };
 
+// 批量预测薪资（结果按输入顺序返回）
+export const predictSalaryBatch = async (jobInfos) => {
+  try {
+    const response = await api.post('job_postings/predict_salary_batch/', jobInfos);
+    return response.data;
+  } catch (error) {
+    console.error('批量薪资预测失败:', error);
+    throw error;
+  }
+};
+
 export default {
   getJobList,
   getJobDetail,
@@ -0,0 +1,24 @@
+"""
+gunicorn部署配置
+使用方式：gunicorn -c gunicorn.conf.py recruitment_system.wsgi
+
+preload_app为True时，主进程在fork工作进程之前导入wsgi.py并预热模型：
+随机森林的节点数组以内存映射方式加载，工作进程继承映射后直接共享同一份物理内存
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = 60
+
+# 在fork之前加载应用和模型
+preload_app = True
+
+
+def post_fork(server, worker):
+    """工作进程启动后重置从主进程继承的模型锁并重新检查模型版本，主进程加载之后发布的新版本会被后台加载"""
+    from job_app.warmup import reset_after_fork
+
+    reset_after_fork()
@@ -0,0 +1,30 @@
+"""
+gunicorn ASGI部署配置（uvicorn工作进程）
+使用方式：gunicorn -c gunicorn_asgi.conf.py recruitment_system.asgi:application
+
+每个工作进程运行一个事件循环，/api/async/下的异步接口等待数据库、等待慢速客户端接收数据时不占用线程，
+一个进程可以同时保持数千个连接；同步的DRF接口仍可使用，Django在线程中执行它们。
+preload_app与WSGI配置（gunicorn.conf.py）相同：主进程预热模型后再fork，工作进程共享随机森林的内存映射
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+# 事件循环不需要按连接数增加进程，进程数与CPU核数相同即可
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+worker_class = 'uvicorn.workers.UvicornWorker'
+timeout = 60
+# 保持空闲的长连接（秒），长连接在事件循环中只占用很少的内存
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+# 等待accept的连接队列长度
+backlog = int(os.environ.get('GUNICORN_BACKLOG', 4096))
+
+# 在fork之前加载应用和模型
+preload_app = True
+
+
+def post_fork(server, worker):
+    """工作进程启动后重置从主进程继承的模型锁并重新检查模型版本，主进程加载之后发布的新版本会被后台加载"""
+    from job_app.warmup import reset_after_fork
+
+    reset_after_fork()
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class JobAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'job_app'
+
+    def ready(self):
+        # 注册信号处理函数
+        from . import signals  # noqa: F401
+        # 注册系统检查
+        from . import checks  # noqa: F401
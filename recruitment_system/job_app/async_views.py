@@ -0,0 +1,271 @@
+"""
+异步（ASGI）接口
+/api/async/job_postings/下的列表、详情、全量数据和薪资预测接口，输出与同名的同步接口相同。
+查询通过Django的异步ORM执行，全量数据的NDJSON流式输出逐块异步读取，慢速客户端接收数据期间不占用工作线程；
+过滤条件解析（技能索引、取值字典）、分页总数、分面统计等仍是同步代码，在有界的查询线程池中执行
+（sync_to_async的thread_sensitive=False，并发请求不在同一个线程中排队）；
+薪资预测在有界线程池中执行，正在执行和排队的预测数达到上限时直接返回503，不无限排队；
+认证、权限和限流使用JobPostingViewSet的配置，与同步接口执行相同的检查
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import close_old_connections
+from django.http import Http404, HttpResponse
+from django.shortcuts import aget_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST, require_safe
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .cache import result_cache
+from .columnar import encode_columnar
+from .facets import compute_facets
+from .metrics import phase
+from .read_plan import DEFAULT_CHUNK_SIZE, ReadPlan
+from .renderers import COLUMNAR_RENDERERS, FastJSONRenderer, NDJSONRenderer
+from .streaming import aplan_chunks, aserialized_chunks, stream_ndjson
+from .views import JobPostingViewSet, predict_job_salary
+
+
+class Overloaded(Exception):
+    """有界线程池的任务数已达上限"""
+
+
+class BoundedExecutor:
+    """线程数和任务数（正在执行和排队的）都有上限的线程池，任务数达到上限时run抛出Overloaded"""
+
+    def __init__(self, max_workers, max_pending, thread_name_prefix=''):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._slots = threading.BoundedSemaphore(max(max_pending, max_workers))
+
+    async def run(self, func, *args):
+        """在线程池中执行func(*args)并等待结果，当前请求的contextvars（如各阶段耗时）随任务传入线程"""
+        if not self._slots.acquire(blocking=False):
+            raise Overloaded()
+        try:
+            future = self._executor.submit(contextvars.copy_context().run, func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # 任务结束时才释放名额（而不是等待的协程被取消时），客户端断开不会使实际执行的任务超过上限
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+
+_inference_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_inference_executor():
+    """执行薪资预测的有界线程池（每个进程一个）"""
+    global _inference_executor
+    with _executor_lock:
+        if _inference_executor is None:
+            _inference_executor = BoundedExecutor(
+                getattr(settings, 'SALARY_PREDICTION_WORKERS', 4),
+                getattr(settings, 'SALARY_PREDICTION_MAX_PENDING', 64),
+                thread_name_prefix='salary-prediction',
+            )
+        return _inference_executor
+
+
+_query_executor = None
+
+
+def get_query_executor():
+    """执行同步查询代码的线程池（每个进程一个）"""
+    global _query_executor
+    with _executor_lock:
+        if _query_executor is None:
+            _query_executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'JOB_ASYNC_QUERY_WORKERS', 16), thread_name_prefix='job-query',
+            )
+        return _query_executor
+
+
+def in_thread(func):
+    """
+    将只读的同步函数（查询、编码）转换为在查询线程池中执行的协程函数
+    线程池的线程收不到request_finished信号，执行完毕后自行关闭过期的数据库连接（CONN_MAX_AGE为0时立即关闭）
+    """
+    def call(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(call, thread_sensitive=False, executor=get_query_executor())
+
+
+def render(view, data, status=200):
+    """按内容协商选定的渲染器输出响应，与DRF Response的渲染结果相同"""
+    request = view.request
+    renderer = request.accepted_renderer
+    content = renderer.render(data, request.accepted_media_type, {'view': view, 'request': request})
+    content_type = f'{renderer.media_type}; charset={renderer.charset}' if renderer.charset else renderer.media_type
+    return HttpResponse(content, status=status, content_type=content_type)
+
+
+def check_request(view):
+    """与DRF的APIView.initial()相同的认证、权限和限流检查（认证可能查询会话和用户）"""
+    view.perform_authentication(view.request)
+    view.check_permissions(view.request)
+    view.check_throttles(view.request)
+
+
+def job_view(action, renderer_classes):
+    """
+    异步视图装饰器：构造处理本次请求的JobPostingViewSet（复用过滤、稀疏字段集、分页和字段计划），
+    完成内容协商以及与同步接口相同的认证、权限、限流检查，被装饰的协程函数接收视图集实例；
+    异常由视图集的handle_exception处理（DRF异常、Http404转换为相同的错误响应，认证失败时带有WWW-Authenticate等响应头）
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(request, **kwargs):
+            view = JobPostingViewSet(action=action, args=(), kwargs=kwargs, format_kwarg=None, headers={})
+            view.request = Request(
+                request,
+                parsers=view.get_parsers(),
+                authenticators=view.get_authenticators(),
+                negotiator=view.get_content_negotiator(),
+            )
+            renderers = [renderer_class() for renderer_class in renderer_classes]
+            # 与DRF相同，协商失败时使用第一个渲染器输出错误信息
+            view.request.accepted_renderer, view.request.accepted_media_type = renderers[0], renderers[0].media_type
+            try:
+                view.request.accepted_renderer, view.request.accepted_media_type = \
+                    view.request.negotiator.select_renderer(view.request, renderers)
+                await in_thread(check_request)(view)
+                response = await func(view, **kwargs)
+            except Exception as exc:
+                # 不是DRF能处理的异常时重新抛出
+                response = view.handle_exception(exc)
+                response.accepted_renderer = view.request.accepted_renderer
+                response.accepted_media_type = view.request.accepted_media_type
+                response.renderer_context = view.get_renderer_context()
+                response.render()
+            patch_vary_headers(response, ('Accept',))
+            return response
+        return wrapper
+    return decorator
+
+
+async def cached(name, view, compute):
+    """与cached_response相同的查询结果缓存，未命中时调用compute（协程函数）计算响应数据并缓存"""
+    with phase('cache'):
+        # 数据版本号可能需要查询数据库
+        key = await in_thread(result_cache.make_key)(name, view.request, view.kwargs)
+        data = await result_cache.aget(key)
+    if data is None:
+        data = await compute()
+        await result_cache.aset(key, data)
+    return data
+
+
+def serialize_instances(view, instances):
+    plan = view.get_read_plan()
+    if plan is None:
+        return view.get_serializer(instances, many=True).data
+    return plan.serialize_instances(instances)
+
+
+def locate_page(view):
+    """过滤查询集并定位当前页（计算总数、校验页码），返回(查询集, 当前页的查询集)"""
+    queryset = view.filter_queryset(view.get_queryset())
+    return queryset, view.paginator.page_queryset(queryset, view.request, view)
+
+
+def query_and_plan(view):
+    return view.get_queryset(), view.get_read_plan()
+
+
+@require_safe
+@job_view('list', [FastJSONRenderer])
+async def job_list(view):
+    """获取招聘列表，与GET /api/job_postings/相同"""
+    facets, facet_limit = view.get_facets()
+
+    async def compute():
+        with phase('query'):
+            queryset, page_queryset = await in_thread(locate_page)(view)
+            instances = [instance async for instance in (queryset if page_queryset is None else page_queryset)]
+            if page_queryset is not None:
+                instances = view.paginator.set_page(instances)
+        with phase('serialize'):
+            data = serialize_instances(view, instances)
+        if page_queryset is None:
+            if not facets:
+                return data
+            # 与同步接口相同，不分页时结果列表放在results中，以便附带分面统计
+            data = {'results': data}
+        else:
+            data = view.paginator.get_paginated_response(data).data
+        if facets:
+            with phase('facets'):
+                data['facets'] = await in_thread(compute_facets)(queryset, facets, facet_limit)
+        return data
+
+    # 分页链接包含请求路径，不与同步接口共用缓存
+    return render(view, await cached('async_list', view, compute))
+
+
+@require_safe
+@job_view('retrieve', [FastJSONRenderer])
+async def job_detail(view, pk):
+    """获取单条招聘信息，与GET /api/job_postings/<id>/相同"""
+    async def compute():
+        with phase('query'):
+            queryset = await in_thread(view.get_queryset)()
+            try:
+                instance = await aget_object_or_404(queryset, pk=pk)
+            except (TypeError, ValueError, ValidationError):
+                raise Http404
+        with phase('serialize'):
+            return view.get_serializer(instance).data
+
+    return render(view, await cached('retrieve', view, compute))
+
+
+@require_safe
+@job_view('all_data', [FastJSONRenderer, NDJSONRenderer] + COLUMNAR_RENDERERS)
+async def job_all_data(view):
+    """获取所有职位数据（不分页），与GET /api/job_postings/all_data/相同，支持ndjson、columnar、msgpack格式"""
+    renderer = view.request.accepted_renderer
+    if isinstance(renderer, NDJSONRenderer):
+        # 流式输出：每块通过异步ORM查询，等待客户端接收时不占用线程
+        queryset, plan = await in_thread(query_and_plan)(view)
+        if plan is None:
+            return stream_ndjson(aserialized_chunks(queryset, lambda chunk: view.get_serializer(chunk, many=True).data))
+        return stream_ndjson(aplan_chunks(queryset, plan))
+
+    async def compute():
+        queryset, plan = await in_thread(query_and_plan)(view)
+        with phase('serialize'):
+            if type(renderer) in COLUMNAR_RENDERERS:
+                return await in_thread(encode_columnar)(queryset, plan or ReadPlan(view.get_serializer()))
+            if plan is None:
+                return view.get_serializer([instance async for instance in queryset], many=True).data
+            # values_list查询集的aiterator会在事件循环中执行查询，按主键分块异步读取（顺序与同步接口相同）
+            return [row async for chunk in aplan_chunks(queryset, plan, DEFAULT_CHUNK_SIZE) for row in chunk]
+
+    # 输出与同步接口相同，共用缓存
+    return render(view, await cached('all_data', view, compute))
+
+
+@csrf_exempt
+@require_POST
+@job_view('predict_salary', [JSONRenderer])
+async def predict_salary(view):
+    """根据职位信息预测薪资，与POST /api/job_postings/predict_salary/相同，预测在有界线程池中执行"""
+    try:
+        data, status = await get_inference_executor().run(predict_job_salary, view.request)
+    except Overloaded:
+        data, status = {'success': False, 'error': '薪资预测请求过多，请稍后重试'}, 503
+    return render(view, data, status)
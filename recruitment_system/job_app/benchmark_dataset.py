@@ -0,0 +1,113 @@
+"""
+基准测试使用的SQLite数据集
+每种数据量对应BENCHMARK_DATA_DIR下的一个SQLite数据库文件，首次使用时用模拟数据生成器填充，之后直接复用；
+随机森林模型同样按数据量训练一次后保存为内存映射格式，重复运行基准测试时不需要重新训练
+"""
+import io
+import os
+import shutil
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.migrations.executor import MigrationExecutor
+
+from .bulk_load import BulkLoader
+from .forest_artifacts import export_forest, is_flat_forest, load_flat_forest
+from .models import JobPosting
+from .synthetic import generate_frames
+
+DEFAULT_SEED = 42
+
+
+def data_dir():
+    """基准测试数据目录"""
+    return str(getattr(settings, 'BENCHMARK_DATA_DIR', os.path.join(settings.BASE_DIR, 'benchmark_data')))
+
+
+def dataset_path(rows, seed=DEFAULT_SEED):
+    return os.path.join(data_dir(), f'jobs-{rows}-{seed}.sqlite3')
+
+
+def _switch_database(path):
+    """将默认数据库切换到指定的SQLite文件，之后的查询使用新的连接"""
+    connections['default'].close()
+    connections.settings['default'] = {**connections.settings['default'], 'NAME': path}
+    del connections['default']
+
+
+def _populate(path, rows, seed, workers, log):
+    """创建数据库文件并写入rows条模拟数据，写完后才重命名为正式文件名"""
+    os.makedirs(data_dir(), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    log(f'正在生成基准测试数据集（{rows} 条）: {path}')
+    _switch_database(tmp_path)
+    try:
+        # job_postings表不由Django管理，需要单独创建
+        with connection.schema_editor() as editor:
+            editor.create_model(JobPosting)
+        call_command('migrate', verbosity=0)
+        with BulkLoader(workers=workers, progress=None) as loader:
+            # 数据集写完之前文件不会被使用，可以关闭日志和同步以加快写入
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode=OFF')
+                cursor.execute('PRAGMA synchronous=OFF')
+            for frame in generate_frames(rows, seed=seed):
+                loader.add_frame(frame)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        log(f'数据集生成完成，耗时 {loader.elapsed:.1f} 秒')
+    finally:
+        connections['default'].close()
+    os.replace(tmp_path, path)
+
+
+def _upgrade(path, log):
+    """
+    已有的数据集文件落后于当前的数据库迁移时，执行迁移并重新生成规范化数据
+    （与正式环境升级时执行migrate和backfill_postings相同）
+    """
+    executor = MigrationExecutor(connection)
+    if not executor.migration_plan(executor.loader.graph.leaf_nodes()):
+        return
+    log(f'正在升级基准测试数据集: {path}')
+    call_command('migrate', verbosity=0)
+    call_command('backfill_postings', batch_size=5000, stdout=io.StringIO())
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def use_dataset(rows, seed=DEFAULT_SEED, workers=None, log=print):
+    """
+    切换到指定数据量的数据集，数据库文件不存在时先生成，返回数据库文件路径
+    只允许在SQLite数据库上运行，避免向正式数据库写入模拟数据
+    """
+    if connection.vendor != 'sqlite':
+        raise RuntimeError('基准测试数据集只能使用SQLite，请添加参数 --settings=recruitment_system.settings_benchmark')
+    path = dataset_path(rows, seed)
+    if str(connection.settings_dict['NAME']) == path:
+        return path
+    if not os.path.exists(path):
+        _populate(path, rows, seed, os.cpu_count() if workers is None else workers, log)
+    _switch_database(path)
+    _upgrade(path, log)
+    return path
+
+
+def trained_forest(model, rows, seed=DEFAULT_SEED):
+    """
+    返回在指定数据集上训练的随机森林（内存映射格式），返回(模型, 标签编码器, 标准化器)
+    首次调用时使用model._train_model()训练并保存，之后直接加载
+    """
+    path = os.path.join(data_dir(), f'forest-{rows}-{seed}')
+    if not is_flat_forest(path):
+        use_dataset(rows, seed)
+        state, metadata = model._train_model()
+        tmp_path = f'{path}.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        export_forest(state.model, state.label_encoders, state.scaler, tmp_path, metadata)
+        os.replace(tmp_path, path)
+    return load_flat_forest(path)
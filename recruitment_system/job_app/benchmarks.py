@@ -0,0 +1,289 @@
+"""
+性能基准测试
+通过 python manage.py benchmark <名称> 运行，各项测试使用register注册
+使用数据集的测试（dataset=True）在不同数据量的SQLite数据库上运行，见benchmark_dataset模块
+"""
+import base64
+import glob
+import itertools
+import json
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+from .benchmark_dataset import DEFAULT_SEED, trained_forest, use_dataset
+from .features import feature_cache_dir
+from .ml_model import ForestState, get_model
+from .model_registry import current_version
+from .salary_parser import parse_salary, parse_salary_array
+from .simple_ml_model import get_simple_model
+
+# 已注册的基准测试：名称 -> 函数
+BENCHMARKS = {}
+
+# 需要数据集的基准测试，rows参数为数据集的记录数
+DATASET_BENCHMARKS = set()
+
+
+def register(name, dataset=False):
+    """注册基准测试的装饰器，被注册的函数返回结果字典列表"""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        if dataset:
+            DATASET_BENCHMARKS.add(name)
+        return func
+    return decorator
+
+
+def measure(func, repeat=3):
+    """重复运行func，返回最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def throughput(name, rows, seconds):
+    """生成吞吐量结果"""
+    return {
+        'name': name,
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds if seconds > 0 else float('inf'),
+    }
+
+
+def run_case(name, func, rows=1, repeat=5, warmup=1, unit='行'):
+    """
+    运行一个测试用例：先预热warmup次，再计时repeat次，最后在tracemalloc下再运行一次记录峰值内存
+    返回耗时的分位数（秒）、吞吐量（每秒处理的rows数）和峰值内存（字节）
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {
+        'name': name,
+        'rows': rows,
+        'unit': unit,
+        'seconds': float(p50),
+        'p50': float(p50),
+        'p95': float(p95),
+        'p99': float(p99),
+        'rows_per_sec': rows / p50 if p50 > 0 else float('inf'),
+        'peak_memory': peak_memory,
+    }
+
+
+def sample_salary_strings(rows, distinct=3000, seed=0):
+    """生成模拟的薪资字符串，包含k、万、年薪、面议等多种格式"""
+    rng = np.random.default_rng(seed)
+    low = rng.integers(3, 60, distinct)
+    high = low + rng.integers(1, 30, distinct)
+    formats = [
+        lambda a, b: f'{a}k-{b}k',
+        lambda a, b: f'{a}-{b}K·13薪',
+        lambda a, b: f'{a / 10:.1f}-{b / 10:.1f}万',
+        lambda a, b: f'{a * 1000}-{b * 1000}元/月',
+        lambda a, b: f'{a * 12 / 10:.0f}-{b * 12 / 10:.0f}万/年',
+        lambda a, b: '面议',
+    ]
+    pool = np.array([formats[i % len(formats)](a, b) for i, (a, b) in enumerate(zip(low, high))], dtype=object)
+    return pool[rng.integers(0, distinct, rows)]
+
+
+@register('salary_parser')
+def bench_salary_parser(rows=1000000, distinct=3000, seed=0):
+    """薪资解析吞吐量：逐行解析、逐行解析（带缓存）与批量解析对比"""
+    samples = sample_salary_strings(rows, distinct, seed)
+    # 逐行解析速度较慢，只取一部分数据测试
+    row_samples = samples[:min(rows, 100000)]
+    uncached = parse_salary.__wrapped__
+
+    results = [
+        throughput('逐行解析（无缓存）', len(row_samples),
+                   measure(lambda: [uncached(s) for s in row_samples], repeat=1)),
+    ]
+    parse_salary.cache_clear()
+    results.append(throughput('逐行解析（带缓存）', len(row_samples),
+                              measure(lambda: [parse_salary(s) for s in row_samples])))
+    parse_salary.cache_clear()
+    results.append(throughput('批量解析', rows, measure(lambda: parse_salary_array(samples))))
+    return results
+
+
+def sample_job_infos(rows, seed=0):
+    """生成模拟的薪资预测输入，返回经验、学历、地点、行业四个等长数组"""
+    rng = np.random.default_rng(seed)
+    experiences = np.array(['应届生', '1年以下', '1-3年', '3-5年', '5-10年', '10年以上', '不限'], dtype=object)
+    educations = np.array(['大专', '本科', '硕士', '博士', '不限'], dtype=object)
+    locations = np.array(['北京', '上海', '广州', '深圳', '杭州', '成都', '武汉'], dtype=object)
+    industries = np.array(['互联网', '金融', '教育', '医疗', '人工智能', '游戏'], dtype=object)
+    return tuple(values[rng.integers(0, len(values), rows)] for values in (experiences, educations, locations, industries))
+
+
+@register('predict_salary')
+def bench_predict_salary(rows=10000, seed=0):
+    """薪资预测吞吐量：逐条预测与批量预测对比"""
+    model = get_simple_model()
+    experiences, educations, locations, industries = sample_job_infos(rows, seed)
+    # 逐条预测速度较慢，只取一部分数据测试
+    single_rows = min(rows, 2000)
+
+    return [
+        throughput('逐条预测', single_rows, measure(lambda: [
+            model.predict_salary(experiences[i], educations[i], locations[i], industries[i])
+            for i in range(single_rows)
+        ], repeat=1)),
+        throughput('批量预测', rows, measure(
+            lambda: model.predict_salary_batch(experiences, educations, locations, industries)
+        )),
+    ]
+
+
+_client = None
+
+
+def api_get(path, params=None):
+    """通过测试客户端请求接口并读取完整的响应内容，返回响应体"""
+    global _client
+    if _client is None:
+        from django.test import Client
+        _client = Client()
+    response = _client.get(path, params or {})
+    if response.status_code != 200:
+        raise RuntimeError(f'{path} {params} 返回 {response.status_code}')
+    return b''.join(response.streaming_content) if response.streaming else response.content
+
+
+LIST_URL = '/api/job_postings/'
+
+# 列表接口的各项过滤条件：用例名称 -> 查询参数
+FILTER_CASES = [
+    ('无过滤', {}),
+    ('job_title', {'job_title': '开发工程师'}),
+    ('company_name', {'company_name': '模拟科技公司12'}),
+    ('location', {'location': '北京'}),
+    ('skills', {'skills': 'Python'}),
+    ('education', {'education': '硕士'}),
+    ('industry', {'industry': '金融'}),
+    ('experience', {'experience': '3-5年'}),
+    ('company_size', {'company_size': '1000'}),
+    ('min_salary', {'min_salary': '30000'}),
+    ('max_salary', {'max_salary': '15000'}),
+    ('salary_from+salary_to', {'salary_from': '20000', 'salary_to': '30000'}),
+    ('skills_all', {'skills_all': 'Python, Java'}),
+    ('skills_any', {'skills_any': 'Go, Docker'}),
+    ('组合条件', {'location': '上海', 'education': '本科', 'min_salary': '20000', 'skills_any': 'Python'}),
+    ('分面统计', {'facets': 'location,industry,education,experience'}),
+    ('分面统计+过滤', {'location': '北京', 'facets': 'industry,education,experience,skills'}),
+]
+
+
+@register('queries', dataset=True)
+def bench_queries(rows=10000, repeat=5, seed=DEFAULT_SEED):
+    """列表接口各项过滤条件的请求耗时"""
+    use_dataset(rows, seed)
+    return [
+        run_case(f'过滤 {name}', lambda params=params: api_get(LIST_URL, params), repeat=repeat, unit='次')
+        for name, params in FILTER_CASES
+    ]
+
+
+def _cursor(value, pk):
+    """构造游标参数，与JobPostingCursorPagination.encode_cursor的格式相同"""
+    return base64.urlsafe_b64encode(json.dumps({'v': value, 'pk': pk}).encode('utf-8')).decode('ascii')
+
+
+@register('pagination', dataset=True)
+def bench_pagination(rows=10000, repeat=5, seed=DEFAULT_SEED):
+    """页码分页（首页、中间页、末页）与游标分页的请求耗时"""
+    use_dataset(rows, seed)
+    page_size = 20
+    last_page = max(1, -(-rows // page_size))
+    middle_id = rows // 2
+    cases = [
+        ('页码分页 首页', {'page': 1}),
+        ('页码分页 中间页', {'page': max(1, last_page // 2)}),
+        ('页码分页 末页', {'page': last_page}),
+        ('游标分页 首页', {'pagination': 'cursor'}),
+        ('游标分页 中间位置', {'cursor': _cursor(middle_id, middle_id)}),
+        ('游标分页 按薪资排序', {'pagination': 'cursor', 'ordering': '-salary'}),
+    ]
+    return [
+        run_case(name, lambda params=params: api_get(LIST_URL, params), repeat=repeat, unit='次')
+        for name, params in cases
+    ]
+
+
+@register('all_data', dataset=True)
+def bench_all_data(rows=10000, repeat=3, seed=DEFAULT_SEED):
+    """全量数据接口各输出格式的序列化耗时"""
+    use_dataset(rows, seed)
+    url = f'{LIST_URL}all_data/'
+    return [
+        run_case(f'all_data {name}', lambda params=params: api_get(url, params), rows=rows, repeat=repeat, warmup=0)
+        for name, params in [('json', {}), ('ndjson', {'format': 'ndjson'}), ('columnar', {'format': 'columnar'})]
+    ]
+
+
+@register('model_predict', dataset=True)
+def bench_model_predict(rows=10000, repeat=500, seed=DEFAULT_SEED):
+    """两个模型逐条预测的耗时，每次预测一条输入；随机森林使用在该数据集上训练的模型"""
+    experiences, educations, locations, industries = sample_job_infos(repeat, seed)
+    simple_model = get_simple_model()
+    forest_model = get_model()
+    counter = itertools.count()
+
+    def predict_simple():
+        i = next(counter) % repeat
+        simple_model.predict_salary(experiences[i], educations[i], locations[i], industries[i])
+
+    def predict_forest():
+        i = next(counter) % repeat
+        forest_model.predict_salary({
+            'experience': experiences[i], 'education': educations[i],
+            'location': locations[i], 'industry': industries[i],
+        })
+
+    results = [run_case('SimpleSalaryPredictionModel', predict_simple, repeat=repeat, unit='次')]
+
+    # 临时替换随机森林的模型状态，版本号设为当前发布的版本，避免被后台检查替换
+    previous_state, previous_version = forest_model._state, forest_model.version
+    state = ForestState(*trained_forest(forest_model, rows, seed))
+    forest_model._swap(state, current_version(forest_model.artifact_name))
+    try:
+        results.append(run_case('SalaryPredictionModel', predict_forest, repeat=repeat, unit='次'))
+    finally:
+        forest_model._swap(previous_state, previous_version)
+    return results
+
+
+@register('train', dataset=True)
+def bench_train(rows=10000, repeat=1, seed=DEFAULT_SEED):
+    """随机森林完整训练的耗时（每次先删除特征缓存，包含从数据库读取和编码特征）"""
+    use_dataset(rows, seed)
+    model = get_model()
+
+    def train():
+        for path in glob.glob(os.path.join(feature_cache_dir(), 'features-*.npz')):
+            os.remove(path)
+        model._train_model()
+
+    return [run_case('_train_model', train, rows=rows, repeat=repeat, warmup=0)]
@@ -0,0 +1,122 @@
+"""
+招聘信息的批量写入
+每批记录在一个事务中按ID执行upsert（已存在的记录被覆盖，不会删除其他数据），
+薪资、技能、二元组的解析在进程池中并行执行，主进程只负责写入数据库
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import django
+from django.db import connections, transaction
+
+from .models import JobPosting
+from .normalization import conflict_target, parse_rows, posting_rows, write_parsed
+from .versioning import schedule_bump
+
+POSTING_FIELDS = [field.attname for field in JobPosting._meta.concrete_fields]
+
+# upsert时覆盖的字段（除主键外的全部字段）
+UPDATE_FIELDS = [name for name in POSTING_FIELDS if name != 'id']
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _init_worker():
+    """子进程初始化：使用spawn方式启动时需要重新加载Django"""
+    django.setup()
+
+
+class BulkLoader:
+    """
+    批量写入招聘信息，用法：
+        with BulkLoader(batch_size, workers) as loader:
+            loader.add(postings)
+    add()提交一批JobPosting对象的解析任务，等待写入的批次数量有上限以限制内存占用；
+    退出with语句时写入剩余的批次
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, workers=0, normalize=True, progress=print):
+        self.batch_size = batch_size
+        self.normalize = normalize
+        self.progress = progress
+        self.total = 0
+        self.started = time.perf_counter()
+        self.pending = deque()
+        workers = workers if normalize else 0
+        self.max_pending = max(workers, 1) * 2
+        self.executor = None
+        if workers > 0:
+            # fork之前关闭数据库连接，避免子进程继承同一个连接
+            connections.close_all()
+            self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+            # 进程池在提交任务时才创建子进程，先为每个工作进程提交一个空任务并等待完成，
+            # 使所有子进程都在连接关闭时启动，之后主进程打开的连接不会被子进程继承
+            for future in [self.executor.submit(os.getpid) for _ in range(workers)]:
+                future.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=True)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        """平均每秒写入的记录数"""
+        elapsed = self.elapsed
+        return self.total / elapsed if elapsed > 0 else 0
+
+    def add(self, postings):
+        """提交一批记录，同一批中的ID不能重复"""
+        if not postings:
+            return
+        parsed = None
+        if self.normalize:
+            rows = posting_rows(postings)
+            parsed = self.executor.submit(parse_rows, rows) if self.executor is not None else parse_rows(rows)
+        self.pending.append((postings, parsed))
+        while len(self.pending) > self.max_pending:
+            self._write(*self.pending.popleft())
+
+    def add_frame(self, frame):
+        """按batch_size拆分DataFrame（列与job_postings表相同）后提交"""
+        records = frame.to_dict('records')
+        for start in range(0, len(records), self.batch_size):
+            self.add([JobPosting(**record) for record in records[start:start + self.batch_size]])
+
+    def flush(self):
+        """写入所有等待中的批次"""
+        while self.pending:
+            self._write(*self.pending.popleft())
+
+    def _write(self, postings, parsed):
+        """在一个事务中写入一批招聘信息及其规范化数据"""
+        if isinstance(parsed, Future):
+            parsed = parsed.result()
+        with transaction.atomic():
+            JobPosting.objects.bulk_create(
+                postings,
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=conflict_target('id'),
+                update_fields=UPDATE_FIELDS,
+            )
+            if parsed is not None:
+                write_parsed(parsed, self.batch_size)
+            else:
+                schedule_bump()
+
+        self.total += len(postings)
+        if self.progress is not None:
+            self.progress(f'已导入 {self.total} 条记录，{self.rate:.0f} 条/秒')
@@ -0,0 +1,112 @@
+"""
+查询结果缓存
+缓存列表、全量数据、详情接口的响应数据，缓存键由接口名称、规范化后的查询参数和数据版本号组成，
+数据版本变化后旧缓存不再命中，由缓存后端按LRU和过期时间淘汰
+缓存后端使用settings.CACHES中的JOB_RESULT_CACHE_ALIAS（本地内存或文件缓存均可）
+"""
+import functools
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from .metrics import phase
+from .versioning import get_data_version
+
+
+def normalize_params(query_params):
+    """规范化查询参数：按键排序、去除首尾空白、忽略空值"""
+    items = []
+    for key in sorted(query_params.keys()):
+        values = sorted(value.strip() for value in query_params.getlist(key) if value and value.strip())
+        if values:
+            items.append((key.strip(), values))
+    return items
+
+
+class QueryResultCache:
+    """查询结果缓存，记录命中和未命中次数"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        return caches[getattr(settings, 'JOB_RESULT_CACHE_ALIAS', 'default')]
+
+    def make_key(self, name, request, kwargs=None):
+        """根据接口名称、请求参数和数据版本号生成缓存键"""
+        signature = repr((
+            name,
+            request.get_host(),
+            request.accepted_renderer.format,
+            sorted((kwargs or {}).items()),
+            normalize_params(request.query_params),
+        ))
+        digest = hashlib.md5(signature.encode('utf-8')).hexdigest()
+        return f'job_result:{get_data_version()}:{digest}'
+
+    def get(self, key):
+        data = self.backend.get(key)
+        self.count(data is not None)
+        return data
+
+    def set(self, key, data):
+        self.backend.set(key, data)
+
+    def count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    async def aget(self, key):
+        """异步视图使用的get（缓存后端的异步接口）"""
+        data = await self.backend.aget(key)
+        self.count(data is not None)
+        return data
+
+    async def aset(self, key, data):
+        await self.backend.aset(key, data)
+
+    def stats(self):
+        """返回缓存命中统计"""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+            'data_version': get_data_version(),
+        }
+
+
+result_cache = QueryResultCache()
+
+
+def cached_response(name, skip_formats=()):
+    """缓存视图方法响应数据的装饰器，只缓存成功的非流式响应，skip_formats中的输出格式不缓存"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.accepted_renderer.format in skip_formats:
+                return method(self, request, *args, **kwargs)
+
+            with phase('cache'):
+                key = result_cache.make_key(name, request, kwargs)
+                data = result_cache.get(key)
+            if data is not None:
+                return Response(data)
+
+            response = method(self, request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                result_cache.set(key, response.data)
+            return response
+        return wrapper
+    return decorator
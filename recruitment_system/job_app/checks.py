@@ -0,0 +1,18 @@
+"""
+系统检查（manage.py check、runserver启动时执行）
+"""
+from django.core import checks
+
+from . import renderers
+
+
+@checks.register()
+def check_orjson(app_configs, **kwargs):
+    """未安装orjson时列表、全量数据接口退回标准库json编码，速度明显下降"""
+    if renderers.orjson is not None:
+        return []
+    return [checks.Warning(
+        '未安装orjson，列表、详情、全量数据接口使用标准库json编码（输出相同，但编码速度明显下降）',
+        hint='pip install -r requirements.txt',
+        id='job_app.W001',
+    )]
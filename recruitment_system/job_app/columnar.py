@@ -0,0 +1,33 @@
+"""
+列式数据编码
+每个字段输出为一个数组，低基数字段使用字典编码（每次响应一个取值字典 + 整数编码）
+"""
+
+# 使用字典编码的低基数字段
+DICTIONARY_FIELDS = ('location', 'experience', 'education', 'company_type', 'company_size', 'industry')
+
+
+def dictionary_encode(values):
+    """对一列取值进行字典编码，返回(取值字典, 编码列表)"""
+    index = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    return list(index), codes
+
+
+def encode_columnar(queryset, plan, chunk_size=2000):
+    """将查询集按字段计划（read_plan.ReadPlan）编码为列式数据，直接读取values_list元组，不实例化模型对象"""
+    names = plan.names
+
+    rows = list(plan.values(queryset).iterator(chunk_size=chunk_size))
+    # 行转列
+    columns = [list(column) for column in zip(*rows)] if rows else [[] for _ in names]
+    for index, convert in plan.converters:
+        columns[index] = [None if value is None else convert(value) for value in columns[index]]
+
+    data = {'count': len(rows), 'fields': list(names), 'columns': {}, 'dictionaries': {}}
+    for name, column in zip(names, columns):
+        if name in DICTIONARY_FIELDS:
+            data['dictionaries'][name], data['columns'][name] = dictionary_encode(column)
+        else:
+            data['columns'][name] = column
+    return data
@@ -0,0 +1,77 @@
+"""
+分类属性取值字典
+工作地点、学历、行业等低基数字段在入库时映射为job_dimension_values中的整数编号（规范化后相同的取值对应同一个编号），
+编号保存在job_posting_normalized表带索引的列中；过滤时先通过进程内的取值字典缓存把搜索词解析为编号集合，
+再按整数相等或IN条件查询，不再对原始文本执行LIKE '%...%'扫描
+"""
+import re
+import threading
+import unicodedata
+
+from .models import DimensionValue
+from .versioning import get_data_version
+
+# 分类属性字段及对应的属性编号
+DIMENSION_FIELDS = {
+    'location': DimensionValue.LOCATION,
+    'experience': DimensionValue.EXPERIENCE,
+    'education': DimensionValue.EDUCATION,
+    'company_type': DimensionValue.COMPANY_TYPE,
+    'company_size': DimensionValue.COMPANY_SIZE,
+    'industry': DimensionValue.INDUSTRY,
+}
+
+# job_posting_normalized表中保存各属性取值编号的字段
+KEY_FIELDS = {name: f'{name}_key' for name in DIMENSION_FIELDS}
+
+# 取值的最大长度，与DimensionValue.name字段长度一致
+MAX_VALUE_LENGTH = 255
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_value(value):
+    """规范化取值，返回(索引键, 显示名称)：全角转半角、合并空白，索引键不区分大小写；空值返回None"""
+    display = _WHITESPACE_RE.sub(' ', unicodedata.normalize('NFKC', value or '')).strip()[:MAX_VALUE_LENGTH]
+    return (display.casefold(), display) if display else None
+
+
+class DimensionCache:
+    """进程内的取值字典缓存，数据版本变化（有新数据入库）后重新加载"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        # 属性编号 -> [(索引键, 取值编号, 显示名称)]
+        self._values = {}
+
+    def values(self, dimension):
+        """属性的全部取值，返回[(索引键, 取值编号, 显示名称)]"""
+        version = get_data_version()
+        with self._lock:
+            if version != self._version:
+                self._version, self._values = version, {}
+            values = self._values.get(dimension)
+        if values is None:
+            values = list(DimensionValue.objects.filter(dimension=dimension).values_list('name', 'id', 'display_name'))
+            with self._lock:
+                if self._version == version:
+                    self._values[dimension] = values
+        return values
+
+    def resolve(self, dimension, term):
+        """
+        返回索引键包含搜索词的取值编号列表（与原始字段的icontains匹配相同，比较的是规范化后的取值）
+        取值字典为空（尚未生成规范化数据）时返回None
+        """
+        values = self.values(dimension)
+        if not values:
+            return None
+        normalized = normalize_value(term)
+        if normalized is None:
+            return None
+        key = normalized[0]
+        return [value_id for name, value_id, _ in values if key in name]
+
+
+dimension_cache = DimensionCache()
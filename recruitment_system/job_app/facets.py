@@ -0,0 +1,89 @@
+"""
+分面统计
+列表接口的 ?facets=location,industry,education 参数：在返回当前页的同时返回当前过滤条件下各取值的职位数量。
+分类属性按规范化表中的取值编号分组计数（每个分面一条分组查询），技能通过技能倒排索引分组计数；
+结果按过滤条件签名和数据版本号缓存，同一组过滤条件翻页或切换排序时不再重复统计
+"""
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Count
+
+from .cache import result_cache
+from .dimensions import DIMENSION_FIELDS, KEY_FIELDS, dimension_cache
+from .filters import filter_signature
+from .models import NormalizedPosting
+from .stats import DEFAULT_LIMIT, skill_counts, value_counts
+from .versioning import get_data_version
+
+FACETS_PARAM = 'facets'
+FACET_LIMIT_PARAM = 'facet_limit'
+
+# 可用的分面：分类属性和技能
+AVAILABLE_FACETS = list(DIMENSION_FIELDS) + ['skills']
+
+
+def parse_facets(value):
+    """解析逗号分隔的分面名称（去重并保持顺序），未指定时返回空列表，名称无效时抛出ValueError"""
+    names = list(dict.fromkeys(name.strip() for name in (value or '').split(',') if name.strip()))
+    unknown = [name for name in names if name not in AVAILABLE_FACETS]
+    if unknown:
+        raise ValueError(f'未知的分面: {", ".join(unknown)}（可选：{", ".join(AVAILABLE_FACETS)}）')
+    return names
+
+
+def normalized_rows(queryset):
+    """
+    与查询集匹配的规范化记录：没有过滤条件时直接统计规范化表（只需读取取值编号的索引），
+    否则按职位ID子查询，不连接job_postings表分组
+    """
+    if not queryset.query.where:
+        return NormalizedPosting.objects.all()
+    return NormalizedPosting.objects.filter(posting_id__in=queryset.order_by().values('pk'))
+
+
+def dimension_counts(queryset, name, limit=DEFAULT_LIMIT):
+    """按分类属性的取值编号分组计数，按数量降序返回；取值字典为空时按原始字段分组"""
+    values = dimension_cache.values(DIMENSION_FIELDS[name])
+    if not values:
+        return value_counts(queryset, name, limit)
+    display_names = {value_id: display for _, value_id, display in values}
+    key = KEY_FIELDS[name]
+    rows = (
+        normalized_rows(queryset)
+        .filter(**{f'{key}__isnull': False})
+        .values(key)
+        .annotate(count=Count('pk'))
+        .values_list(key, 'count')
+    )
+    # 取值数量很少，在内存中按数量降序、名称升序排序
+    counts = sorted(
+        ((display_names.get(value_id, ''), count) for value_id, count in rows),
+        key=lambda item: (-item[1], item[0]),
+    )
+    return [{'name': display, 'count': count} for display, count in counts[:limit]]
+
+
+def _count(queryset, name, limit):
+    if name == 'skills':
+        return skill_counts(queryset, limit)
+    return dimension_counts(queryset, name, limit)
+
+
+def compute_facets(queryset, names, limit=DEFAULT_LIMIT):
+    """计算各分面的取值计数，返回{分面名称: [{'name', 'count'}]}，每个分面的结果单独缓存"""
+    try:
+        signature = filter_signature(queryset)
+    except EmptyResultSet:
+        # 过滤条件不可能匹配任何记录
+        return {name: [] for name in names}
+
+    backend = result_cache.backend
+    prefix = f'job_facet:{get_data_version()}:{signature}:{limit}'
+    cached = backend.get_many([f'{prefix}:{name}' for name in names])
+    facets = {}
+    for name in names:
+        key = f'{prefix}:{name}'
+        if key not in cached:
+            cached[key] = _count(queryset, name, limit)
+            backend.set(key, cached[key])
+        facets[name] = cached[key]
+    return facets
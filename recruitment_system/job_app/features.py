@@ -0,0 +1,231 @@
+"""
+随机森林模型的特征提取
+按主键分块读取训练所需的列，经验、学历等特征在去重后的取值上向量化计算再广播回每一行；
+编码后的特征矩阵以紧凑的整数数组保存为.npz缓存，缓存键包含数据版本号和表指纹（行数、最大ID），
+数据未变化时重复训练直接读取缓存，只执行一次COUNT/MAX查询。
+job_postings表由外部程序导入：绕过ORM和load_jobs插入或删除的记录会改变表指纹，缓存自动失效；
+但原地修改已有记录（ID和行数不变）不会改变指纹，外部修改记录后需要调用bump_data_version()（或删除缓存目录）
+"""
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .model_registry import DEFAULT_ARTIFACT_DIR
+from .models import JobPosting
+from .salary_parser import salary_average_array
+from .versioning import get_data_version
+
+# 训练需要读取的字段
+SOURCE_FIELDS = ['id', 'experience', 'education', 'salary', 'location', 'company_type', 'company_size', 'industry']
+
+# 经验等级：按顺序匹配关键字，都不匹配时为0
+EXPERIENCE_LEVELS = [
+    (('应届', '1年以下'), 0),
+    (('1-3年',), 1),
+    (('3-5年',), 2),
+    (('5-10年',), 3),
+    (('10年以上',), 4),
+]
+
+# 学历等级：按顺序匹配关键字，都不匹配时为0
+EDUCATION_LEVELS = [
+    (('大专',), 0),
+    (('本科',), 1),
+    (('硕士',), 2),
+    (('博士',), 3),
+]
+
+# 需要标签编码的类别特征
+CATEGORICAL_FEATURES = ['location', 'company_type', 'company_size', 'industry']
+
+# 缺失的类别取值
+UNKNOWN = 'Unknown'
+
+DEFAULT_CHUNK_SIZE = 20000
+
+
+def _match_level(values, levels):
+    """按关键字匹配等级，values为去重后的字符串数组"""
+    values = pd.Series(values, dtype=object).fillna('').astype(str)
+    conditions = [
+        np.logical_or.reduce([values.str.contains(keyword, regex=False).to_numpy() for keyword in keywords])
+        for keywords, _ in levels
+    ]
+    return np.select(conditions, [level for _, level in levels], default=0).astype(np.int8)
+
+
+def encode_levels(values, levels):
+    """批量计算等级，每种取值只匹配一次"""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object).fillna(''))
+    return _match_level(uniques, levels)[codes]
+
+
+def _level(value, levels):
+    """单个取值的等级，与_match_level的结果一致"""
+    value = value or ''
+    for keywords, level in levels:
+        if any(keyword in value for keyword in keywords):
+            return level
+    return 0
+
+
+def experience_level(experience):
+    """经验字符串对应的等级"""
+    return _level(experience, EXPERIENCE_LEVELS)
+
+
+def education_level(education):
+    """学历字符串对应的等级"""
+    return _level(education, EDUCATION_LEVELS)
+
+
+class FeatureSet:
+    """
+    编码后的训练数据
+    ids：职位ID；levels：经验、学历等级（int8）；codes：类别特征在vocabularies中的编号（int32）；
+    salary：平均月薪（float32）；vocabularies：每个类别特征排好序的取值
+    """
+
+    def __init__(self, ids, levels, codes, salary, vocabularies):
+        self.ids = ids
+        self.levels = levels
+        self.codes = codes
+        self.salary = salary
+        self.vocabularies = vocabularies
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def high_water_mark(self):
+        """已读取的最大职位ID"""
+        return int(self.ids.max()) if len(self.ids) else None
+
+    def encode(self, label_encoders):
+        """
+        按标签编码器生成特征矩阵，编码器中没有的取值使用0（与预测时一致）
+        取值表按顺序排列，与LabelEncoder的classes_相同，新训练的编码器得到的编号不变
+        """
+        columns = [self.levels[:, 0], self.levels[:, 1]]
+        for i, feature in enumerate(CATEGORICAL_FEATURES):
+            classes = {value: code for code, value in enumerate(label_encoders[feature].classes_)}
+            remap = np.array([classes.get(value, 0) for value in self.vocabularies[feature]], dtype=np.int32)
+            columns.append(remap[self.codes[:, i]])
+        return np.column_stack(columns).astype(np.float64)
+
+    def save(self, path):
+        arrays = {'ids': self.ids, 'levels': self.levels, 'codes': self.codes, 'salary': self.salary}
+        for feature in CATEGORICAL_FEATURES:
+            arrays[f'vocabulary_{feature}'] = np.array(self.vocabularies[feature], dtype=str)
+        tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            vocabularies = {feature: data[f'vocabulary_{feature}'].tolist() for feature in CATEGORICAL_FEATURES}
+            return cls(data['ids'], data['levels'], data['codes'], data['salary'], vocabularies)
+
+
+def encode_records(frames):
+    """
+    对若干个DataFrame分块编码后合并，类别取值在全部数据上统一编号
+    薪资无法解析的记录会被过滤
+    """
+    n_features = len(CATEGORICAL_FEATURES)
+    ids = [np.empty(0, dtype=np.int64)]
+    levels = [np.empty((0, 2), dtype=np.int8)]
+    codes = [np.empty((0, n_features), dtype=np.int32)]
+    salaries = [np.empty(0, dtype=np.float32)]
+    vocab_index = {feature: {} for feature in CATEGORICAL_FEATURES}
+    for df in frames:
+        salary = salary_average_array(df['salary'])
+        valid = ~np.isnan(salary)
+        df = df[valid]
+        ids.append(df['id'].to_numpy(dtype=np.int64))
+        salaries.append(salary[valid].astype(np.float32))
+        levels.append(np.column_stack([
+            encode_levels(df['experience'], EXPERIENCE_LEVELS),
+            encode_levels(df['education'], EDUCATION_LEVELS),
+        ]))
+        # 类别特征先按首次出现的顺序编号，全部读取后再按取值排序重新编号
+        chunk_codes = np.empty((len(df), n_features), dtype=np.int32)
+        for i, feature in enumerate(CATEGORICAL_FEATURES):
+            value_codes, uniques = pd.factorize(df[feature].fillna(UNKNOWN).astype(str))
+            index = vocab_index[feature]
+            mapping = np.array([index.setdefault(value, len(index)) for value in uniques], dtype=np.int32)
+            chunk_codes[:, i] = mapping[value_codes]
+        codes.append(chunk_codes)
+
+    codes = np.concatenate(codes)
+    vocabularies = {}
+    for i, feature in enumerate(CATEGORICAL_FEATURES):
+        values = list(vocab_index[feature])
+        order = sorted(range(len(values)), key=values.__getitem__)
+        rank = np.empty(len(values), dtype=np.int32)
+        rank[order] = np.arange(len(values), dtype=np.int32)
+        vocabularies[feature] = [values[j] for j in order]
+        codes[:, i] = rank[codes[:, i]]
+
+    return FeatureSet(np.concatenate(ids), np.concatenate(levels), codes, np.concatenate(salaries), vocabularies)
+
+
+def iterate_posting_frames(after_id=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """按主键分块读取训练所需的字段，每块返回一个DataFrame"""
+    queryset = JobPosting.objects.order_by('id')
+    last_id = after_id
+    while True:
+        chunk_queryset = queryset if last_id is None else queryset.filter(id__gt=last_id)
+        rows = list(chunk_queryset.values_list(*SOURCE_FIELDS)[:chunk_size])
+        if not rows:
+            return
+        yield pd.DataFrame(rows, columns=SOURCE_FIELDS)
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1][0]
+
+
+def feature_cache_dir():
+    """特征缓存目录，默认位于模型版本目录下"""
+    default = os.path.join(getattr(settings, 'SALARY_MODEL_ARTIFACT_DIR', DEFAULT_ARTIFACT_DIR), 'feature_cache')
+    return getattr(settings, 'SALARY_FEATURE_CACHE_DIR', default)
+
+
+def table_fingerprint():
+    """职位表的指纹（行数-最大ID），外部程序插入或删除记录后会变化"""
+    stats = JobPosting.objects.aggregate(rows=Count('id'), max_id=Max('id'))
+    return f"{stats['rows']}-{stats['max_id'] or 0}"
+
+
+def load_features(after_id=None, chunk_size=DEFAULT_CHUNK_SIZE, use_cache=True):
+    """
+    读取并编码训练数据，after_id不为None时只读取ID大于该值的职位
+    结果缓存在feature_cache_dir()中，数据版本号或表指纹变化后缓存失效，旧的缓存文件会被删除
+    """
+    version = f'{get_data_version()}-{table_fingerprint()}'
+    cache_dir = feature_cache_dir()
+    path = os.path.join(cache_dir, f'features-{version}-{after_id if after_id is not None else "all"}.npz')
+    if use_cache and os.path.exists(path):
+        try:
+            features = FeatureSet.load(path)
+            print(f"从缓存读取训练特征: {path}")
+            return features
+        except Exception as e:
+            print(f"读取特征缓存失败: {e}")
+
+    features = encode_records(iterate_posting_frames(after_id, chunk_size))
+    if use_cache:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            for old_path in glob.glob(os.path.join(cache_dir, 'features-*.npz')):
+                if not os.path.basename(old_path).startswith(f'features-{version}-'):
+                    os.remove(old_path)
+            features.save(path)
+        except OSError as e:
+            print(f"保存特征缓存失败: {e}")
+    return features
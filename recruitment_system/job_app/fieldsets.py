@@ -0,0 +1,52 @@
+"""
+稀疏字段集
+?fields=id,job_title,salary_avg 只输出指定的字段，?exclude=skills,company_logo 输出除指定字段外的所有字段，
+序列化器只保留输出字段，查询也只读取对应的列（values_list或only）
+"""
+from functools import lru_cache
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+
+
+@lru_cache(maxsize=None)
+def available_fields(serializer_class):
+    """序列化器的输出字段，返回{字段名: source}（按输出顺序）"""
+    return {name: field.source for name, field in serializer_class().fields.items()}
+
+
+def _split(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def parse_fieldset(query_params, available):
+    """
+    解析fields和exclude参数（逗号分隔，可同时使用），返回按序列化器字段顺序排列的字段名元组
+    两个参数都未指定时返回None，字段名无效或没有剩余字段时抛出ValueError
+    """
+    fields = query_params.get(FIELDS_PARAM, '')
+    exclude = query_params.get(EXCLUDE_PARAM, '')
+    if not fields.strip() and not exclude.strip():
+        return None
+
+    requested = _split(fields) or list(available)
+    excluded = _split(exclude)
+    unknown = [name for name in requested + excluded if name not in available]
+    if unknown:
+        raise ValueError(f'未知的字段: {", ".join(unknown)}（可选：{", ".join(available)}）')
+
+    selected = set(requested) - set(excluded)
+    if not selected:
+        raise ValueError('至少需要保留一个字段')
+    return tuple(name for name in available if name in selected)
+
+
+def narrow_queryset(queryset, sources):
+    """只查询sources（序列化器字段的source，如normalized.salary_avg）对应的列，不需要的关联表不再连接"""
+    paths = [source.replace('.', '__') for source in sources]
+    related = {path.split('__', 1)[0] for path in paths if '__' in path}
+    # 保留输出字段用到的select_related关联，其余关联不再连接
+    queryset = queryset.select_related(None)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only(*paths)
@@ -0,0 +1,156 @@
+"""
+招聘信息查询过滤
+列表、全量数据等接口共用的过滤逻辑
+薪资、分类属性、技能过滤和职位名称、公司名称搜索使用规范化表和索引，
+没有规范化数据的职位（绕过ORM直接写入job_postings表、尚未执行backfill_postings）不会被这些条件匹配
+"""
+import hashlib
+
+from django.db.models import Count, Q
+
+from .dimensions import DIMENSION_FIELDS, KEY_FIELDS, dimension_cache, normalize_value
+from .models import DimensionValue, PostingSkill, Skill
+from .ngram_index import INDEXED_FIELDS, candidate_posting_ids
+from .skill_parser import tokenize_skills
+
+# 文本模糊匹配的过滤参数及对应的查询条件
+TEXT_FILTERS = {
+    'job_title': 'job_title__icontains',
+    'company_name': 'company_name__icontains',
+    'skills': 'skills__icontains',
+}
+
+# 分类属性的过滤参数（地点、经验、学历、公司类型、公司规模、行业），通过取值字典按整数编号过滤
+DIMENSION_FILTERS = list(DIMENSION_FIELDS)
+
+# 匹配的取值编号超过该数量时改用子查询，避免过长的IN列表
+MAX_IN_LIST = 1000
+
+
+def filter_signature(queryset):
+    """
+    查询集过滤条件的签名，过滤条件相同的查询集（与查询的列、排序、分页无关）签名相同，用作缓存键
+    过滤条件不可能匹配任何记录时抛出EmptyResultSet
+    """
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    return hashlib.md5(f'{sql}|{params!r}'.encode('utf-8')).hexdigest()
+
+
+def _get_number(params, name):
+    """读取数值型查询参数，参数缺失或不是有效数字时返回None"""
+    value = params.get(name, None)
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        # 参数不是有效的数字，忽略该过滤条件
+        return None
+
+
+def _skill_ids(value):
+    """将逗号分隔的技能列表解析为技能ID，返回(ID列表, 是否全部存在)"""
+    names = [name for name, _ in tokenize_skills(value)]
+    skill_ids = list(Skill.objects.filter(name__in=names).values_list('id', flat=True))
+    return skill_ids, len(skill_ids) == len(names)
+
+
+def dimension_condition(name, value):
+    """
+    分类属性的过滤条件：匹配规范化取值中包含搜索词的记录
+    搜索词在进程内的取值字典中解析为编号，按整数相等或IN条件过滤；取值字典为空时使用原始字段的模糊匹配
+    取值字典不为空时只匹配有规范化数据的职位，不再回退到原始字段（否则OR条件无法使用取值编号的索引）
+    """
+    value_ids = dimension_cache.resolve(DIMENSION_FIELDS[name], value)
+    if value_ids is None:
+        return Q(**{f'{name}__icontains': value})
+    lookup = f'normalized__{KEY_FIELDS[name]}'
+    if len(value_ids) == 1:
+        return Q(**{lookup: value_ids[0]})
+    if len(value_ids) > MAX_IN_LIST:
+        value_ids = DimensionValue.objects.filter(
+            dimension=DIMENSION_FIELDS[name], name__contains=normalize_value(value)[0]
+        ).values('id')
+    # 没有匹配的取值时IN列表为空，查询结果为空
+    return Q(**{f'{lookup}__in': value_ids})
+
+
+def filter_by_skills(queryset, params):
+    """
+    通过技能倒排索引按技能过滤，技能名称精确匹配（不区分大小写）
+    skills_all：同时具备所有技能（求职位列表的交集）
+    skills_any：具备任一技能（求职位列表的并集）
+    """
+    skills_all = params.get('skills_all', None)
+    if skills_all:
+        skill_ids, all_known = _skill_ids(skills_all)
+        if not all_known:
+            # 有技能从未出现过，交集必然为空
+            return queryset.none()
+        if skill_ids:
+            posting_ids = (
+                PostingSkill.objects.filter(skill_id__in=skill_ids)
+                .values('posting_id')
+                .annotate(matched=Count('skill_id'))
+                .filter(matched=len(skill_ids))
+                .values('posting_id')
+            )
+            queryset = queryset.filter(pk__in=posting_ids)
+
+    skills_any = params.get('skills_any', None)
+    if skills_any:
+        skill_ids, _ = _skill_ids(skills_any)
+        posting_ids = PostingSkill.objects.filter(skill_id__in=skill_ids).values('posting_id')
+        queryset = queryset.filter(pk__in=posting_ids)
+
+    return queryset
+
+
+def filter_job_postings(queryset, params):
+    """根据查询参数过滤招聘信息"""
+    # 构建Q对象用于复杂查询
+    q_objects = Q()
+
+    # 按职位名称、公司名称、技能搜索
+    for param, lookup in TEXT_FILTERS.items():
+        value = (params.get(param, None) or '').strip()
+        if value:
+            q_objects &= Q(**{lookup: value})
+            # 职位名称、公司名称先通过二元组索引缩小候选范围，再由icontains校验
+            if param in INDEXED_FIELDS:
+                candidates = candidate_posting_ids(param, value)
+                if candidates is not None:
+                    q_objects &= Q(pk__in=candidates)
+
+    # 按地点、经验、学历、公司类型、公司规模、行业过滤
+    for param in DIMENSION_FILTERS:
+        value = (params.get(param, None) or '').strip()
+        if value:
+            q_objects &= dimension_condition(param, value)
+
+    # 薪资过滤使用规范化后的数值列（单位：元/月），可以直接利用索引
+    # 最低薪资：职位薪资下限不低于该值
+    min_salary = _get_number(params, 'min_salary')
+    if min_salary is not None:
+        q_objects &= Q(normalized__salary_min__gte=min_salary)
+
+    # 最高薪资：职位薪资上限不高于该值
+    max_salary = _get_number(params, 'max_salary')
+    if max_salary is not None:
+        q_objects &= Q(normalized__salary_max__lte=max_salary)
+
+    # 薪资区间：职位薪资范围与[salary_from, salary_to]有交集
+    salary_from = _get_number(params, 'salary_from')
+    if salary_from is not None:
+        q_objects &= Q(normalized__salary_max__gte=salary_from)
+
+    salary_to = _get_number(params, 'salary_to')
+    if salary_to is not None:
+        q_objects &= Q(normalized__salary_min__lte=salary_to)
+
+    # 应用所有过滤条件
+    if q_objects:
+        queryset = queryset.filter(q_objects)
+
+    # 按技能倒排索引过滤
+    return filter_by_skills(queryset, params)
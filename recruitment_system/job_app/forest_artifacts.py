@@ -0,0 +1,176 @@
+"""
+随机森林模型的内存映射格式
+把所有决策树的节点数组拼接后保存为未压缩的.npy文件，加载时使用mmap_mode，
+多个工作进程映射同一组文件，共享操作系统的页缓存，不需要各自反序列化一份模型；
+预测时对所有树同时做向量化的逐层遍历
+"""
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+
+# 节点数组：左子节点、右子节点（全局编号，叶子节点为-1）、分裂特征、分裂阈值、节点预测值
+NODE_ARRAYS = ('left', 'right', 'feature', 'threshold', 'value')
+
+# 每棵树根节点的全局编号
+ROOTS_FILE = 'roots.npy'
+
+# 标签编码器、标准化器等预处理对象（体积很小，直接使用joblib保存）
+PREPROCESS_FILE = 'preprocess.joblib'
+
+# 完整的scikit-learn模型，只在增量训练时加载，服务进程不加载；只有当前版本保留该文件
+ESTIMATOR_FILE = 'forest.joblib'
+
+MANIFEST_FILE = 'manifest.json'
+
+# 每次加载的耗时和内存占用，每行一条记录
+LOAD_STATS_FILE = 'load_stats.jsonl'
+
+FORMAT_NAME = 'flat-forest-v1'
+
+TREE_LEAF = -1
+
+
+def current_rss():
+    """当前进程的常驻内存（字节），无法获取时返回None"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # Linux下ru_maxrss的单位为KB（峰值内存）
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+def export_forest(estimator, label_encoders, scaler, path, metadata=None, save_estimator=False):
+    """
+    将训练好的随机森林导出为内存映射格式，metadata（如增量训练的高水位）一并写入manifest.json
+    save_estimator为True时同时保存完整的scikit-learn模型，供下一次增量训练追加决策树
+    """
+    roots = []
+    arrays = {name: [] for name in NODE_ARRAYS}
+    offset = 0
+    for tree in estimator.estimators_:
+        tree_ = tree.tree_
+        left = tree_.children_left.astype(np.int64)
+        right = tree_.children_right.astype(np.int64)
+        # 子节点编号加上偏移量，转换为拼接后的全局编号
+        arrays['left'].append(np.where(left == TREE_LEAF, TREE_LEAF, left + offset))
+        arrays['right'].append(np.where(right == TREE_LEAF, TREE_LEAF, right + offset))
+        # 叶子节点的特征编号为负数，改为0以便批量取值（结果不会被使用）
+        arrays['feature'].append(np.maximum(tree_.feature, 0))
+        arrays['threshold'].append(tree_.threshold)
+        arrays['value'].append(tree_.value.reshape(tree_.node_count, -1)[:, 0])
+        roots.append(offset)
+        offset += tree_.node_count
+
+    dtypes = {'left': np.int32, 'right': np.int32, 'feature': np.int32, 'threshold': np.float64, 'value': np.float64}
+    size = 0
+    for name in NODE_ARRAYS:
+        array = np.ascontiguousarray(np.concatenate(arrays[name]), dtype=dtypes[name])
+        np.save(os.path.join(path, f'{name}.npy'), array)
+        size += array.nbytes
+    np.save(os.path.join(path, ROOTS_FILE), np.array(roots, dtype=np.int64))
+
+    joblib.dump({'label_encoders': label_encoders, 'scaler': scaler}, os.path.join(path, PREPROCESS_FILE))
+    if save_estimator:
+        joblib.dump(estimator, os.path.join(path, ESTIMATOR_FILE))
+
+    manifest = {
+        'format': FORMAT_NAME,
+        'n_trees': len(roots),
+        'n_nodes': offset,
+        'n_features': int(estimator.n_features_in_),
+        'array_bytes': size,
+        **(metadata or {}),
+    }
+    with open(os.path.join(path, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def remove_estimators(root, keep=None):
+    """删除root下各版本目录中的完整模型文件（keep版本除外），增量训练只使用当前版本的完整模型"""
+    for entry in os.listdir(root):
+        path = os.path.join(root, entry, ESTIMATOR_FILE)
+        if entry != keep and not entry.startswith('.') and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"删除{path}失败: {e}")
+
+
+def read_manifest(path):
+    """读取版本目录中的manifest.json"""
+    with open(os.path.join(path, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def is_flat_forest(path):
+    """目录中是否为内存映射格式的模型"""
+    return os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+
+class FlatForest:
+    """使用内存映射数组预测的随机森林，predict与scikit-learn的RandomForestRegressor结果一致"""
+
+    def __init__(self, path, mmap_mode='r'):
+        self.manifest = read_manifest(path)
+        for name in NODE_ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode))
+        self.roots = np.load(os.path.join(path, ROOTS_FILE))
+        self.n_features_in_ = self.manifest['n_features']
+
+    def apply(self, X):
+        """返回每个样本在每棵树中到达的叶子节点编号，形状为(样本数, 树的数量)"""
+        # 与scikit-learn相同：特征先转换为float32，再与float64的阈值比较
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        n_samples, n_trees = len(X), len(self.roots)
+        nodes = np.tile(self.roots, n_samples)
+        samples = np.repeat(np.arange(n_samples), n_trees)
+        # 每一层只处理还没有到达叶子节点的(样本, 树)
+        active = np.arange(len(nodes))
+        while active.size:
+            current = nodes[active]
+            left = self.left[current]
+            internal = left != TREE_LEAF
+            active, current, left = active[internal], current[internal], left[internal]
+            go_left = X[samples[active], self.feature[current]] <= self.threshold[current]
+            nodes[active] = np.where(go_left, left, self.right[current])
+        return nodes.reshape(n_samples, n_trees)
+
+    def predict(self, X):
+        """预测值为所有树叶子节点预测值的平均"""
+        return self.value[self.apply(X)].mean(axis=1)
+
+
+def load_flat_forest(path, mmap_mode='r'):
+    """
+    加载内存映射格式的模型，返回(模型, 标签编码器, 标准化器)
+    每次加载的耗时和常驻内存变化追加记录到版本目录的load_stats.jsonl中
+    """
+    rss_before = current_rss()
+    started = time.perf_counter()
+    forest = FlatForest(path, mmap_mode=mmap_mode)
+    preprocess = joblib.load(os.path.join(path, PREPROCESS_FILE))
+    stats = {
+        'pid': os.getpid(),
+        'loaded_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'load_seconds': round(time.perf_counter() - started, 6),
+        'rss_before': rss_before,
+        'rss_after': current_rss(),
+        'mmap': mmap_mode is not None,
+    }
+    forest.load_stats = stats
+    try:
+        with open(os.path.join(path, LOAD_STATS_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(stats) + '\n')
+    except OSError as e:
+        print(f"记录模型加载统计失败: {e}")
+    return forest, preprocess.get('label_encoders', {}), preprocess.get('scaler')
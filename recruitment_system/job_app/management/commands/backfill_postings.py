@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from job_app.models import JobPosting
+from job_app.normalization import SOURCE_FIELDS, normalize_postings
+
+
+class Command(BaseCommand):
+    help = '为已有的招聘信息生成规范化数据（薪资数值等）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='每批处理的记录数')
+        parser.add_argument('--missing', action='store_true',
+                            help='只处理还没有规范化数据的记录（如直接写入job_postings表的新数据），可定期执行')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = JobPosting.objects.only(*SOURCE_FIELDS).order_by('id')
+        if options['missing']:
+            queryset = queryset.filter(normalized__isnull=True)
+
+        total = 0
+        batch = []
+        for posting in queryset.iterator(chunk_size=batch_size):
+            batch.append(posting)
+            if len(batch) >= batch_size:
+                total += normalize_postings(batch, batch_size=batch_size)
+                batch = []
+                self.stdout.write(f'已处理 {total} 条记录')
+        if batch:
+            total += normalize_postings(batch, batch_size=batch_size)
+
+        self.stdout.write(self.style.SUCCESS(f'规范化完成，共处理 {total} 条记录'))
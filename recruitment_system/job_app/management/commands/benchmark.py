@@ -0,0 +1,113 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from job_app.benchmark_dataset import DEFAULT_SEED
+from job_app.benchmarks import BENCHMARKS, DATASET_BENCHMARKS
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+
+def result_key(benchmark, rows, result):
+    """基线文件中结果的键：测试名称/数据量/用例名称"""
+    return f"{benchmark}/{rows}/{result['name']}"
+
+
+class Command(BaseCommand):
+    help = '运行性能基准测试'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help=f'要运行的测试名称，默认全部运行（可选：{", ".join(BENCHMARKS)}）')
+        parser.add_argument('--rows', type=int, default=None, help='测试数据行数（不使用数据集的测试）')
+        parser.add_argument('--sizes', default=None,
+                            help='数据集的记录数，逗号分隔，默认为BENCHMARK_SIZES（10000,100000,1000000）')
+        parser.add_argument('--repeat', type=int, default=None, help='每个用例的计时次数，默认由各项测试决定')
+        parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='生成数据集的随机种子')
+        parser.add_argument('--save-baseline', metavar='PATH', help='将结果保存为基线文件（JSON）')
+        parser.add_argument('--compare', metavar='PATH', help='与基线文件比较，耗时或峰值内存超出阈值时以失败状态退出')
+        parser.add_argument('--threshold', type=float, default=0.2, help='判定为性能退化的相对增幅，默认0.2（20%%）')
+
+    def handle(self, *args, **options):
+        names = options['names'] or list(BENCHMARKS)
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f'未知的基准测试: {", ".join(unknown)}')
+
+        if options['sizes']:
+            try:
+                sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+            except ValueError:
+                raise CommandError('--sizes必须是逗号分隔的整数')
+        else:
+            sizes = getattr(settings, 'BENCHMARK_SIZES', DEFAULT_SIZES)
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], 'r', encoding='utf-8') as f:
+                    baseline = json.load(f)['results']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f'读取基线文件失败: {e}')
+
+        results = {}
+        regressions = []
+        for name in names:
+            runs = [(size, {'rows': size, 'seed': options['seed']}) for size in sizes] \
+                if name in DATASET_BENCHMARKS else [(options['rows'], {} if options['rows'] is None else {'rows': options['rows']})]
+            for rows, kwargs in runs:
+                if options['repeat'] is not None and name in DATASET_BENCHMARKS:
+                    kwargs['repeat'] = options['repeat']
+                heading = f'== {name} ==' if rows is None else f'== {name} (rows={rows}) =='
+                self.stdout.write(self.style.MIGRATE_HEADING(heading))
+                try:
+                    benchmark_results = BENCHMARKS[name](**kwargs)
+                except RuntimeError as e:
+                    raise CommandError(str(e))
+                for result in benchmark_results:
+                    key = result_key(name, rows, result)
+                    results[key] = result
+                    line = self.format_result(result)
+                    if baseline is not None and key in baseline:
+                        comparison, regressed = self.compare(result, baseline[key], options['threshold'])
+                        line += f'  {comparison}'
+                        if regressed:
+                            regressions.append(key)
+                            line = self.style.ERROR(line)
+                    self.stdout.write(line)
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w', encoding='utf-8') as f:
+                json.dump({'seed': options['seed'], 'results': results}, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"基线已保存到 {options['save_baseline']}"))
+
+        if regressions:
+            raise CommandError(f'{len(regressions)} 个用例性能退化: {", ".join(regressions)}')
+        if baseline is not None:
+            self.stdout.write(self.style.SUCCESS('与基线相比没有性能退化'))
+
+    @staticmethod
+    def format_result(result):
+        if 'p50' not in result:
+            return (
+                f"{result['name']:<24} {result['rows']:>10} 行  "
+                f"{result['seconds'] * 1000:>10.1f} ms  {result['rows_per_sec']:>14,.0f} 行/秒"
+            )
+        return (
+            f"{result['name']:<28} p50 {result['p50'] * 1000:>9.2f} ms  p95 {result['p95'] * 1000:>9.2f} ms  "
+            f"p99 {result['p99'] * 1000:>9.2f} ms  {result['rows_per_sec']:>12,.0f} {result.get('unit', '行')}/秒  "
+            f"峰值内存 {result['peak_memory'] / 1024 / 1024:>8.1f} MB"
+        )
+
+    @staticmethod
+    def compare(result, base, threshold):
+        """与基线比较中位耗时和峰值内存，返回(比较结果描述, 是否退化)"""
+        parts = []
+        regressed = False
+        for field, label in (('seconds', '耗时'), ('peak_memory', '内存')):
+            if not base.get(field) or field not in result:
+                continue
+            change = result[field] / base[field] - 1
+            parts.append(f'{label} {change:+.0%}')
+            regressed = regressed or change > threshold
+        return ('基线: ' + ', '.join(parts)) if parts else '', regressed
@@ -0,0 +1,93 @@
+"""
+生成大规模模拟招聘数据
+取值分布和薪资因子与模型的模拟训练数据相同，写入CSV/JSONL文件（可再用load_jobs导入）或直接写入数据库
+"""
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from job_app.bulk_load import DEFAULT_BATCH_SIZE, BulkLoader
+from job_app.synthetic import DEFAULT_COMPANIES, DEFAULT_MAX_SKILLS, generate_frames
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+
+def write_frame(frame, f, file_format, header):
+    """将一块数据追加写入文件"""
+    if file_format == 'csv':
+        frame.to_csv(f, header=header, index=False)
+    else:
+        frame.to_json(f, orient='records', lines=True, force_ascii=False)
+
+
+class Command(BaseCommand):
+    help = '生成模拟招聘数据，写入CSV/JSONL文件或直接写入数据库'
+
+    def add_arguments(self, parser):
+        parser.add_argument('count', type=int, help='生成的记录数')
+        parser.add_argument('--seed', type=int, default=42, help='随机种子，相同的种子和参数生成相同的数据')
+        parser.add_argument('--start-id', type=int, default=1, help='第一条记录的ID')
+        parser.add_argument('--output', help="输出文件路径，'-'表示写入标准输出")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='输出文件格式，默认根据扩展名判断')
+        parser.add_argument('--database', action='store_true', help='直接写入数据库（按ID更新已存在的记录）')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='写入数据库时每个事务的记录数')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='写入数据库时解析薪资和技能的进程数')
+        parser.add_argument('--location-skew', type=float, default=0.0,
+                            help='城市频率的Zipf倾斜度，0为均匀分布，越大越集中于前几个城市')
+        parser.add_argument('--industry-skew', type=float, default=0.0, help='行业频率的Zipf倾斜度')
+        parser.add_argument('--skill-skew', type=float, default=0.0, help='技能频率的Zipf倾斜度')
+        parser.add_argument('--max-skills', type=int, default=DEFAULT_MAX_SKILLS, help='每个职位最多的技能数')
+        parser.add_argument('--companies', type=int, default=DEFAULT_COMPANIES, help='公司数量')
+
+    def handle(self, *args, **options):
+        if options['count'] <= 0:
+            raise CommandError('记录数必须大于0')
+        if bool(options['output']) == options['database']:
+            raise CommandError('请指定--output或--database之一')
+
+        frames = generate_frames(
+            options['count'],
+            seed=options['seed'],
+            start_id=options['start_id'],
+            location_skew=options['location_skew'],
+            industry_skew=options['industry_skew'],
+            skill_skew=options['skill_skew'],
+            max_skills=options['max_skills'],
+            companies=options['companies'],
+        )
+        if options['database']:
+            self.write_database(frames, options['batch_size'], options['workers'])
+        else:
+            self.write_file(frames, options['output'], options['format'])
+
+    def write_file(self, frames, path, file_format):
+        if file_format is None:
+            file_format = FORMATS.get(os.path.splitext(path)[1].lower())
+            if file_format is None:
+                raise CommandError(f'无法根据扩展名判断文件格式，请指定--format: {path}')
+        # 写入标准输出时进度信息输出到标准错误
+        log = self.stderr if path == '-' else self.stdout
+
+        started = time.perf_counter()
+        total = 0
+        f = sys.stdout if path == '-' else open(path, 'w', encoding='utf-8', newline='')
+        try:
+            for frame in frames:
+                write_frame(frame, f, file_format, header=total == 0)
+                total += len(frame)
+                log.write(f'已生成 {total} 条记录，{total / (time.perf_counter() - started):.0f} 条/秒')
+        finally:
+            if f is not sys.stdout:
+                f.close()
+        log.write(self.style.SUCCESS(f'生成完成，共 {total} 条记录，耗时 {time.perf_counter() - started:.1f} 秒'))
+
+    def write_database(self, frames, batch_size, workers):
+        with BulkLoader(batch_size=batch_size, workers=workers, progress=self.stdout.write) as loader:
+            for frame in frames:
+                loader.add_frame(frame)
+        self.stdout.write(self.style.SUCCESS(
+            f'写入完成，共 {loader.total} 条记录，耗时 {loader.elapsed:.1f} 秒（{loader.rate:.0f} 条/秒）'
+        ))
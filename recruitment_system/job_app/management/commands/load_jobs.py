@@ -0,0 +1,143 @@
+"""
+从CSV/JSONL文件批量导入招聘信息
+文件按行流式读取，按批交给BulkLoader写入数据库
+"""
+import csv
+import json
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from job_app.bulk_load import DEFAULT_BATCH_SIZE, UPDATE_FIELDS, BulkLoader
+from job_app.models import JobPosting
+
+# 文件扩展名对应的格式
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+NULLABLE_FIELDS = {field.attname for field in JobPosting._meta.concrete_fields if field.null}
+
+# 最多输出的无效记录数，超过后只计数
+MAX_REPORTED_ERRORS = 20
+
+
+def read_csv(f):
+    """逐行读取CSV文件，返回(行号, 记录)，第一行为字段名"""
+    reader = csv.DictReader(f)
+    for record in reader:
+        yield reader.line_num, record
+
+
+def read_jsonl(f):
+    """逐行读取JSONL文件，返回(行号, 行内容)，空行会被跳过；每行由parse_json解析"""
+    for line_num, line in enumerate(f, 1):
+        line = line.strip()
+        if line:
+            yield line_num, line
+
+
+def parse_json(line):
+    """将JSONL的一行解析为记录，不是有效的JSON对象时抛出ValueError"""
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f'不是有效的JSON: {e}')
+    if not isinstance(record, dict):
+        raise ValueError('不是JSON对象')
+    return record
+
+
+# 文件格式 -> (逐行读取函数, 将一行解析为记录的函数)
+READERS = {'csv': (read_csv, dict), 'jsonl': (read_jsonl, parse_json)}
+
+
+def read_file(path, records):
+    """迭代读取文件中的记录，读取、解码或CSV格式错误转换为CommandError（不影响写入数据库时的错误）"""
+    try:
+        yield from records
+    except (OSError, UnicodeError, csv.Error) as e:
+        raise CommandError(f'读取{path}失败: {e}')
+
+
+def to_posting(record):
+    """将一条记录转换为JobPosting对象，缺少ID或ID无效时抛出ValueError"""
+    try:
+        posting_id = int(record.get('id'))
+    except (TypeError, ValueError):
+        raise ValueError(f"无效的ID: {record.get('id')!r}")
+
+    values = {'id': posting_id}
+    for name in UPDATE_FIELDS:
+        value = record.get(name)
+        if isinstance(value, list):
+            # JSONL中的技能标签可以是数组
+            value = ', '.join(str(item) for item in value)
+        value = '' if value is None else str(value).strip()
+        values[name] = None if not value and name in NULLABLE_FIELDS else value
+    return JobPosting(**values)
+
+
+class Command(BaseCommand):
+    help = '从CSV/JSONL文件批量导入招聘信息，按ID更新已存在的记录'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help="CSV或JSONL文件路径，'-'表示从标准输入读取")
+        parser.add_argument('--format', choices=sorted(READERS), help='文件格式，默认根据扩展名判断')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='每个事务写入的记录数')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='解析薪资和技能的进程数，0表示在主进程中解析')
+        parser.add_argument('--encoding', default='utf-8-sig', help='文件编码')
+        parser.add_argument('--no-normalize', action='store_true',
+                            help='只导入原始数据，不生成规范化数据（之后可执行backfill_postings）')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size必须大于0')
+        self.batch_size = options['batch_size']
+        self.invalid = 0
+
+        with BulkLoader(
+            batch_size=self.batch_size,
+            workers=options['workers'],
+            normalize=not options['no_normalize'],
+            progress=self.stdout.write,
+        ) as loader:
+            for path in options['paths']:
+                self.load_file(path, options['format'], options['encoding'], loader)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'导入完成，共 {loader.total} 条记录，跳过 {self.invalid} 条无效记录，'
+            f'耗时 {loader.elapsed:.1f} 秒（{loader.rate:.0f} 条/秒）'
+        ))
+
+    def load_file(self, path, file_format, encoding, loader):
+        if file_format is None:
+            file_format = FORMATS.get(os.path.splitext(path)[1].lower())
+            if file_format is None:
+                raise CommandError(f'无法根据扩展名判断文件格式，请指定--format: {path}')
+
+        try:
+            f = sys.stdin if path == '-' else open(path, 'r', encoding=encoding, newline='')
+        except OSError as e:
+            raise CommandError(f'读取{path}失败: {e}')
+        reader, parse = READERS[file_format]
+        try:
+            batch = {}
+            for line_num, record in read_file(path, reader(f)):
+                # 无效的行（不是JSON对象、缺少ID或ID无效）跳过并计数
+                try:
+                    posting = to_posting(parse(record))
+                except ValueError as e:
+                    self.invalid += 1
+                    if self.invalid <= MAX_REPORTED_ERRORS:
+                        self.stderr.write(f'{path}第{line_num}行: {e}')
+                    continue
+                # 同一批中重复的ID只保留最后一条
+                batch[posting.id] = posting
+                if len(batch) >= self.batch_size:
+                    loader.add(list(batch.values()))
+                    batch = {}
+            loader.add(list(batch.values()))
+        finally:
+            if f is not sys.stdin:
+                f.close()
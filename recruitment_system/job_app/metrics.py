@@ -0,0 +1,245 @@
+"""
+请求耗时分析与Prometheus指标
+ServerTimingMiddleware为每个请求记录各阶段耗时（查询、序列化、渲染、模型推理等）以及SQL查询次数和耗时，
+通过Server-Timing响应头返回，同时按接口汇总为直方图，由/api/metrics以Prometheus文本格式输出。
+各阶段的计时记录在contextvars中，不在请求内调用时（如命令行训练）只有一次变量读取的开销；
+SQL查询通过在每个新建的数据库连接上安装的execute_wrapper计数，异步视图在sync_to_async线程中执行的查询同样计入；
+指标保存在进程内存中，多进程部署时每个工作进程分别统计
+"""
+import bisect
+import contextvars
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+# 请求耗时直方图的分桶边界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 每个请求SQL查询次数的分桶边界
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# 没有匹配到路由的请求使用的接口名称，避免404请求产生大量不同的标签
+UNMATCHED = 'unmatched'
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """一个请求中各阶段的累计耗时（秒）以及SQL查询次数和耗时"""
+    __slots__ = ('phases', 'sql_count', 'sql_time')
+
+    def __init__(self):
+        self.phases = {}
+        self.sql_count = 0
+        self.sql_time = 0.0
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def header(self, total):
+        """生成Server-Timing响应头，耗时单位为毫秒"""
+        entries = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in self.phases.items()]
+        entries.append(f'sql;dur={self.sql_time * 1000:.2f};desc="{self.sql_count} queries"')
+        entries.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(entries)
+
+
+@contextmanager
+def phase(name):
+    """记录代码块的耗时，计入当前请求的name阶段"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """记录函数耗时的装饰器，计入当前请求的name阶段"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.add(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _record_sql(execute, sql, params, many, context):
+    """数据库连接的execute_wrapper：累计当前请求的SQL查询次数和耗时"""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.sql_count += 1
+        timings.sql_time += time.perf_counter() - start
+
+
+def install_sql_recorder(connection):
+    """在数据库连接上安装SQL计数（connection_created信号中调用，重新连接时不重复安装）"""
+    if _record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_sql)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_number(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Prometheus直方图，按标签取值分别统计"""
+
+    def __init__(self, name, documentation, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # 标签取值 -> [各分桶的计数（不累计，最后一个为+Inf）..., 总和]
+        self._values = {}
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(labels)
+            if data is None:
+                data = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            data[index] += 1
+            data[-1] += value
+
+    def render(self):
+        """输出Prometheus文本格式"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            values = sorted((labels, list(data)) for labels, data in self._values.items())
+        for labels, data in values:
+            label_text = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), data[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{_format_number(bound)}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {_format_number(data[-1])}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return '\n'.join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+REQUEST_DURATION = Histogram(
+    'job_http_request_duration_seconds', '请求总耗时（秒）', ['endpoint', 'method', 'status'],
+)
+PHASE_DURATION = Histogram(
+    'job_http_request_phase_duration_seconds', '请求各阶段的耗时（秒）', ['endpoint', 'phase'],
+)
+SQL_QUERIES = Histogram(
+    'job_http_request_sql_queries', '每个请求的SQL查询次数', ['endpoint'], SQL_COUNT_BUCKETS,
+)
+SQL_DURATION = Histogram(
+    'job_http_request_sql_duration_seconds', '每个请求的SQL查询总耗时（秒）', ['endpoint'],
+)
+
+HISTOGRAMS = [REQUEST_DURATION, PHASE_DURATION, SQL_QUERIES, SQL_DURATION]
+
+
+def endpoint_name(request):
+    """请求对应的接口名称（路由名称，如jobposting-list）"""
+    match = getattr(request, 'resolver_match', None)
+    return (match.view_name or match.route) if match else UNMATCHED
+
+
+def record(endpoint, method, status, total, timings):
+    """将一个请求的耗时计入直方图"""
+    REQUEST_DURATION.observe((endpoint, method, str(status)), total)
+    for name, seconds in timings.phases.items():
+        PHASE_DURATION.observe((endpoint, name), seconds)
+    SQL_QUERIES.observe((endpoint,), timings.sql_count)
+    SQL_DURATION.observe((endpoint,), timings.sql_time)
+
+
+def render_metrics():
+    """所有指标的Prometheus文本格式"""
+    return '\n'.join(histogram.render() for histogram in HISTOGRAMS) + '\n'
+
+
+class ServerTimingMiddleware:
+    """
+    记录每个请求的各阶段耗时和SQL查询，添加Server-Timing响应头并计入直方图
+    同时支持同步和异步（ASGI）调用，异步视图不会因为本中间件而在线程中执行
+    流式响应在中间件返回之后才输出内容，输出过程中的查询不计入
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'JOB_METRICS_ENABLED', True)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, start)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, start)
+
+    def finish(self, request, response, timings, start):
+        total = time.perf_counter() - start
+        response['Server-Timing'] = timings.header(total)
+        record(endpoint_name(request), request.method, response.status_code, total, timings)
+        return response
+
+    def process_template_response(self, request, response):
+        """DRF的响应在视图返回之后才渲染，通过渲染完成的回调记录渲染耗时"""
+        timings = _current.get()
+        if timings is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: timings.add('render', time.perf_counter() - start))
+        return response
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-19 03:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobPosting',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('job_title', models.CharField(max_length=255, verbose_name='职位名称')),
+                ('company_name', models.CharField(max_length=255, verbose_name='公司名称')),
+                ('company_logo', models.CharField(blank=True, max_length=255, null=True, verbose_name='公司logo')),
+                ('location', models.CharField(max_length=255, verbose_name='工作地点')),
+                ('experience', models.CharField(max_length=255, verbose_name='工作经验')),
+                ('education', models.CharField(max_length=255, verbose_name='学历要求')),
+                ('salary', models.CharField(max_length=255, verbose_name='薪资')),
+                ('company_type', models.CharField(max_length=255, verbose_name='公司类型')),
+                ('company_size', models.CharField(max_length=255, verbose_name='公司规模')),
+                ('industry', models.CharField(max_length=255, verbose_name='行业')),
+                ('skills', models.TextField(verbose_name='技能标签')),
+            ],
+            options={
+                'verbose_name': '招聘信息',
+                'verbose_name_plural': '招聘信息',
+                'db_table': 'job_postings',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='NormalizedPosting',
+            fields=[
+                ('posting', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='normalized', serialize=False, to='job_app.jobposting', verbose_name='招聘信息')),
+                ('salary_min', models.IntegerField(blank=True, db_index=True, null=True, verbose_name='最低月薪(元)')),
+                ('salary_max', models.IntegerField(blank=True, db_index=True, null=True, verbose_name='最高月薪(元)')),
+                ('salary_avg', models.IntegerField(blank=True, db_index=True, null=True, verbose_name='平均月薪(元)')),
+            ],
+            options={
+                'verbose_name': '招聘信息规范化数据',
+                'verbose_name_plural': '招聘信息规范化数据',
+                'db_table': 'job_posting_normalized',
+            },
+        ),
+    ]
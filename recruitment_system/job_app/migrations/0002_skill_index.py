@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-19 03:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='索引键')),
+                ('display_name', models.CharField(max_length=100, verbose_name='技能名称')),
+            ],
+            options={
+                'verbose_name': '技能标签',
+                'verbose_name_plural': '技能标签',
+                'db_table': 'job_skills',
+            },
+        ),
+        migrations.CreateModel(
+            name='PostingSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posting', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='job_app.jobposting', verbose_name='招聘信息')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posting_links', to='job_app.skill', verbose_name='技能标签')),
+            ],
+            options={
+                'verbose_name': '职位技能',
+                'verbose_name_plural': '职位技能',
+                'db_table': 'job_posting_skills',
+                'constraints': [models.UniqueConstraint(fields=('skill', 'posting'), name='uniq_skill_posting')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-19 03:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_app', '0002_skill_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostingNgram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.PositiveSmallIntegerField(choices=[(1, '职位名称'), (2, '公司名称')], verbose_name='字段')),
+                ('gram', models.CharField(max_length=2, verbose_name='二元组')),
+                ('posting', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='ngrams', to='job_app.jobposting', verbose_name='招聘信息')),
+            ],
+            options={
+                'verbose_name': '职位文本索引',
+                'verbose_name_plural': '职位文本索引',
+                'db_table': 'job_posting_ngrams',
+                'constraints': [models.UniqueConstraint(fields=('field', 'gram', 'posting'), name='uniq_field_gram_posting')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_app', '0004_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DimensionValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.PositiveSmallIntegerField(choices=[(1, '工作地点'), (2, '工作经验'), (3, '学历要求'), (4, '公司类型'), (5, '公司规模'), (6, '行业')], verbose_name='属性')),
+                ('name', models.CharField(max_length=255, verbose_name='索引键')),
+                ('display_name', models.CharField(max_length=255, verbose_name='取值')),
+            ],
+            options={
+                'verbose_name': '分类属性取值',
+                'verbose_name_plural': '分类属性取值',
+                'db_table': 'job_dimension_values',
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'name'), name='uniq_dimension_name')],
+            },
+        ),
+        migrations.AddField(
+            model_name='normalizedposting',
+            name='company_size_key',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='job_app.dimensionvalue', verbose_name='公司规模'),
+        ),
+        migrations.AddField(
+            model_name='normalizedposting',
+            name='company_type_key',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='job_app.dimensionvalue', verbose_name='公司类型'),
+        ),
+        migrations.AddField(
+            model_name='normalizedposting',
+            name='education_key',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='job_app.dimensionvalue', verbose_name='学历要求'),
+        ),
+        migrations.AddField(
+            model_name='normalizedposting',
+            name='experience_key',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='job_app.dimensionvalue', verbose_name='工作经验'),
+        ),
+        migrations.AddField(
+            model_name='normalizedposting',
+            name='industry_key',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='job_app.dimensionvalue', verbose_name='行业'),
+        ),
+        migrations.AddField(
+            model_name='normalizedposting',
+            name='location_key',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='job_app.dimensionvalue', verbose_name='工作地点'),
+        ),
+    ]
@@ -1,321 +1,297 @@
 import os
+import random
+import threading
+from collections import namedtuple
+
 import joblib
 import numpy as np
 import pandas as pd
-import re
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score
+from django.conf import settings
 from django.db.models import Avg
-from .models import JobPosting
+from .features import CATEGORICAL_FEATURES, education_level, encode_records, experience_level, load_features
+from .forest_artifacts import (
+    ESTIMATOR_FILE, PREPROCESS_FILE, export_forest, is_flat_forest, load_flat_forest, read_manifest,
+    remove_estimators,
+)
+from .metrics import timed
+from .model_registry import VersionedModel, artifact_root, current_version, publish, version_path
+from .salary_parser import parse_salary, salary_average
+from .synthetic import (
+    BASE_SALARY, EDUCATION_FACTORS, EXPERIENCE_FACTORS, INDUSTRY_FACTORS, LOCATION_FACTORS, generate_postings
+)
+
+# 预测所需的全部数据，切换版本时整体替换
+ForestState = namedtuple('ForestState', ['model', 'label_encoders', 'scaler'])
+
+# 旧格式版本目录中的模型文件名（整个模型使用joblib保存）
+MODEL_FILE = 'model.joblib'
 
-class SalaryPredictionModel:
+
+class SalaryPredictionModel(VersionedModel):
     """薪资预测模型类"""
+    artifact_name = 'forest'
     _instance = None
-    _model = None
+    _lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(SalaryPredictionModel, cls).__new__(cls)
-            # 初始化只在第一次创建实例时执行
-            cls._instance._initialize()
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(SalaryPredictionModel, cls).__new__(cls)
+                    # 初始化只在第一次创建实例时执行
+                    instance._initialize()
+                    cls._instance = instance
         return cls._instance
         
     def _initialize(self):
-        # 模型保存路径
+        # 旧版本的模型保存路径，还没有发布过版本时使用
         self.model_path = os.path.join(os.path.dirname(__file__), 'salary_prediction_model.joblib')
         
         # 初始化模型和预处理工具
-        self.model = None
-        self.label_encoders = {}
-        self.scaler = None
+        self._init_versioning()
+        self._state = ForestState(None, {}, None)
         
-        # 尝试加载已保存的模型
+        # 尝试加载已保存的模型（不会在这里训练）
         self.load_model()
+
+    @property
+    def model(self):
+        return self._state.model
+
+    @property
+    def label_encoders(self):
+        return self._state.label_encoders
+
+    @property
+    def scaler(self):
+        return self._state.scaler
     
     def _parse_salary(self, salary_str):
         """解析薪资字符串并返回平均薪资数值"""
-        if not salary_str:
-            return None
-            
-        try:
-            # 匹配薪资范围的正则表达式
-            pattern = r'(\d+(?:\.\d+)?)([kK]?)\s*-(\d+(?:\.\d+)?)([kK]?)'
-            match = re.search(pattern, salary_str)
-            
-            if match:
-                min_salary = float(match.group(1))
-                min_unit = match.group(2)
-                max_salary = float(match.group(3))
-                max_unit = match.group(4)
-                
-                # 处理单位（k或万）
-                if min_unit.lower() == 'k' or 'k' in salary_str.lower():
-                    min_salary *= 1000
-                    max_salary *= 1000
-                elif '万' in salary_str:
-                    min_salary *= 10000
-                    max_salary *= 10000
-                
-                # 返回平均薪资
-                return (min_salary + max_salary) / 2
-            
-            # 尝试匹配单个薪资值
-            single_pattern = r'(\d+(?:\.\d+)?)([kK]?|万)'
-            single_match = re.search(single_pattern, salary_str)
-            
-            if single_match:
-                salary = float(single_match.group(1))
-                unit = single_match.group(2)
-                
-                if unit.lower() == 'k' or 'k' in salary_str.lower():
-                    salary *= 1000
-                elif unit == '万':
-                    salary *= 10000
-                
-                return salary
-            
-            return None
-        except Exception:
-            return None
+        return salary_average(parse_salary(salary_str))
     
-    def _preprocess_data(self):
-        """预处理数据，为模型训练做准备"""
+    def _preprocess_data(self, after_id=None, label_encoders=None, scaler=None):
+        """
+        预处理数据，为模型训练做准备，返回(特征, 薪资, 标签编码器, 标准化器, 已读取的最大职位ID)
+        after_id：只读取ID大于该值的职位（增量训练），此时沿用已有的标签编码器和标准化器
+        """
+        incremental = after_id is not None
+        label_encoders = dict(label_encoders or {})
         try:
-            # 从数据库获取所有职位数据
-            job_data = list(JobPosting.objects.all().values())
+            # 分块读取并编码职位数据（增量训练时只读取新入库的职位），数据未变化时直接读取特征缓存
+            features = load_features(after_id)
+            high_water_mark = features.high_water_mark if len(features) else after_id
             
-            # 如果没有足够的数据，使用模拟数据
-            if len(job_data) < 50:
+            # 如果没有足够的数据，使用模拟数据（增量训练时不使用）
+            if len(features) < 50 and not incremental:
                 print("警告: 数据库中职位数据不足，使用模拟数据进行训练")
                 # 生成模拟数据
-                job_data = self._generate_sample_data(200)
-            
-            # 转换为DataFrame
-            df = pd.DataFrame(job_data)
-            
-            # 解析薪资并过滤掉无法解析的记录
-            df['average_salary'] = df['salary'].apply(self._parse_salary)
-            df = df.dropna(subset=['average_salary'])
+                features = encode_records([pd.DataFrame(self._generate_sample_data(200))])
+                high_water_mark = None
             
             # 如果没有有效数据，返回空
-            if df.empty:
-                print("错误: 没有有效的薪资数据用于训练")
-                return [], []
-            
-            # 特征工程
-            # 1. 处理经验特征
-            def process_experience(exp_str):
-                if '应届' in exp_str or '1年以下' in exp_str:
-                    return 0
-                elif '1-3年' in exp_str:
-                    return 1
-                elif '3-5年' in exp_str:
-                    return 2
-                elif '5-10年' in exp_str:
-                    return 3
-                elif '10年以上' in exp_str:
-                    return 4
-                else:
-                    return 0  # 默认值
-            
-            df['experience_encoded'] = df['experience'].apply(process_experience)
-            
-            # 2. 处理学历特征
-            def process_education(edu_str):
-                if '大专' in edu_str:
-                    return 0
-                elif '本科' in edu_str:
-                    return 1
-                elif '硕士' in edu_str:
-                    return 2
-                elif '博士' in edu_str:
-                    return 3
-                else:
-                    return 0  # 默认值
+            if not len(features):
+                if not incremental:
+                    print("错误: 没有有效的薪资数据用于训练")
+                return [], [], label_encoders, scaler, high_water_mark
             
-            df['education_encoded'] = df['education'].apply(process_education)
-            
-            # 3. 对分类特征进行标签编码
-            categorical_features = ['location', 'company_type', 'company_size', 'industry']
-            
-            for feature in categorical_features:
-                if feature not in self.label_encoders:
-                    self.label_encoders[feature] = LabelEncoder()
-                    # 确保训练数据包含该特征的所有可能值
-                    self.label_encoders[feature].fit(df[feature].fillna('Unknown'))
-                
-                # 对数据进行编码，如果遇到未知值则使用默认值0
-                try:
-                    df[feature + '_encoded'] = self.label_encoders[feature].transform(df[feature].fillna('Unknown'))
-                except ValueError:
-                    # 处理编码时遇到的未知值
-                    df[feature + '_encoded'] = 0
-            
-            # 选择用于训练的特征
-            features = ['experience_encoded', 'education_encoded'] + [f + '_encoded' for f in categorical_features]
+            # 对分类特征进行标签编码：取值表已排好序，新建的编码器与LabelEncoder.fit的结果一致
+            for feature in CATEGORICAL_FEATURES:
+                if feature not in label_encoders:
+                    label_encoders[feature] = LabelEncoder().fit(features.vocabularies[feature])
             
             # 准备特征矩阵和目标变量
-            X = df[features].values
-            y = df['average_salary'].values
+            X = features.encode(label_encoders)
+            y = features.salary.astype(np.float64)
             
             # 数据标准化
-            if self.scaler is None:
-                self.scaler = StandardScaler()
-                self.scaler.fit(X)
+            if scaler is None:
+                scaler = StandardScaler()
+                scaler.fit(X)
             
-            X_scaled = self.scaler.transform(X)
+            X_scaled = scaler.transform(X)
             
-            return X_scaled, y
+            return X_scaled, y, label_encoders, scaler, high_water_mark
         except Exception as e:
             print(f"数据预处理出错: {e}")
+            if incremental:
+                return [], [], label_encoders, scaler, after_id
             # 当发生错误时，返回一些模拟数据以确保程序可以继续运行
-            return self._generate_sample_features(), np.array([15000] * 50)
+            return self._generate_sample_features(), np.array([15000] * 50), {}, None, None
     
+    def train(self, full=True):
+        """
+        训练模型并发布为新版本，训练期间服务继续使用当前版本
+        full为False时只使用上次训练之后入库的职位追加新的决策树；
+        没有可增量训练的版本或增量训练次数达到SALARY_MODEL_FULL_REBUILD_EVERY时执行完整训练
+        """
+        if not full:
+            base = self._load_training_base()
+            if base is None:
+                print("没有可增量训练的模型版本，执行完整训练")
+            elif base['metadata'].get('incremental_updates', 0) >= getattr(settings, 'SALARY_MODEL_FULL_REBUILD_EVERY', 10):
+                print("增量训练次数已达上限，执行完整训练")
+            else:
+                return self._train_incremental(base)
+
+        state, metadata = self._train_model()
+        if state.scaler is None or not self.save_model(state, metadata):
+            # 训练失败时的后备模型不发布
+            self._swap(state, self.version)
+            return False
+        # 切换到刚发布的内存映射版本，释放训练得到的完整模型
+        self.load_version(self.version)
+        return True
+
     def _train_model(self):
-        """训练机器学习模型"""
+        """训练机器学习模型，返回新的模型状态"""
         try:
             print("开始训练薪资预测模型...")
             
             # 预处理数据
-            X, y = self._preprocess_data()
+            X, y, label_encoders, scaler, high_water_mark = self._preprocess_data()
             
             # 数据量检查
             if len(X) < 10:
                 print("警告: 数据量不足，无法有效训练模型")
                 # 生成更多模拟数据用于训练
                 X, y = self._generate_sample_features(100), np.random.randint(8000, 30000, 100)
+                high_water_mark = None
             
             # 划分训练集和测试集
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
             
             # 创建并训练随机森林回归模型
-            self.model = RandomForestRegressor(n_estimators=100, random_state=42)
-            self.model.fit(X_train, y_train)
+            model = RandomForestRegressor(n_estimators=100, random_state=42)
+            model.fit(X_train, y_train)
             
             # 评估模型性能
-            y_pred = self.model.predict(X_test)
+            y_pred = model.predict(X_test)
             mse = mean_squared_error(y_test, y_pred)
             r2 = r2_score(y_test, y_pred)
             
             print(f"模型训练完成！MSE: {mse:.2f}, R²: {r2:.2f}")
-            
-            # 保存模型
-            model_data = {
-                'model': self.model,
-                'label_encoders': self.label_encoders,
-                'scaler': self.scaler
-            }
-            joblib.dump(model_data, self.model_path)
-            print(f"模型已保存到: {self.model_path}")
+            metadata = {'high_water_mark': high_water_mark, 'incremental_updates': 0, 'rows': len(y)}
+            return ForestState(model, label_encoders, scaler), metadata
             
         except Exception as e:
             print(f"训练模型时出错: {e}")
             # 即使训练失败，也要创建一个简单的模型作为后备
-            self._create_fallback_model()
+            return self._create_fallback_model(), {}
+
+    def _load_training_base(self):
+        """读取当前版本的完整模型和训练元数据，作为增量训练的基础；不支持增量训练时返回None"""
+        version = current_version(self.artifact_name)
+        if not version:
+            return None
+        path = version_path(self.artifact_name, version)
+        metadata = read_manifest(path) if is_flat_forest(path) else {}
+        if metadata.get('high_water_mark') is None or not os.path.exists(os.path.join(path, ESTIMATOR_FILE)):
+            return None
+        preprocess = joblib.load(os.path.join(path, PREPROCESS_FILE))
+        return {
+            'estimator': joblib.load(os.path.join(path, ESTIMATOR_FILE)),
+            'label_encoders': preprocess.get('label_encoders', {}),
+            'scaler': preprocess.get('scaler'),
+            'metadata': metadata,
+        }
+
+    def _train_incremental(self, base):
+        """使用上次训练之后入库的职位，在原有随机森林上追加新的决策树"""
+        metadata = base['metadata']
+        print(f"开始增量训练薪资预测模型（职位ID > {metadata['high_water_mark']}）...")
+        X, y, label_encoders, scaler, high_water_mark = self._preprocess_data(
+            after_id=metadata['high_water_mark'],
+            label_encoders=base['label_encoders'],
+            scaler=base['scaler'],
+        )
+        if len(y) < getattr(settings, 'SALARY_MODEL_INCREMENTAL_MIN_ROWS', 10):
+            print(f"新增职位数量不足（{len(y)}条），跳过增量训练")
+            return False
+
+        # warm_start时fit只训练新增的决策树，已有的决策树保持不变
+        model = base['estimator']
+        model.set_params(
+            warm_start=True,
+            n_estimators=len(model.estimators_) + getattr(settings, 'SALARY_MODEL_INCREMENTAL_TREES', 10),
+        )
+        model.fit(X, y)
+        print(f"增量训练完成！新增职位 {len(y)} 条，决策树共 {len(model.estimators_)} 棵")
+
+        metadata = {
+            'high_water_mark': high_water_mark,
+            'incremental_updates': metadata.get('incremental_updates', 0) + 1,
+            'rows': metadata.get('rows', 0) + len(y),
+        }
+        if not self.save_model(ForestState(model, label_encoders, scaler), metadata):
+            return False
+        self.load_version(self.version)
+        return True
+
+    @staticmethod
+    def _read_model(path):
+        """从模型文件读取模型状态"""
+        model_data = joblib.load(path)
+        return ForestState(
+            model_data.get('model'), model_data.get('label_encoders', {}), model_data.get('scaler')
+        )
+
+    def _load_version(self, version):
+        path = version_path(self.artifact_name, version)
+        if is_flat_forest(path):
+            mmap_mode = 'r' if getattr(settings, 'SALARY_MODEL_MMAP', True) else None
+            return ForestState(*load_flat_forest(path, mmap_mode=mmap_mode))
+        return self._read_model(os.path.join(path, MODEL_FILE))
             
     def load_model(self):
-        """加载已保存的模型"""
+        """加载已保存的模型：优先加载当前发布的版本，其次是旧版本的模型文件；找不到模型时不训练"""
         try:
+            version = current_version(self.artifact_name)
+            if version:
+                self.load_version(version)
+                return True
             if os.path.exists(self.model_path):
-                model_data = joblib.load(self.model_path)
-                self.model = model_data.get('model')
-                self.label_encoders = model_data.get('label_encoders', {})
-                self.scaler = model_data.get('scaler')
+                self._swap(self._read_model(self.model_path), None)
                 print("成功加载已训练的模型")
                 return True
         except Exception as e:
             print(f"加载模型失败: {e}")
         
-        # 如果没有加载到模型，训练一个新模型
-        print("未找到已训练的模型，开始训练新模型...")
-        self._train_model()
+        # 没有可用的模型时预测使用基于规则的回退逻辑，训练由train_model.py或后台线程完成
+        print("未找到已训练的模型，请运行train_model.py训练模型")
         return False
         
-    def save_model(self):
-        """保存模型"""
+    def save_model(self, state=None, metadata=None):
+        """
+        将训练得到的模型导出为内存映射格式并发布为新版本，metadata记录在manifest.json中
+        开启SALARY_MODEL_SAVE_ESTIMATOR时新版本同时保存完整模型供增量训练使用，旧版本中的完整模型随之删除
+        """
+        state = state or self._state
+        save_estimator = getattr(settings, 'SALARY_MODEL_SAVE_ESTIMATOR', True)
         try:
-            if self.model:
-                model_data = {
-                    'model': self.model,
-                    'label_encoders': self.label_encoders,
-                    'scaler': self.scaler
-                }
-                joblib.dump(model_data, self.model_path)
+            # 只有完整的随机森林模型可以导出（从内存映射格式加载的模型已经发布过）
+            if hasattr(state.model, 'estimators_'):
+                self.version = publish(
+                    self.artifact_name,
+                    lambda path: export_forest(
+                        state.model, state.label_encoders, state.scaler, path, metadata, save_estimator
+                    )
+                )
+                remove_estimators(artifact_root(self.artifact_name), keep=self.version)
+                print(f"模型已保存为版本 {self.version}")
                 return True
         except Exception as e:
             print(f"保存模型失败: {e}")
         return False
         
     def _generate_sample_data(self, count=100):
-        """生成模拟的职位数据用于训练"""
-        import random
-        
-        # 定义可能的取值范围
-        locations = ['北京', '上海', '深圳', '广州', '杭州', '成都', '武汉', '西安', '南京', '其他']
-        experiences = ['应届', '1-3年', '3-5年', '5-10年', '10年以上']
-        educations = ['大专', '本科', '硕士', '博士']
-        company_types = ['互联网', '金融', '人工智能', '医疗健康', '教育培训', '电子商务', '云计算', '软件服务', '游戏', '移动互联网']
-        company_sizes = ['500-999人', '1000-4999人', '5000-9999人', '10000人以上', '20-99人', '100-499人', '少于20人']
-        industries = ['互联网', '金融', '人工智能', '医疗健康', '教育培训', '电子商务', '云计算', '软件服务', '游戏', '移动互联网']
-        
-        sample_data = []
-        for i in range(count):
-            # 随机选择特征值
-            location = random.choice(locations)
-            experience = random.choice(experiences)
-            education = random.choice(educations)
-            company_type = random.choice(company_types)
-            company_size = random.choice(company_sizes)
-            industry = random.choice(industries)
-            
-            # 根据特征值生成合理的薪资范围
-            base_salary = 10000  # 基础薪资
-            
-            # 经验因素
-            exp_factor = {'应届': 0.7, '1-3年': 1.0, '3-5年': 1.5, '5-10年': 2.2, '10年以上': 3.0}[experience]
-            
-            # 学历因素
-            edu_factor = {'大专': 0.9, '本科': 1.0, '硕士': 1.4, '博士': 1.8}[education]
-            
-            # 地点因素
-            loc_factor = {'北京': 1.3, '上海': 1.25, '深圳': 1.2, '广州': 1.1, '杭州': 1.15, '成都': 0.9, '武汉': 0.85, '西安': 0.8, '南京': 0.95, '其他': 0.8}[location]
-            
-            # 行业因素
-            ind_factor = {'互联网': 1.2, '金融': 1.15, '人工智能': 1.3, '医疗健康': 1.05, '教育培训': 0.9, '电子商务': 1.1, '云计算': 1.25, '软件服务': 1.1, '游戏': 1.15, '移动互联网': 1.18}[industry]
-            
-            # 计算薪资并添加一些随机波动
-            salary = base_salary * exp_factor * edu_factor * loc_factor * ind_factor
-            salary = salary * (0.95 + random.random() * 0.1)
-            
-            # 格式化薪资字符串
-            if salary >= 10000:
-                min_salary = int(salary * 0.9 / 10000 * 10) / 10
-                max_salary = int(salary * 1.1 / 10000 * 10) / 10
-                salary_str = f"{min_salary}-{max_salary}万"
-            else:
-                min_salary = int(salary * 0.9 / 1000)
-                max_salary = int(salary * 1.1 / 1000)
-                salary_str = f"{min_salary}-{max_salary}k"
-            
-            # 创建样本数据
-            sample_data.append({
-                'id': i + 1000,  # 确保ID不与现有数据冲突
-                'job_title': f'测试职位{i}',
-                'company_name': f'测试公司{i}',
-                'company_logo': '',
-                'location': location,
-                'experience': experience,
-                'education': education,
-                'salary': salary_str,
-                'company_type': company_type,
-                'company_size': company_size,
-                'industry': industry,
-                'skills': 'Python,Java,SQL'
-            })
-        
-        return sample_data
+        """生成模拟的职位数据用于训练（取值分布和薪资因子见synthetic模块）"""
+        # ID从1000开始，确保不与现有数据冲突
+        return generate_postings(count, start_id=1000).to_dict('records')
         
     def _generate_sample_features(self, count=50):
         """生成模拟的特征数据用于测试"""
@@ -324,60 +300,37 @@ class SalaryPredictionModel:
     def _create_fallback_model(self):
         """创建一个简单的模型作为后备"""
         from sklearn.dummy import DummyRegressor
-        self.model = DummyRegressor(strategy='median')
+        model = DummyRegressor(strategy='median')
         # 使用一些简单的数据拟合模型
         X = np.array([[0, 0, 0, 0, 0, 0], [4, 3, 9, 9, 6, 9]])
         y = np.array([8000, 30000])
-        self.model.fit(X, y)
+        model.fit(X, y)
+        return ForestState(model, {}, None)
     
+    @timed('inference')
     def predict_salary(self, job_info):
         """根据职位信息预测薪资"""
+        # 读取一次当前模型状态，整个预测过程使用同一版本的模型
+        self.check_for_update()
+        state = self._state
         # 回退机制：如果没有训练好的模型，使用基于规则的模拟预测
         try:
             # 尝试从模型进行预测
-            if self.model is not None:
-                # 处理经验特征
-                def process_experience(exp_str):
-                    if '应届' in exp_str or '1年以下' in exp_str:
-                        return 0
-                    elif '1-3年' in exp_str:
-                        return 1
-                    elif '3-5年' in exp_str:
-                        return 2
-                    elif '5-10年' in exp_str:
-                        return 3
-                    elif '10年以上' in exp_str:
-                        return 4
-                    else:
-                        return 0  # 默认值
-                
-                # 处理学历特征
-                def process_education(edu_str):
-                    if '大专' in edu_str:
-                        return 0
-                    elif '本科' in edu_str:
-                        return 1
-                    elif '硕士' in edu_str:
-                        return 2
-                    elif '博士' in edu_str:
-                        return 3
-                    else:
-                        return 0  # 默认值
-                
+            if state.model is not None:
                 # 准备输入特征
                 features = []
-                features.append(process_experience(job_info.get('experience', '')))
-                features.append(process_education(job_info.get('education', '')))
+                features.append(experience_level(job_info.get('experience', '')))
+                features.append(education_level(job_info.get('education', '')))
                 
                 # 对分类特征进行编码
                 categorical_features = ['location', 'company_type', 'company_size', 'industry']
                 for feature in categorical_features:
-                    if feature in self.label_encoders:
+                    if feature in state.label_encoders:
                         try:
                             value = job_info.get(feature, 'Unknown')
                             # 检查值是否在编码器的类别中
-                            if value in self.label_encoders[feature].classes_:
-                                features.append(self.label_encoders[feature].transform([value])[0])
+                            if value in state.label_encoders[feature].classes_:
+                                features.append(state.label_encoders[feature].transform([value])[0])
                             else:
                                 features.append(0)  # 未知值使用默认编码
                         except Exception:
@@ -386,76 +339,40 @@ class SalaryPredictionModel:
                         features.append(0)
                 
                 # 特征标准化
-                if self.scaler is not None:
-                    features_scaled = self.scaler.transform([features])
+                if state.scaler is not None:
+                    features_scaled = state.scaler.transform([features])
                     # 进行预测
-                    predicted_salary = self.model.predict(features_scaled)[0]
+                    predicted_salary = state.model.predict(features_scaled)[0]
                     return max(5000, min(100000, predicted_salary))  # 限制在合理范围内
         except Exception as e:
             print(f"预测薪资时出错: {e}")
         
         # 基于规则的模拟预测（作为回退机制）
         # 根据经验、学历、地点等因素估算薪资
-        base_salary = 10000  # 基础薪资
+        # 因子与模拟训练数据相同（见synthetic模块）
+        base_salary = BASE_SALARY
         
         # 经验因素
-        experience_map = {
-            '应届': 0.7,
-            '1-3年': 1.0,
-            '3-5年': 1.5,
-            '5-10年': 2.2,
-            '10年以上': 3.0
-        }
         exp_key = job_info.get('experience', 'Unknown')
         exp_factor = 1.0
-        for key in experience_map:
+        for key in EXPERIENCE_FACTORS:
             if key in exp_key:
-                exp_factor = experience_map[key]
+                exp_factor = EXPERIENCE_FACTORS[key]
                 break
         
         # 学历因素
-        education_map = {
-            '大专': 0.9,
-            '本科': 1.0,
-            '硕士': 1.4,
-            '博士': 1.8
-        }
         edu_key = job_info.get('education', 'Unknown')
         edu_factor = 1.0
-        for key in education_map:
+        for key in EDUCATION_FACTORS:
             if key in edu_key:
-                edu_factor = education_map[key]
+                edu_factor = EDUCATION_FACTORS[key]
                 break
         
         # 地点因素
-        location_map = {
-            '北京': 1.3,
-            '上海': 1.25,
-            '深圳': 1.2,
-            '广州': 1.1,
-            '杭州': 1.15,
-            '成都': 0.9,
-            '武汉': 0.85,
-            '西安': 0.8,
-            '南京': 0.95,
-            '其他': 0.8
-        }
-        loc_factor = location_map.get(job_info.get('location', 'Unknown'), 1.0)
+        loc_factor = LOCATION_FACTORS.get(job_info.get('location', 'Unknown'), 1.0)
         
         # 行业因素
-        industry_map = {
-            '互联网': 1.2,
-            '金融': 1.15,
-            '人工智能': 1.3,
-            '医疗健康': 1.05,
-            '教育培训': 0.9,
-            '电子商务': 1.1,
-            '云计算': 1.25,
-            '软件服务': 1.1,
-            '游戏': 1.15,
-            '移动互联网': 1.18
-        }
-        ind_factor = industry_map.get(job_info.get('industry', 'Unknown'), 1.0)
+        ind_factor = INDUSTRY_FACTORS.get(job_info.get('industry', 'Unknown'), 1.0)
         
         # 计算最终模拟薪资
         simulated_salary = base_salary * exp_factor * edu_factor * loc_factor * ind_factor
@@ -468,17 +385,17 @@ class SalaryPredictionModel:
     @classmethod
     def get_instance(cls):
         """单例模式获取模型实例"""
-        if cls._instance is None:
-            cls._instance = cls()
-        return cls._instance
+        return cls()
 
 
-def get_model():
-    """获取训练好的薪资预测模型实例"""
+def get_model(train_if_missing=True):
+    """
+    获取训练好的薪资预测模型实例
+    train_if_missing为True且SALARY_MODEL_TRAIN_IF_MISSING开启（默认关闭）时，还没有训练好的模型则在后台训练，当前调用使用基于规则的预测
+    """
     model = SalaryPredictionModel.get_instance()
     
-    # 确保模型已经加载或训练
-    if model.model is None:
-        model.load_model()
+    if train_if_missing and model.model is None and getattr(settings, 'SALARY_MODEL_TRAIN_IF_MISSING', False):
+        model.train_in_background()
     
     return model
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""
+模型版本管理
+训练产生的模型文件按版本保存在 <SALARY_MODEL_ARTIFACT_DIR>/<模型名>/<版本号>/ 目录下，
+<模型名>/CURRENT 文件记录当前版本号。新版本写完后原子地替换CURRENT，
+服务进程定期检查版本号，发现新版本后在后台线程中加载，再一次性替换模型状态的引用，
+预测时只读取一次状态引用，不需要加锁
+"""
+import abc
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_ARTIFACT_DIR = os.path.join(os.path.dirname(__file__), 'model_artifacts')
+
+CURRENT_FILE = 'CURRENT'
+
+
+def _get_setting(name, default):
+    """读取Django配置，未配置Django时返回默认值"""
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+
+def artifact_root(name):
+    """模型的版本目录所在的根目录"""
+    return os.path.join(_get_setting('SALARY_MODEL_ARTIFACT_DIR', DEFAULT_ARTIFACT_DIR), name)
+
+
+def version_path(name, version):
+    """指定版本的模型文件目录"""
+    return os.path.join(artifact_root(name), version)
+
+
+def current_version(name):
+    """读取模型的当前版本号，没有已发布的版本时返回None"""
+    try:
+        with open(os.path.join(artifact_root(name), CURRENT_FILE), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _write_atomic(path, content):
+    """先写入临时文件再重命名，读取方不会看到写了一半的内容"""
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def publish(name, write):
+    """
+    发布模型的新版本，返回版本号
+    write(path)负责把模型文件写入path目录；写入完成后才切换CURRENT，写入失败时不影响当前版本
+    """
+    root = artifact_root(name)
+    os.makedirs(root, exist_ok=True)
+    version = datetime.now().strftime('%Y%m%d%H%M%S%f')
+    tmp_path = os.path.join(root, f'.{version}.tmp')
+    os.makedirs(tmp_path)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, version_path(name, version))
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    _write_atomic(os.path.join(root, CURRENT_FILE), version)
+    prune(name, _get_setting('SALARY_MODEL_KEEP_VERSIONS', 3))
+    return version
+
+
+def prune(name, keep):
+    """只保留最近的keep个版本，当前版本始终保留"""
+    root = artifact_root(name)
+    current = current_version(name)
+    versions = sorted(
+        entry for entry in os.listdir(root)
+        if not entry.startswith('.') and os.path.isdir(os.path.join(root, entry))
+    )
+    for version in versions[:-keep] if keep > 0 else versions:
+        if version != current:
+            shutil.rmtree(os.path.join(root, version), ignore_errors=True)
+
+
+class VersionedModel(abc.ABC):
+    """
+    可热切换版本的模型
+    子类把预测需要的全部数据放在一个不可变的状态对象中（self._state），
+    切换版本只是一次引用赋值；预测方法在开始时读取一次self._state，整个预测过程使用同一个版本
+    """
+    artifact_name = None
+
+    def _init_versioning(self):
+        self.version = None
+        self._check_interval = _get_setting('SALARY_MODEL_CHECK_INTERVAL', 5)
+        self._checked_at = time.monotonic()
+        self._reload_lock = threading.Lock()
+        self._training_lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _load_version(self, version):
+        """加载指定版本的模型文件，返回新的状态对象（由子类实现）"""
+
+    def _swap(self, state, version):
+        """原子地切换到新的模型状态"""
+        self._state = state
+        self.version = version
+
+    def load_version(self, version):
+        """加载并切换到指定版本"""
+        state = self._load_version(version)
+        self._swap(state, version)
+        print(f"{self.artifact_name}模型已切换到版本 {version}")
+
+    def _reload(self, version):
+        try:
+            self.load_version(version)
+        except Exception as e:
+            print(f"加载{self.artifact_name}模型版本 {version} 失败: {e}")
+        finally:
+            self._reload_lock.release()
+
+    def reset_after_fork(self):
+        """
+        在fork出的工作进程中调用（如gunicorn的post_fork）：重新创建锁（fork时父进程中的锁可能正被持有），
+        并让下一次预测立即检查新版本，加载主进程预热之后发布的版本
+        """
+        self._checked_at = 0
+        self._reload_lock = threading.Lock()
+        self._training_lock = threading.Lock()
+
+    def check_for_update(self):
+        """
+        检查是否发布了新版本，每个进程最多每隔SALARY_MODEL_CHECK_INTERVAL秒检查一次
+        发现新版本时在后台线程中加载，当前请求继续使用旧版本
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self._check_interval:
+            return
+        self._checked_at = now
+        version = current_version(self.artifact_name)
+        if version and version != self.version and self._reload_lock.acquire(blocking=False):
+            threading.Thread(target=self._reload, args=(version,), daemon=True).start()
+
+    def train_in_background(self):
+        """在后台线程中训练并发布新版本，已有训练任务在进行时直接返回False"""
+        if not self._training_lock.acquire(blocking=False):
+            return False
+
+        def run():
+            try:
+                self.train()
+            except Exception as e:
+                print(f"后台训练{self.artifact_name}模型失败: {e}")
+            finally:
+                self._training_lock.release()
+
+        threading.Thread(target=run, daemon=True).start()
+        return True
+
+    @property
+    def is_training(self):
+        return self._training_lock.locked()
@@ -20,3 +20,145 @@ class JobPosting(models.Model):
         db_table = 'job_postings'  # 指定对应的数据库表名
         verbose_name = '招聘信息'
         verbose_name_plural = '招聘信息'
+
+
+class DimensionValue(models.Model):
+    """分类属性（工作地点、学历、行业等）的取值字典，name为规范化后的索引键（不区分大小写）"""
+    LOCATION = 1
+    EXPERIENCE = 2
+    EDUCATION = 3
+    COMPANY_TYPE = 4
+    COMPANY_SIZE = 5
+    INDUSTRY = 6
+    DIMENSION_CHOICES = [
+        (LOCATION, '工作地点'),
+        (EXPERIENCE, '工作经验'),
+        (EDUCATION, '学历要求'),
+        (COMPANY_TYPE, '公司类型'),
+        (COMPANY_SIZE, '公司规模'),
+        (INDUSTRY, '行业'),
+    ]
+
+    dimension = models.PositiveSmallIntegerField(choices=DIMENSION_CHOICES, verbose_name='属性')
+    name = models.CharField(max_length=255, verbose_name='索引键')
+    display_name = models.CharField(max_length=255, verbose_name='取值')
+
+    class Meta:
+        db_table = 'job_dimension_values'
+        verbose_name = '分类属性取值'
+        verbose_name_plural = '分类属性取值'
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'name'], name='uniq_dimension_name'),
+        ]
+
+
+def _dimension_key(verbose_name):
+    """规范化表中指向取值字典的整数外键，带索引，用于按分类属性过滤"""
+    return models.ForeignKey(
+        DimensionValue,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=verbose_name,
+    )
+
+
+class NormalizedPosting(models.Model):
+    """招聘信息的规范化数据，在数据入库时由规范化流程生成，用于建立索引和高效过滤"""
+    posting = models.OneToOneField(
+        JobPosting,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        db_constraint=False,  # job_postings表不由Django管理，不创建数据库外键约束
+        related_name='normalized',
+        verbose_name='招聘信息',
+    )
+    salary_min = models.IntegerField(null=True, blank=True, db_index=True, verbose_name='最低月薪(元)')
+    salary_max = models.IntegerField(null=True, blank=True, db_index=True, verbose_name='最高月薪(元)')
+    salary_avg = models.IntegerField(null=True, blank=True, db_index=True, verbose_name='平均月薪(元)')
+    # 分类属性的取值编号（job_dimension_values）
+    location_key = _dimension_key('工作地点')
+    experience_key = _dimension_key('工作经验')
+    education_key = _dimension_key('学历要求')
+    company_type_key = _dimension_key('公司类型')
+    company_size_key = _dimension_key('公司规模')
+    industry_key = _dimension_key('行业')
+
+    class Meta:
+        db_table = 'job_posting_normalized'
+        verbose_name = '招聘信息规范化数据'
+        verbose_name_plural = '招聘信息规范化数据'
+
+
+class Skill(models.Model):
+    """技能标签，name为规范化后的索引键（不区分大小写）"""
+    name = models.CharField(max_length=100, unique=True, verbose_name='索引键')
+    display_name = models.CharField(max_length=100, verbose_name='技能名称')
+
+    class Meta:
+        db_table = 'job_skills'
+        verbose_name = '技能标签'
+        verbose_name_plural = '技能标签'
+
+
+class PostingSkill(models.Model):
+    """职位与技能标签的关联（技能倒排索引）"""
+    posting = models.ForeignKey(
+        JobPosting,
+        on_delete=models.CASCADE,
+        db_constraint=False,  # job_postings表不由Django管理，不创建数据库外键约束
+        related_name='skill_links',
+        verbose_name='招聘信息',
+    )
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='posting_links', verbose_name='技能标签')
+
+    class Meta:
+        db_table = 'job_posting_skills'
+        verbose_name = '职位技能'
+        verbose_name_plural = '职位技能'
+        constraints = [
+            # 以技能在前的联合唯一索引作为倒排表：按技能查找职位列表
+            models.UniqueConstraint(fields=['skill', 'posting'], name='uniq_skill_posting'),
+        ]
+
+
+class PostingNgram(models.Model):
+    """职位名称、公司名称的二元组（bigram）索引，用于加速中文子串搜索"""
+    JOB_TITLE = 1
+    COMPANY_NAME = 2
+    FIELD_CHOICES = [
+        (JOB_TITLE, '职位名称'),
+        (COMPANY_NAME, '公司名称'),
+    ]
+
+    field = models.PositiveSmallIntegerField(choices=FIELD_CHOICES, verbose_name='字段')
+    gram = models.CharField(max_length=2, verbose_name='二元组')
+    posting = models.ForeignKey(
+        JobPosting,
+        on_delete=models.CASCADE,
+        db_constraint=False,  # job_postings表不由Django管理，不创建数据库外键约束
+        related_name='ngrams',
+        verbose_name='招聘信息',
+    )
+
+    class Meta:
+        db_table = 'job_posting_ngrams'
+        verbose_name = '职位文本索引'
+        verbose_name_plural = '职位文本索引'
+        constraints = [
+            # 以(字段, 二元组)在前的联合唯一索引作为倒排表
+            models.UniqueConstraint(fields=['field', 'gram', 'posting'], name='uniq_field_gram_posting'),
+        ]
+
+
+class DataVersion(models.Model):
+    """数据版本号，招聘信息入库或删除后递增，用于使各进程中的查询缓存失效"""
+    name = models.CharField(max_length=50, unique=True, verbose_name='名称')
+    version = models.BigIntegerField(default=0, verbose_name='版本号')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        db_table = 'job_data_versions'
+        verbose_name = '数据版本'
+        verbose_name_plural = '数据版本'
@@ -0,0 +1,49 @@
+"""
+N-gram子串索引
+将职位名称、公司名称拆分为二元组建立倒排表，子串搜索时先通过二元组求出候选职位，
+再对候选职位进行icontains校验，避免对全表进行LIKE '%...%'扫描
+"""
+import re
+import unicodedata
+
+from django.db.models import Count
+
+from .models import PostingNgram
+
+NGRAM_SIZE = 2
+
+# 建立索引的字段及对应的字段编号
+INDEXED_FIELDS = {
+    'job_title': PostingNgram.JOB_TITLE,
+    'company_name': PostingNgram.COMPANY_NAME,
+}
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """规范化文本：全角转半角、合并空白、不区分大小写"""
+    return _WHITESPACE_RE.sub(' ', unicodedata.normalize('NFKC', text or '')).strip().casefold()
+
+
+def extract_ngrams(text):
+    """提取文本中去重后的二元组，文本长度不足时返回空集合"""
+    text = normalize_text(text)
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def candidate_posting_ids(name, term):
+    """
+    返回包含搜索词全部二元组的职位ID子查询，搜索词过短无法使用索引时返回None
+    候选结果可能存在误报（二元组都出现但不相邻），调用方需要再用icontains校验
+    """
+    grams = extract_ngrams(term)
+    if not grams:
+        return None
+    return (
+        PostingNgram.objects.filter(field=INDEXED_FIELDS[name], gram__in=grams)
+        .values('posting_id')
+        .annotate(matched=Count('gram'))
+        .filter(matched=len(grams))
+        .values('posting_id')
+    )
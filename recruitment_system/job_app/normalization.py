@@ -0,0 +1,217 @@
+"""
+招聘信息规范化流程
+在数据入库时解析原始文本字段，并写入规范化表：
+- 薪资：job_posting_normalized表中的数值列
+- 技能：job_skills / job_posting_skills倒排索引
+- 职位名称、公司名称：job_posting_ngrams二元组索引
+- 工作地点、学历、行业等分类属性：job_dimension_values取值字典，编号写入job_posting_normalized表
+文本解析（parse_rows）与数据库写入（write_parsed）分开，解析部分不访问数据库，
+批量导入时可以放到子进程中并行执行
+"""
+from collections import namedtuple
+
+import numpy as np
+from django.db import connection, transaction
+
+from .dimensions import DIMENSION_FIELDS, KEY_FIELDS, normalize_value
+from .models import DimensionValue, NormalizedPosting, PostingNgram, PostingSkill, Skill
+from .ngram_index import INDEXED_FIELDS, extract_ngrams
+from .salary_parser import parse_salary_array
+from .skill_parser import tokenize_skills
+from .versioning import schedule_bump
+
+# 规范化时需要读取的原始字段
+SOURCE_FIELDS = ['id', 'job_title', 'company_name', 'salary', 'skills'] + list(DIMENSION_FIELDS)
+
+# 规范化表中需要更新的字段
+NORMALIZED_FIELDS = ['salary_min', 'salary_max', 'salary_avg'] + list(KEY_FIELDS.values())
+
+
+def _to_int(value):
+    """将NaN转换为None，其余数值转换为整数"""
+    return None if np.isnan(value) else int(value)
+
+
+# 一批招聘信息的解析结果，只包含基本类型，可以在进程间传递
+# salaries：[(职位ID, 最低, 最高, 平均)]；skills：{职位ID: [(索引键, 显示名称)]}；ngrams：[(字段编号, 二元组, 职位ID)]
+# dimensions：与ids对应，每个职位按DIMENSION_FIELDS顺序的(索引键, 显示名称)元组，空值为None
+ParsedBatch = namedtuple('ParsedBatch', ['ids', 'salaries', 'skills', 'ngrams', 'dimensions'])
+
+# 二元组索引字段在SOURCE_FIELDS中的位置
+_NGRAM_COLUMNS = [(SOURCE_FIELDS.index(name), field) for name, field in INDEXED_FIELDS.items()]
+
+# 分类属性字段在SOURCE_FIELDS中的位置
+_DIMENSION_COLUMNS = [SOURCE_FIELDS.index(name) for name in DIMENSION_FIELDS]
+
+
+def conflict_target(*fields):
+    """
+    upsert时的冲突字段
+    MySQL的ON DUPLICATE KEY UPDATE不能指定冲突字段，此时返回None
+    """
+    return list(fields) if connection.features.supports_update_conflicts_with_target else None
+
+
+def parse_rows(rows):
+    """解析一批按SOURCE_FIELDS顺序排列的原始字段元组，不访问数据库"""
+    ids = [row[0] for row in rows]
+    salary_min, salary_max = parse_salary_array([row[3] for row in rows])
+    salary_avg = np.round((salary_min + salary_max) / 2)
+    salaries = [
+        (posting_id, _to_int(salary_min[i]), _to_int(salary_max[i]), _to_int(salary_avg[i]))
+        for i, posting_id in enumerate(ids)
+    ]
+    skills = {row[0]: tokenize_skills(row[4]) for row in rows}
+    ngrams = [
+        (field, gram, row[0])
+        for row in rows
+        for column, field in _NGRAM_COLUMNS
+        for gram in extract_ngrams(row[column])
+    ]
+    dimensions = [tuple(normalize_value(row[column]) for column in _DIMENSION_COLUMNS) for row in rows]
+    return ParsedBatch(ids, salaries, skills, ngrams, dimensions)
+
+
+def posting_rows(postings):
+    """将招聘信息对象转换为parse_rows需要的元组"""
+    return [tuple(getattr(posting, name) for name in SOURCE_FIELDS) for posting in postings]
+
+
+def insert_rows(model, fields, rows, batch_size=1000):
+    """
+    使用executemany批量插入元组，跳过模型实例化和逐行的SQL编译
+    用于索引表这类行数是职位数若干倍的表，fields为模型字段名
+    """
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in fields)
+    sql = f"INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({', '.join(['%s'] * len(fields))})"
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[start:start + batch_size])
+
+
+def get_skill_ids(skills, batch_size=1000):
+    """根据{索引键: 显示名称}获取技能ID，不存在的技能会被创建，返回{索引键: ID}"""
+    if not skills:
+        return {}
+    Skill.objects.bulk_create(
+        [Skill(name=name, display_name=display) for name, display in skills.items()],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    skill_ids = {}
+    names = list(skills)
+    for start in range(0, len(names), batch_size):
+        skill_ids.update(
+            Skill.objects.filter(name__in=names[start:start + batch_size]).values_list('name', 'id')
+        )
+    return skill_ids
+
+
+def sync_posting_skills(tokens, batch_size=1000):
+    """根据{职位ID: [(索引键, 显示名称)]}重建一批职位的技能倒排索引"""
+    skills = {}
+    for posting_tokens in tokens.values():
+        for name, display in posting_tokens:
+            skills.setdefault(name, display)
+    skill_ids = get_skill_ids(skills, batch_size)
+
+    PostingSkill.objects.filter(posting_id__in=list(tokens)).delete()
+    insert_rows(
+        PostingSkill,
+        ['posting', 'skill'],
+        [
+            (posting_id, skill_ids[name])
+            for posting_id, posting_tokens in tokens.items()
+            for name, _ in posting_tokens
+        ],
+        batch_size,
+    )
+
+
+def get_dimension_ids(values, batch_size=1000):
+    """
+    根据{属性编号: {索引键: 显示名称}}获取取值编号，不存在的取值会被创建
+    返回{(属性编号, 索引键): 取值编号}
+    """
+    DimensionValue.objects.bulk_create(
+        [
+            DimensionValue(dimension=dimension, name=name, display_name=display)
+            for dimension, names in values.items()
+            for name, display in names.items()
+        ],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    value_ids = {}
+    for dimension, names in values.items():
+        names = list(names)
+        for start in range(0, len(names), batch_size):
+            value_ids.update(
+                ((dimension, name), value_id)
+                for name, value_id in DimensionValue.objects.filter(
+                    dimension=dimension, name__in=names[start:start + batch_size]
+                ).values_list('name', 'id')
+            )
+    return value_ids
+
+
+def dimension_keys(dimensions, batch_size=1000):
+    """将每个职位的分类属性取值转换为取值编号，返回与输入对应的编号元组列表"""
+    values = {}
+    for row in dimensions:
+        for dimension, value in zip(DIMENSION_FIELDS.values(), row):
+            if value is not None:
+                values.setdefault(dimension, {}).setdefault(*value)
+    value_ids = get_dimension_ids(values, batch_size)
+    return [
+        tuple(
+            None if value is None else value_ids[(dimension, value[0])]
+            for dimension, value in zip(DIMENSION_FIELDS.values(), row)
+        )
+        for row in dimensions
+    ]
+
+
+def sync_posting_ngrams(ids, ngrams, batch_size=1000):
+    """重建一批职位的二元组索引"""
+    PostingNgram.objects.filter(posting_id__in=ids).delete()
+    insert_rows(PostingNgram, ['field', 'gram', 'posting'], ngrams, batch_size)
+
+
+def write_parsed(parsed, batch_size=1000):
+    """
+    将解析结果写入规范化表和索引，已存在的数据会被覆盖
+    调用方负责开启事务；事务提交后使查询缓存失效
+    """
+    key_columns = [f'{name}_id' for name in KEY_FIELDS.values()]
+    NormalizedPosting.objects.bulk_create(
+        [
+            NormalizedPosting(
+                posting_id=posting_id, salary_min=low, salary_max=high, salary_avg=avg,
+                **dict(zip(key_columns, keys)),
+            )
+            for (posting_id, low, high, avg), keys in zip(parsed.salaries, dimension_keys(parsed.dimensions, batch_size))
+        ],
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=conflict_target('posting'),
+        update_fields=NORMALIZED_FIELDS,
+    )
+    sync_posting_skills(parsed.skills, batch_size)
+    sync_posting_ngrams(parsed.ids, parsed.ngrams, batch_size)
+    # 数据已变化，事务提交后使查询缓存失效
+    schedule_bump()
+
+
+def normalize_postings(postings, batch_size=1000):
+    """批量规范化招聘信息，已存在的规范化数据会被覆盖，返回处理的记录数"""
+    postings = list(postings)
+    if not postings:
+        return 0
+    parsed = parse_rows(posting_rows(postings))
+    with transaction.atomic():
+        write_parsed(parsed, batch_size)
+    return len(postings)
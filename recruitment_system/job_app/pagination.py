@@ -0,0 +1,301 @@
+"""
+分页
+- JobPostingPagination：页码分页，总数按过滤条件缓存，结果集很大时使用数据库估算值
+- JobPostingCursorPagination：基于(排序值, 主键)的游标分页，任意深度的翻页代价相同
+两种分页都把定位当前页（page_queryset，返回不执行的查询集）和保存查询结果（set_page）分开，
+异步视图在线程中定位当前页后通过异步ORM读取记录
+"""
+import base64
+import json
+import logging
+import math
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .filters import filter_signature
+from .versioning import get_data_version
+
+logger = logging.getLogger(__name__)
+
+def _count_cache_key(queryset):
+    """根据过滤条件和数据版本号生成总数缓存的键，相同的过滤条件对应相同的键（与查询的列无关）"""
+    return f'job_count:{get_data_version()}:{filter_signature(queryset)}'
+
+
+def estimate_count(queryset):
+    """通过数据库执行计划估算结果行数，数据库不支持时返回None"""
+    connection = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute(f'EXPLAIN {sql}', params)
+                columns = [column[0].lower() for column in cursor.description]
+                estimate = 1.0
+                for row in cursor.fetchall():
+                    plan = dict(zip(columns, row))
+                    if plan.get('select_type') in ('SIMPLE', 'PRIMARY') and plan.get('rows'):
+                        estimate *= plan['rows'] * float(plan.get('filtered') or 100) / 100
+                return int(estimate)
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        logger.warning('估算结果行数失败: %s', e)
+    return None
+
+
+def get_cached_count(queryset):
+    """
+    获取结果总数，返回(总数, 是否为估算值)
+    同一过滤条件的总数会被缓存；估算行数超过阈值时直接使用估算值，避免对大结果集执行COUNT(*)
+    """
+    try:
+        key = _count_cache_key(queryset)
+    except EmptyResultSet:
+        # 过滤条件不可能匹配任何记录（如queryset.none()、空的IN列表），不需要查询
+        return 0, False
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    queryset = queryset.order_by()
+    threshold = getattr(settings, 'JOB_COUNT_ESTIMATE_THRESHOLD', 100000)
+    estimate = estimate_count(queryset)
+    if estimate is not None and estimate > threshold:
+        result = (estimate, True)
+    else:
+        result = (queryset.count(), False)
+
+    cache.set(key, result, getattr(settings, 'JOB_COUNT_CACHE_TIMEOUT', 300))
+    return result
+
+
+class CachedCountPaginator(Paginator):
+    """总数使用缓存或估算值的分页器"""
+    count_estimated = False
+
+    @cached_property
+    def count(self):
+        count, self.count_estimated = get_cached_count(self.object_list)
+        return count
+
+
+class JobPostingPagination(PageNumberPagination):
+    """招聘信息页码分页"""
+    django_paginator_class = CachedCountPaginator
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.set_page(list(page_queryset))
+
+    def page_queryset(self, queryset, request, view=None):
+        """计算总数并校验页码，返回当前页的查询集（不执行查询），不分页时返回None"""
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        if paginator.num_pages > 1 and self.template is not None:
+            # 可浏览API显示分页控件
+            self.display_page_controls = True
+        return self.page.object_list
+
+    def set_page(self, results):
+        """保存当前页查询到的记录"""
+        self.page.object_list = results
+        return results
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if getattr(self.page.paginator, 'count_estimated', False):
+            # 总数为估算值时告知调用方
+            response.data['count_estimated'] = True
+        return response
+
+
+def _is_number(value, types):
+    """游标中的值是否为指定类型的有限数值，且在数据库整数范围内（bool是int的子类，需要单独排除）"""
+    if isinstance(value, bool) or not isinstance(value, types):
+        return False
+    return math.isfinite(value) and abs(value) < 2 ** 63
+
+
+class JobPostingCursorPagination(BasePagination):
+    """
+    招聘信息游标分页
+    游标记录上一页边界处的(排序值, 主键)，翻页时使用WHERE条件定位，不使用OFFSET
+    没有排序值的记录（如面议职位没有平均月薪）无论升序降序都排在最后，按主键排序，与页码分页的总数一致
+    """
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering_query_param = 'ordering'
+
+    # 可用的排序方式：参数值 -> 排序字段，参数值前加'-'表示降序
+    orderings = {
+        'id': 'pk',
+        'salary': 'normalized__salary_avg',
+    }
+    # 游标中排序值的类型：排序方式 -> (允许的类型, 是否可以为空)
+    cursor_value_types = {
+        'id': ((int,), False),
+        'salary': ((int, float), True),
+    }
+
+    invalid_cursor_message = '无效的游标'
+    invalid_ordering_message = '无效的排序方式'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request, view)))
+
+    def page_queryset(self, queryset, request, view=None):
+        """解析游标并计算总数，返回当前页（多取一条用于判断是否还有下一页）的查询集，不执行查询"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        ordering = request.query_params.get(self.ordering_query_param, 'id')
+        self.descending = ordering.startswith('-')
+        field = self.orderings.get(ordering.lstrip('-'))
+        if field is None:
+            raise ParseError(self.invalid_ordering_message)
+
+        cursor = self.decode_cursor(request, ordering.lstrip('-'))
+        reverse = cursor is not None and cursor['reverse']
+
+        self.count, self.count_estimated = get_cached_count(queryset)
+        queryset = queryset.annotate(keyset_value=F(field))
+
+        # 向前翻页时反向排序，取出后再翻转；空值在正向翻页时排在最后，反向翻页时排在最前
+        descending = self.descending != reverse
+        direction = 'lt' if descending else 'gt'
+        nullable = field != 'pk'
+        if cursor is not None:
+            if cursor['value'] is None:
+                # 边界记录没有排序值：之后只有主键更大（或更小）的空值记录，反向翻页时还有全部非空记录
+                condition = Q(keyset_value__isnull=True, **{f'pk__{direction}': cursor['pk']})
+                if reverse:
+                    condition |= Q(keyset_value__isnull=False)
+            else:
+                condition = (
+                    Q(**{f'keyset_value__{direction}': cursor['value']})
+                    | Q(keyset_value=cursor['value'], **{f'pk__{direction}': cursor['pk']})
+                )
+                if nullable and not reverse:
+                    condition |= Q(keyset_value__isnull=True)
+            queryset = queryset.filter(condition)
+        value_order = F('keyset_value').desc if descending else F('keyset_value').asc
+        value_order = value_order(nulls_first=True) if reverse else value_order(nulls_last=True)
+        prefix = '-' if descending else ''
+        self.reverse, self.has_cursor = reverse, cursor is not None
+        return queryset.order_by(value_order, f'{prefix}pk')[:self.page_size + 1]
+
+    def set_page(self, results):
+        """根据查询到的记录（比每页条数多取一条）确定当前页和前后翻页链接"""
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.has_cursor
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def decode_cursor(self, request, ordering='id'):
+        """解析游标参数并校验主键和排序值的类型，没有游标时返回None"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            cursor = {'value': data['v'], 'pk': data['pk'], 'reverse': bool(data.get('r'))}
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise ParseError(self.invalid_cursor_message)
+
+        value_types, nullable = self.cursor_value_types[ordering]
+        valid_value = nullable if cursor['value'] is None else _is_number(cursor['value'], value_types)
+        if not valid_value or not _is_number(cursor['pk'], (int,)):
+            raise ParseError(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, instance, reverse):
+        """将边界记录的位置编码为游标链接"""
+        data = {'v': instance.keyset_value, 'pk': instance.pk}
+        if reverse:
+            data['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ])
+        if self.count_estimated:
+            payload['count_estimated'] = True
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
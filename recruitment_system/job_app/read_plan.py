@@ -0,0 +1,117 @@
+"""
+快速读取路径
+列表、全量数据接口不逐条调用序列化器：根据序列化器字段预先生成字段计划（输出字段名、查询路径、取值转换），
+全量数据直接读取values_list元组，分页结果直接读取模型属性，再按计划组装为字典，输出与序列化器完全相同
+"""
+import threading
+
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework import serializers
+from rest_framework.fields import empty
+
+# 数据库返回值与to_representation结果相同、不需要转换的字段类型
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField)
+
+# 每次从数据库读取的记录数
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def field_plan(serializer):
+    """根据序列化器字段生成(输出字段名, 查询路径)列表，如salary_avg -> normalized__salary_avg"""
+    return [(name, field.source.replace('.', '__')) for name, field in serializer.fields.items()]
+
+
+def _converter(field):
+    """字段的取值转换函数，不需要转换时返回None"""
+    return None if type(field) in PASSTHROUGH_FIELDS else field.to_representation
+
+
+def _supported(field):
+    """只支持直接读取列值的字段：关联字段、嵌套序列化器、SerializerMethodField等使用序列化器"""
+    if field.write_only or field.source == '*' or isinstance(field, (
+        serializers.BaseSerializer, serializers.RelatedField, serializers.ManyRelatedField,
+        serializers.SerializerMethodField, serializers.HiddenField,
+    )):
+        return False
+    # 跨关联的字段在关联记录不存在时输出默认值，只支持默认值为None的字段（与LEFT JOIN的结果一致）
+    return '.' not in field.source or (field.default is not empty and field.default is None)
+
+
+def _attribute_getter(source):
+    """按source读取模型属性，关联记录不存在时返回None"""
+    attrs = source.split('.')
+    if len(attrs) == 1:
+        return lambda instance: getattr(instance, source)
+
+    def get(instance):
+        try:
+            for attr in attrs:
+                instance = getattr(instance, attr)
+                if instance is None:
+                    return None
+        except ObjectDoesNotExist:
+            return None
+        return instance
+    return get
+
+
+class ReadPlan:
+    """序列化器的字段计划"""
+
+    def __init__(self, serializer):
+        fields = serializer.fields
+        self.names = tuple(fields)
+        self.paths = tuple(path for _, path in field_plan(serializer))
+        self.getters = tuple(_attribute_getter(field.source) for field in fields.values())
+        self.converters = tuple(
+            (index, convert) for index, convert in enumerate(_converter(field) for field in fields.values())
+            if convert is not None
+        )
+
+    def values(self, queryset):
+        """只查询计划中各字段的values_list查询集"""
+        return queryset.values_list(*self.paths)
+
+    def to_dict(self, values):
+        """将一条记录的取值元组转换为输出字典"""
+        if self.converters:
+            values = list(values)
+            for index, convert in self.converters:
+                if values[index] is not None:
+                    values[index] = convert(values[index])
+        return dict(zip(self.names, values))
+
+    def rows(self, queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+        """遍历查询集，直接读取values_list元组，不实例化模型对象"""
+        to_dict = self.to_dict
+        for values in self.values(queryset).iterator(chunk_size=chunk_size):
+            yield to_dict(values)
+
+    def serialize(self, queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+        return list(self.rows(queryset, chunk_size))
+
+    def serialize_instances(self, instances):
+        """将已查询的模型对象（如分页结果）转换为输出字典"""
+        getters = self.getters
+        return [self.to_dict(tuple(get(instance) for get in getters)) for instance in instances]
+
+
+_plans = {}
+_lock = threading.Lock()
+
+
+def read_plan(serializer_class, fields=None):
+    """
+    序列化器类的字段计划（每个类和字段集只生成一次），序列化器包含不支持的字段时返回None
+    fields为稀疏字段集（字段名元组），序列化器需要支持fields参数
+    """
+    key = (serializer_class, fields)
+    try:
+        return _plans[key]
+    except KeyError:
+        pass
+    serializer = serializer_class() if fields is None else serializer_class(fields=fields)
+    plan = ReadPlan(serializer) if all(_supported(field) for field in serializer.fields.values()) else None
+    with _lock:
+        _plans[key] = plan
+    return plan
@@ -0,0 +1,98 @@
+"""
+自定义渲染器
+用于内容协商，通过 ?format=<格式> 或 Accept 请求头选择输出格式
+"""
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:  # 未安装msgpack时不提供MessagePack格式
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # 未安装orjson时使用标准库json编码（系统检查job_app.W001会给出警告）
+    orjson = None
+
+# orjson不能直接编码的类型（日期时间、Decimal等）交给DRF的JSONEncoder处理，与标准库json的输出相同
+_default = JSONEncoder().default
+
+
+def _dumps_fast(data):
+    """使用orjson编码为紧凑的UTF-8 JSON，无法编码时（如超出64位的整数）返回None"""
+    try:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    except orjson.JSONEncodeError:
+        return None
+
+
+def encode_json(data):
+    """将数据编码为紧凑的UTF-8 JSON"""
+    if orjson is not None:
+        encoded = _dumps_fast(data)
+        if encoded is not None:
+            return encoded
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    使用orjson的JSON渲染器，输出与JSONRenderer逐字节相同（包括U+2028、U+2029的转义）
+    orjson与标准库json对绝对值小于1e-4或不小于1e16的浮点数格式不同，只用于取值为整数和字符串的招聘信息接口；
+    需要缩进输出（如可浏览API）、未安装orjson或orjson无法编码时使用JSONRenderer
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact \
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        encoded = _dumps_fast(data)
+        if encoded is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return encoded.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class NDJSONRenderer(BaseRenderer):
+    """NDJSON渲染器（?format=ndjson 或 Accept: application/x-ndjson）"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # 列表逐行输出，其余数据（如错误信息）输出为单行
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(encode_json(row) + b'\n' for row in rows)
+
+
+class ColumnarJSONRenderer(BaseRenderer):
+    """列式JSON渲染器（?format=columnar 或 Accept: application/vnd.columnar+json）"""
+    media_type = 'application/vnd.columnar+json'
+    format = 'columnar'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return encode_json(data)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack渲染器（?format=msgpack 或 Accept: application/msgpack）"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, use_bin_type=True, default=str)
+
+
+# 列式数据可用的渲染器（MessagePack需要安装msgpack）
+COLUMNAR_RENDERERS = [ColumnarJSONRenderer] + ([MessagePackRenderer] if msgpack is not None else [])
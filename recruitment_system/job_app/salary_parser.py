@@ -0,0 +1,122 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# 预编译的正则表达式
+# 数值及其紧随的单位，如'15k'、'1.5万'、'8千'、'15000'
+_AMOUNT_RE = re.compile(r'(\d+(?:\.\d+)?)\s*([kK千万wW]?)')
+# 年终奖薪数，如'15-25K·13薪'中的'·13薪'，不属于月薪数值
+_BONUS_RE = re.compile(r'[·•*xX]\s*\d+\s*薪')
+# 计薪周期
+_YEARLY_RE = re.compile(r'/\s*年|每年|年薪')
+_DAILY_RE = re.compile(r'/\s*[天日]|每[天日]|日薪')
+# 月薪的常见格式（整串匹配），批量解析时通过pandas的str.extract提取：
+# 数值[单位][-数值[单位]][元][/月][·N薪]，如'15-25K'、'15-25K·13薪'、'1-1.5万'、'8千-1万'、'8000-12000元/月'、'5k'
+_COMMON_PATTERN = (
+    r'^\s*(\d+(?:\.\d+)?)\s*([kK千万wW]?)\s*(?:[-~～至到]\s*(\d+(?:\.\d+)?)\s*([kK千万wW]?))?'
+    r'\s*元?\s*(?:/\s*月)?\s*(?:[·•*xX]\s*\d+\s*薪)?\s*$'
+)
+
+# 单位换算（统一换算为元）
+UNIT_MULTIPLIERS = {
+    '': 1,
+    'k': 1000,
+    'K': 1000,
+    '千': 1000,
+    '万': 10000,
+    'w': 10000,
+    'W': 10000,
+}
+
+# 每月计薪天数，用于日薪换算为月薪
+WORKDAYS_PER_MONTH = 21.75
+
+# 解析结果缓存的最大条目数，不同的薪资字符串通常只有几千种
+MEMO_SIZE = 16384
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def parse_salary(salary_str):
+    """解析薪资字符串，返回(最低月薪, 最高月薪)，单位为元/月；无法解析时返回None"""
+    if not salary_str or not isinstance(salary_str, str):
+        return None
+
+    salary_str = _BONUS_RE.sub('', salary_str)
+    matches = _AMOUNT_RE.findall(salary_str)
+    if not matches:
+        return None
+
+    # 只取前两个数值作为薪资范围
+    matches = matches[:2]
+
+    # 没有单位的数值沿用其后数值的单位，如'15-25k'中的15按k计算
+    units = [unit for _, unit in matches]
+    for i in range(len(units) - 2, -1, -1):
+        if not units[i]:
+            units[i] = units[i + 1]
+
+    values = [float(value) * UNIT_MULTIPLIERS[unit] for (value, _), unit in zip(matches, units)]
+
+    # 统一换算为月薪
+    if _YEARLY_RE.search(salary_str):
+        values = [value / 12 for value in values]
+    elif _DAILY_RE.search(salary_str):
+        values = [value * WORKDAYS_PER_MONTH for value in values]
+
+    return int(round(min(values))), int(round(max(values)))
+
+
+def salary_average(salary_range):
+    """根据薪资范围计算平均月薪"""
+    if salary_range is None:
+        return None
+    return int(round((salary_range[0] + salary_range[1]) / 2))
+
+
+def _parse_common(strings):
+    """
+    向量化解析常见格式的月薪字符串（pandas Series），返回(最低月薪数组, 最高月薪数组)
+    结果与parse_salary相同；不是常见格式或不是字符串的位置为NaN
+    """
+    try:
+        parts = strings.str.extract(_COMMON_PATTERN)
+    except AttributeError:
+        # 取值中没有字符串（.str访问器不可用）
+        return np.full(len(strings), np.nan), np.full(len(strings), np.nan)
+
+    # 与parse_salary相同，没有单位的数值沿用其后数值的单位
+    first_unit = parts[1].where(parts[1] != '', parts[3]).fillna('')
+    first = parts[0].astype(float) * first_unit.map(UNIT_MULTIPLIERS).astype(float)
+    second = parts[2].astype(float) * parts[3].fillna('').map(UNIT_MULTIPLIERS).astype(float)
+    second = second.fillna(first)
+    return np.round(np.fmin(first, second).to_numpy()), np.round(np.fmax(first, second).to_numpy())
+
+
+def parse_salary_array(values):
+    """
+    批量解析薪资字符串（pandas Series、NumPy数组或列表）
+    返回(最低月薪数组, 最高月薪数组)，无法解析的位置为NaN，结果与逐个调用parse_salary相同
+    取值先去重；常见格式（见_COMMON_PATTERN）通过正则表达式向量化提取，其余格式（年薪、日薪、带文字说明等）逐个调用parse_salary
+    """
+    # 先对取值去重，每种薪资字符串只解析一次，再按编码广播回所有行
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+
+    # 末尾多留一个NaN，供缺失值（编码为-1）索引
+    unique_min = np.full(len(uniques) + 1, np.nan)
+    unique_max = np.full(len(uniques) + 1, np.nan)
+    unique_min[:-1], unique_max[:-1] = _parse_common(pd.Series(uniques, dtype=object))
+
+    for i in np.flatnonzero(np.isnan(unique_min[:-1])):
+        salary_range = parse_salary(uniques[i])
+        if salary_range is not None:
+            unique_min[i], unique_max[i] = salary_range
+
+    return unique_min[codes], unique_max[codes]
+
+
+def salary_average_array(values):
+    """批量计算平均月薪，无法解析的位置为NaN"""
+    salary_min, salary_max = parse_salary_array(values)
+    return np.round((salary_min + salary_max) / 2)
@@ -2,6 +2,18 @@ from rest_framework import serializers
 from .models import JobPosting
 
 class JobPostingSerializer(serializers.ModelSerializer):
+    # 规范化后的薪资数值（元/月），无法解析时为null
+    salary_min = serializers.IntegerField(source='normalized.salary_min', read_only=True, default=None)
+    salary_max = serializers.IntegerField(source='normalized.salary_max', read_only=True, default=None)
+    salary_avg = serializers.IntegerField(source='normalized.salary_avg', read_only=True, default=None)
+
     class Meta:
         model = JobPosting
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 稀疏字段集（?fields= / ?exclude=）：只保留指定的字段
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
@@ -0,0 +1,28 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .metrics import install_sql_recorder
+from .models import JobPosting
+from .normalization import normalize_postings
+from .versioning import schedule_bump
+
+
+@receiver(post_save, sender=JobPosting)
+def normalize_saved_posting(sender, instance, raw=False, **kwargs):
+    """通过ORM保存招聘信息时同步更新规范化数据"""
+    if raw:
+        return
+    normalize_postings([instance])
+
+
+@receiver(post_delete, sender=JobPosting)
+def posting_deleted(sender, instance, **kwargs):
+    """删除招聘信息后使查询缓存失效"""
+    schedule_bump()
+
+
+@receiver(connection_created)
+def record_sql_queries(sender, connection, **kwargs):
+    """新建的数据库连接计入请求的SQL查询次数和耗时（见metrics）"""
+    install_sql_recorder(connection)
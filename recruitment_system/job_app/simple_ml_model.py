@@ -3,59 +3,204 @@ import pandas as pd
 import re
 import json
 import os
+import threading
+import zlib
 from datetime import datetime
+from functools import lru_cache
 
-class SimpleSalaryPredictionModel:
+from .metrics import timed
+from .model_registry import VersionedModel, current_version, publish, version_path
+
+# 预测时使用的类别特征
+CATEGORICAL_FEATURES = ('education', 'location', 'industry')
+
+# 预测结果随机波动的标准差
+NOISE_STD = 1500
+
+# 默认权重，没有训练过的模型使用
+DEFAULT_WEIGHTS = {
+    'experience': 3000,  # 每增加1年经验，薪资增加3000
+    'education': {'大专': 5000, '本科': 8000, '硕士': 12000, '博士': 18000, '其他': 5000},  # 不同学历的基础薪资
+    'location': {'北京': 12000, '上海': 11000, '广州': 8000, '深圳': 9000, '杭州': 7000, '其他': 5000},  # 不同城市的基础薪资
+    'industry': {'互联网': 10000, '金融': 9000, '教育': 6000, '医疗': 7000, '其他': 5000},  # 不同行业的基础薪资
+}
+DEFAULT_BIAS = 3000  # 基础偏差值
+
+# 版本目录中的权重文件名
+WEIGHTS_FILE = 'weights.json'
+
+# 版本目录中的训练统计量（XᵀX、Xᵀy等），用于增量训练
+TRAINING_STATS_FILE = 'training_stats.npz'
+
+_YEARS_RE = re.compile(r'(\d+)')
+
+
+def _get_setting(name, default):
+    """读取Django配置，未配置Django时返回默认值"""
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+
+@lru_cache(maxsize=1024)
+def experience_years(experience_str):
+    """从经验字符串中提取年数，相同的字符串只解析一次"""
+    # 尝试提取数字
+    match = _YEARS_RE.search(experience_str)
+    if match:
+        return float(match.group(1))
+    # 处理特殊情况
+    if '应届生' in experience_str:
+        return 0
+    if '1年以下' in experience_str:
+        return 0.5
+    # 默认返回平均经验值
+    return 3.0  # 假设平均经验为3年
+
+
+@lru_cache(maxsize=4096)
+def seeded_noise(key):
+    """以输入为种子生成确定的随机波动，相同输入得到相同的结果"""
+    seed = zlib.crc32('|'.join(key).encode('utf-8'))
+    return float(np.random.default_rng(seed).normal(0, NOISE_STD))
+
+
+class CompiledWeights:
+    """
+    编译后的模型权重，创建后不再修改，供预测使用：
+    每个类别特征对应 取值->编号 的字典和按编号排列的权重数组，未知取值使用'其他'的编号，
+    相同输入的计算结果缓存在base_salary中，权重变化时整体替换
+    """
+
+    def __init__(self, weights, bias, cache_size):
+        self.weights = weights
+        self.bias = bias
+        self.lookup = {}
+        for feature in CATEGORICAL_FEATURES:
+            categories = list(weights[feature].keys())
+            if '其他' not in categories:
+                categories.append('其他')
+            table = np.array([weights[feature].get(category, 0) for category in categories], dtype=float)
+            self.lookup[feature] = (
+                {category: i for i, category in enumerate(categories)},
+                table,
+                table.tolist(),
+                categories.index('其他'),
+            )
+        self.experience_weight = float(weights['experience'])
+        self.base_salary = lru_cache(maxsize=cache_size)(self._base_salary)
+
+    def _base_salary(self, key):
+        """计算不含随机波动的预测薪资"""
+        experience, *categories = key
+        salary = experience_years(experience) * self.experience_weight + self.bias
+        for feature, value in zip(CATEGORICAL_FEATURES, categories):
+            codes, _, weights, other = self.lookup[feature]
+            salary += weights[codes.get(value, other)]
+        return salary
+
+    def encode_categories(self, values, feature):
+        """将类别取值编码为对应的权重数组，未知取值使用'其他'的权重"""
+        codes, table, _, other = self.lookup[feature]
+        values = pd.Series(values, dtype=object).astype(str).str.strip()
+        return table[values.map(codes).fillna(other).to_numpy(dtype=int)]
+
+
+class SimpleSalaryPredictionModel(VersionedModel):
     """简化版薪资预测模型，不依赖scikit-learn和scipy"""
+    artifact_name = 'simple'
     _instance = None
     _initialized = False
-    
+    _lock = threading.Lock()
+
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(SimpleSalaryPredictionModel, cls).__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(SimpleSalaryPredictionModel, cls).__new__(cls)
         return cls._instance
-    
+
     def __init__(self):
-        if not self._initialized:
-            self._initialized = True
-            self.weights = {
-                'experience': 3000,  # 每增加1年经验，薪资增加3000
-                'education': {'大专': 5000, '本科': 8000, '硕士': 12000, '博士': 18000, '其他': 5000},  # 不同学历的基础薪资
-                'location': {'北京': 12000, '上海': 11000, '广州': 8000, '深圳': 9000, '杭州': 7000, '其他': 5000},  # 不同城市的基础薪资
-                'industry': {'互联网': 10000, '金融': 9000, '教育': 6000, '医疗': 7000, '其他': 5000},  # 不同行业的基础薪资
-            }
-            self.bias = 3000  # 基础偏差值
+        if self._initialized:
+            return
+        with self._lock:
+            if self._initialized:
+                return
+            self._init_versioning()
             self.is_trained = False
+            # 随机波动模式：random（每次随机）、seeded（以输入为种子，结果确定）、off（不添加波动）
+            self.noise_mode = _get_setting('SALARY_PREDICTION_NOISE', 'random')
+            self.cache_size = _get_setting('SALARY_PREDICTION_CACHE_SIZE', 4096)
+            # 还没有发布过版本时使用随代码提供的权重文件
             self.model_path = os.path.join(os.path.dirname(__file__), 'simple_model_weights.json')
+            self.update_weights(DEFAULT_WEIGHTS, DEFAULT_BIAS)
             self.load_model()
-    
+            self._initialized = True
+
+    @property
+    def weights(self):
+        return self._state.weights
+
+    @property
+    def bias(self):
+        return self._state.bias
+
+    def update_weights(self, weights, bias):
+        """使用新的权重替换当前模型状态"""
+        self._swap(CompiledWeights(weights, bias, self.cache_size), self.version)
+
+    def _read_weights(self, path):
+        """从权重文件读取模型状态"""
+        with open(path, 'r', encoding='utf-8') as f:
+            model_data = json.load(f)
+        return CompiledWeights(
+            model_data.get('weights', self.weights), model_data.get('bias', self.bias), self.cache_size
+        )
+
+    def _load_version(self, version):
+        return self._read_weights(os.path.join(version_path(self.artifact_name, version), WEIGHTS_FILE))
+
     def load_model(self):
-        """加载预训练的模型权重"""
+        """加载预训练的模型权重：优先加载当前发布的版本，其次是随代码提供的权重文件"""
         try:
-            if os.path.exists(self.model_path):
-                with open(self.model_path, 'r', encoding='utf-8') as f:
-                    model_data = json.load(f)
-                    self.weights = model_data.get('weights', self.weights)
-                    self.bias = model_data.get('bias', self.bias)
-                    self.is_trained = True
-                    print(f"模型已从{self.model_path}加载")
+            version = current_version(self.artifact_name)
+            if version:
+                self.load_version(version)
+                self.is_trained = True
+            elif os.path.exists(self.model_path):
+                self._swap(self._read_weights(self.model_path), None)
+                self.is_trained = True
+                print(f"模型已从{self.model_path}加载")
         except Exception as e:
             print(f"加载模型失败: {str(e)}")
-    
-    def save_model(self):
-        """保存模型权重"""
-        try:
-            model_data = {
-                'weights': self.weights,
-                'bias': self.bias,
-                'train_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            with open(self.model_path, 'w', encoding='utf-8') as f:
+
+    def save_model(self, training_stats=None, metadata=None):
+        """
+        将模型权重发布为新版本
+        training_stats：训练累加的统计量（数组），与版本一起保存，供下一次增量训练使用
+        metadata：训练元数据（如已训练到的最大职位ID），记录在权重文件中
+        """
+        model_data = {
+            'weights': self.weights,
+            'bias': self.bias,
+            'train_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            **(metadata or {}),
+        }
+
+        def write(path):
+            with open(os.path.join(path, WEIGHTS_FILE), 'w', encoding='utf-8') as f:
                 json.dump(model_data, f, ensure_ascii=False, indent=2)
-            print(f"模型已保存到{self.model_path}")
+            if training_stats is not None:
+                np.savez(os.path.join(path, TRAINING_STATS_FILE), **training_stats)
+
+        try:
+            self.version = publish(self.artifact_name, write)
+            print(f"模型已保存为版本 {self.version}")
         except Exception as e:
             print(f"保存模型失败: {str(e)}")
-    
+
     def train(self, data=None):
         """训练模型"""
         # 这里使用简化的训练逻辑
@@ -100,46 +245,28 @@ class SimpleSalaryPredictionModel:
             'industry': industry
         })
         
-        # 根据权重生成薪资
-        data['salary'] = data.apply(lambda row: self._calculate_salary(row) + np.random.normal(0, 2000), axis=1)
-        data['salary'] = data['salary'].apply(lambda x: max(3000, int(x)))  # 确保薪资不为负
+        # 根据权重生成薪资（按列向量化计算，结果与逐行调用_calculate_salary相同）
+        state = self._state
+        salary = experiences * state.experience_weight + state.bias + np.random.normal(0, 2000, num_samples)
+        for feature in CATEGORICAL_FEATURES:
+            salary += state.encode_categories(data[feature], feature)
+        data['salary'] = np.maximum(3000, salary).astype(int)  # 确保薪资不为负
         
         return data
     
     def _adjust_weights_based_on_data(self, data):
-        """根据数据调整权重"""
-        # 这是一个简化的权重调整方法
-        # 在实际应用中，你可以使用更复杂的算法
-        
-        # 计算不同特征组合下的平均薪资
-        for edu in self.weights['education'].keys():
-            for loc in self.weights['location'].keys():
-                for ind in self.weights['industry'].keys():
-                    mask = (data['education'] == edu) & (data['location'] == loc) & (data['industry'] == ind)
-                    subset = data[mask]
-                    if len(subset) > 0:
-                        # 计算经验系数
-                        if subset['experience'].std() > 0:
-                            exp_coef = (subset['salary'].mean() - self.weights['education'][edu] - \
-                                       self.weights['location'][loc] - self.weights['industry'][ind] - self.bias) / \
-                                      subset['experience'].mean()
-                            if not np.isnan(exp_coef) and exp_coef > 0:
-                                self.weights['experience'] = (self.weights['experience'] + exp_coef) / 2
+        """根据数据调整权重：累加充分统计量后以闭式解求出全部权重"""
+        from .trainers import LinearSalaryTrainer
+
+        trainer = LinearSalaryTrainer(self.weights, self.bias)
+        trainer.partial_fit(
+            data['experience'], data['education'], data['location'], data['industry'], data['salary']
+        )
+        self.update_weights(*trainer.solve())
     
     def _extract_experience_years(self, experience_str):
         """从经验字符串中提取年数"""
-        import re
-        # 尝试提取数字
-        match = re.search(r'(\d+)', str(experience_str))
-        if match:
-            return float(match.group(1))
-        # 处理特殊情况
-        if '应届生' in str(experience_str):
-            return 0
-        if '1年以下' in str(experience_str):
-            return 0.5
-        # 默认返回平均经验值
-        return 3.0  # 假设平均经验为3年
+        return experience_years(str(experience_str))
 
     def _calculate_salary(self, row):
         """根据特征计算薪资"""
@@ -160,34 +287,75 @@ class SimpleSalaryPredictionModel:
         total_salary = exp_effect + edu_effect + loc_effect + ind_effect + self.bias
         
         return total_salary
+
+    @staticmethod
+    def normalize_inputs(experience, education, location, industry):
+        """规范化预测输入，作为预测缓存的键"""
+        return (str(experience).strip(), str(education).strip(), str(location).strip(), str(industry).strip())
+
+    def _noise(self, key):
+        """根据noise_mode生成预测的随机波动"""
+        if self.noise_mode == 'off':
+            return 0.0
+        if self.noise_mode == 'seeded':
+            return seeded_noise(key)
+        return np.random.normal(0, NOISE_STD)
     
+    @timed('inference')
     def predict_salary(self, experience, education, location, industry):
         """预测薪资"""
         if not self.is_trained:
             print("警告: 模型尚未训练，使用默认权重进行预测")
         
-        # 创建一行数据
-        row = pd.Series({
-            'experience': experience,
-            'education': education,
-            'location': location,
-            'industry': industry
-        })
+        # 读取一次当前模型状态，整个预测过程使用同一版本的权重
+        self.check_for_update()
+        state = self._state
+        key = self.normalize_inputs(experience, education, location, industry)
         
-        # 计算薪资
-        predicted_salary = self._calculate_salary(row)
+        # 计算薪资（相同输入的计算结果会被缓存）
+        predicted_salary = state.base_salary(key)
         
         # 添加一些随机波动使预测更真实
-        predicted_salary += np.random.normal(0, 1500)
+        predicted_salary += self._noise(key)
         predicted_salary = max(3000, int(predicted_salary))  # 确保薪资不为负
         
         return predicted_salary
 
+    def _extract_experience_years_array(self, experiences):
+        """批量从经验字符串中提取年数，每种经验字符串只解析一次"""
+        codes, uniques = pd.factorize(pd.Series(experiences, dtype=object).astype(str).str.strip())
+        return np.array([experience_years(value) for value in uniques], dtype=float)[codes]
+
+    @timed('inference')
+    def predict_salary_batch(self, experiences, educations, locations, industries):
+        """批量预测薪资，输入为等长的序列，在一次向量化计算中完成，返回整数数组"""
+        if not self.is_trained:
+            print("警告: 模型尚未训练，使用默认权重进行预测")
+
+        self.check_for_update()
+        state = self._state
+        exp_effect = self._extract_experience_years_array(experiences) * state.experience_weight
+        edu_effect = state.encode_categories(educations, 'education')
+        loc_effect = state.encode_categories(locations, 'location')
+        ind_effect = state.encode_categories(industries, 'industry')
+
+        predicted = exp_effect + edu_effect + loc_effect + ind_effect + state.bias
+        # 添加一些随机波动使预测更真实
+        if self.noise_mode == 'seeded':
+            predicted += [
+                seeded_noise(self.normalize_inputs(*inputs))
+                for inputs in zip(experiences, educations, locations, industries)
+            ]
+        elif self.noise_mode != 'off':
+            predicted += np.random.normal(0, NOISE_STD, len(predicted))
+        return np.maximum(3000, predicted.astype(int))  # 确保薪资不为负
+
     def get_model_info(self):
         """获取模型信息"""
         return {
             'model_type': 'Simple Linear Model',
             'is_trained': self.is_trained,
+            'version': self.version,
             'weights': self.weights,
             'bias': self.bias
         }
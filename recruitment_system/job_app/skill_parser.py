@@ -0,0 +1,34 @@
+import re
+import unicodedata
+
+# 技能标签之间的分隔符（英文逗号、中文逗号、顿号、分号、竖线、换行）
+_SEPARATOR_RE = re.compile(r'[,，、;；|\n]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 技能名称的最大长度，与Skill.name字段长度一致
+MAX_SKILL_LENGTH = 100
+
+
+def normalize_skill(skill):
+    """规范化技能名称，返回(索引键, 显示名称)：全角转半角、合并空白，索引键不区分大小写"""
+    display = _WHITESPACE_RE.sub(' ', unicodedata.normalize('NFKC', skill)).strip()[:MAX_SKILL_LENGTH]
+    return display.casefold(), display
+
+
+def tokenize_skills(skills_str):
+    """
+    将技能标签字符串拆分为去重后的(索引键, 显示名称)列表，保持原有顺序
+    优先按逗号等分隔符拆分；没有分隔符时按空白拆分，如'Python Django MySQL'
+    """
+    if not skills_str:
+        return []
+
+    text = unicodedata.normalize('NFKC', skills_str)
+    parts = _SEPARATOR_RE.split(text) if _SEPARATOR_RE.search(text) else text.split()
+
+    tokens = {}
+    for part in parts:
+        key, display = normalize_skill(part)
+        if key and key not in tokens:
+            tokens[key] = display
+    return list(tokens.items())
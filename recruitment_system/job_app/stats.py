@@ -0,0 +1,109 @@
+"""
+招聘数据统计
+在数据库中完成分组统计，供数据分析页面使用
+"""
+import math
+
+from django.db.models import Count, Q
+from django.db.models.functions import Trim
+
+from .models import PostingSkill
+
+# 默认薪资分段边界（元/月），最后一段没有上限
+DEFAULT_SALARY_BINS = [0, 5000, 10000, 15000, 20000, 30000, 50000]
+
+# 各分布最多返回的条目数
+DEFAULT_LIMIT = 100
+
+
+def parse_bins(value):
+    """解析逗号分隔的薪资分段边界，边界必须是严格递增的非负数"""
+    if not value:
+        return list(DEFAULT_SALARY_BINS)
+    try:
+        bins = [float(item) for item in value.split(',') if item.strip()]
+    except ValueError:
+        raise ValueError('salary_bins必须是逗号分隔的数字')
+    if not all(math.isfinite(item) for item in bins):
+        raise ValueError('salary_bins必须是逗号分隔的数字')
+    bins = [int(item) if item.is_integer() else item for item in bins]
+    if not bins or bins[0] < 0 or any(a >= b for a, b in zip(bins, bins[1:])):
+        raise ValueError('salary_bins必须是严格递增的非负数')
+    return bins
+
+
+def parse_limit(value, name='limit'):
+    """解析各分布返回的最大条目数，name为参数名称（用于错误信息）"""
+    if not value:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError(f'{name}必须是正整数')
+    if limit <= 0:
+        raise ValueError(f'{name}必须是正整数')
+    return limit
+
+
+def _format_amount(amount):
+    """将薪资金额格式化为以k为单位的简短表示"""
+    return f'{amount / 1000:g}'
+
+
+def salary_histogram(queryset, bins):
+    """按平均月薪分段统计职位数量，所有分段在一条聚合查询中完成"""
+    ranges = [(low, high) for low, high in zip(bins, bins[1:])] + [(bins[-1], None)]
+
+    aggregates = {}
+    for i, (low, high) in enumerate(ranges):
+        condition = Q(normalized__salary_avg__gte=low)
+        if high is not None:
+            condition &= Q(normalized__salary_avg__lt=high)
+        aggregates[f'bin_{i}'] = Count('pk', filter=condition)
+    counts = queryset.aggregate(**aggregates)
+
+    histogram = []
+    for i, (low, high) in enumerate(ranges):
+        if high is None:
+            label = f'{_format_amount(low)}k以上'
+        else:
+            label = f'{_format_amount(low)}-{_format_amount(high)}k'
+        histogram.append({'range': label, 'min': low, 'max': high, 'count': counts[f'bin_{i}']})
+    return histogram
+
+
+def value_counts(queryset, field, limit=DEFAULT_LIMIT):
+    """按字段取值（去除首尾空白）分组计数，按数量降序返回"""
+    rows = (
+        queryset.order_by()
+        .annotate(name=Trim(field))
+        .exclude(name='')
+        .exclude(name__isnull=True)
+        .values('name')
+        .annotate(count=Count('pk'))
+        .order_by('-count', 'name')[:limit]
+    )
+    return [{'name': row['name'], 'count': row['count']} for row in rows]
+
+
+def skill_counts(queryset, limit=DEFAULT_LIMIT):
+    """通过技能倒排索引按技能分组计数"""
+    rows = (
+        PostingSkill.objects.filter(posting__in=queryset.order_by().values('pk'))
+        .values('skill_id', 'skill__display_name')
+        .annotate(count=Count('posting_id'))
+        .order_by('-count', 'skill__display_name')[:limit]
+    )
+    return [{'name': row['skill__display_name'], 'count': row['count']} for row in rows]
+
+
+def compute_stats(queryset, bins=None, limit=DEFAULT_LIMIT):
+    """计算数据分析页面需要的全部分布数据"""
+    return {
+        'total': queryset.order_by().count(),
+        'salary': salary_histogram(queryset, bins or DEFAULT_SALARY_BINS),
+        'education': value_counts(queryset, 'education', limit),
+        'industry': value_counts(queryset, 'industry', limit),
+        'experience': value_counts(queryset, 'experience', limit),
+        'skills': skill_counts(queryset, limit),
+    }
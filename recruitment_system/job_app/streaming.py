@@ -0,0 +1,95 @@
+"""
+流式输出
+按主键分块遍历查询集，逐块序列化并以NDJSON（每行一个JSON对象）格式输出；
+以a开头的函数是异步版本，每块通过异步ORM查询，供ASGI下的异步视图使用
+"""
+from operator import attrgetter, itemgetter
+
+from django.http import StreamingHttpResponse
+
+from .renderers import NDJSONRenderer, encode_json
+
+# 每次从数据库读取的记录数
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def encode_row(row):
+    """将一条记录编码为一行JSON"""
+    return encode_json(row) + b'\n'
+
+
+def _chunk_queryset(queryset, last_pk, chunk_size):
+    """按主键排序的查询集中主键大于last_pk的一块"""
+    chunk_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+    return chunk_queryset[:chunk_size]
+
+
+def iterate_chunks(queryset, chunk_size=DEFAULT_CHUNK_SIZE, pk_of=attrgetter('pk')):
+    """按主键顺序分块遍历查询集，每块单独查询，内存占用与总行数无关；pk_of从一条记录中取出主键"""
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        chunk = list(_chunk_queryset(queryset, last_pk, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last_pk = pk_of(chunk[-1])
+
+
+def serialized_chunks(queryset, serialize_chunk, chunk_size=DEFAULT_CHUNK_SIZE):
+    """分块查询模型对象，serialize_chunk负责将一块模型对象转换为字典列表"""
+    for chunk in iterate_chunks(queryset, chunk_size):
+        yield serialize_chunk(chunk)
+
+
+def plan_chunks(queryset, plan, chunk_size=DEFAULT_CHUNK_SIZE):
+    """分块读取values_list元组，按字段计划（read_plan.ReadPlan）转换为字典列表，不实例化模型对象"""
+    # 最后一列为主键，用于定位下一块；字段计划按输出字段数组装字典，多出的主键列被忽略
+    values = queryset.values_list(*plan.paths, 'pk')
+    for chunk in iterate_chunks(values, chunk_size, pk_of=itemgetter(-1)):
+        yield [plan.to_dict(row) for row in chunk]
+
+
+async def aiterate_chunks(queryset, chunk_size=DEFAULT_CHUNK_SIZE, pk_of=attrgetter('pk')):
+    """iterate_chunks的异步版本，等待查询结果时不占用事件循环"""
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        chunk = [row async for row in _chunk_queryset(queryset, last_pk, chunk_size)]
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last_pk = pk_of(chunk[-1])
+
+
+async def aserialized_chunks(queryset, serialize_chunk, chunk_size=DEFAULT_CHUNK_SIZE):
+    async for chunk in aiterate_chunks(queryset, chunk_size):
+        yield serialize_chunk(chunk)
+
+
+async def aplan_chunks(queryset, plan, chunk_size=DEFAULT_CHUNK_SIZE):
+    values = queryset.values_list(*plan.paths, 'pk')
+    async for chunk in aiterate_chunks(values, chunk_size, pk_of=itemgetter(-1)):
+        yield [plan.to_dict(row) for row in chunk]
+
+
+def _encode_chunk(chunk):
+    return b''.join(encode_row(row) for row in chunk)
+
+
+def stream_ndjson(chunks):
+    """生成NDJSON流式响应，chunks逐块产生字典列表（同步或异步迭代器）"""
+    if hasattr(chunks, '__aiter__'):
+        async def generate():
+            async for chunk in chunks:
+                yield _encode_chunk(chunk)
+    else:
+        def generate():
+            for chunk in chunks:
+                yield _encode_chunk(chunk)
+
+    return StreamingHttpResponse(generate(), content_type=f'{NDJSONRenderer.media_type}; charset=utf-8')
@@ -0,0 +1,160 @@
+"""
+模拟招聘数据生成
+取值范围和薪资因子与随机森林模型的模拟训练数据相同，全部使用NumPy向量化生成，
+相同的随机种子生成完全相同的数据；城市、行业、技能的出现频率可以按Zipf分布倾斜，
+用于在大数据量下测试查询、模型训练和统计分析的性能
+"""
+import numpy as np
+import pandas as pd
+
+LOCATIONS = ['北京', '上海', '深圳', '广州', '杭州', '成都', '武汉', '西安', '南京', '其他']
+EXPERIENCES = ['应届', '1-3年', '3-5年', '5-10年', '10年以上']
+EDUCATIONS = ['大专', '本科', '硕士', '博士']
+COMPANY_TYPES = ['互联网', '金融', '人工智能', '医疗健康', '教育培训', '电子商务', '云计算', '软件服务', '游戏', '移动互联网']
+COMPANY_SIZES = ['500-999人', '1000-4999人', '5000-9999人', '10000人以上', '20-99人', '100-499人', '少于20人']
+INDUSTRIES = ['互联网', '金融', '人工智能', '医疗健康', '教育培训', '电子商务', '云计算', '软件服务', '游戏', '移动互联网']
+
+# 基础薪资（元/月）及各项因子，薪资 = 基础薪资 × 经验 × 学历 × 地点 × 行业 × (0.95~1.05的随机波动)
+BASE_SALARY = 10000
+EXPERIENCE_FACTORS = {'应届': 0.7, '1-3年': 1.0, '3-5年': 1.5, '5-10年': 2.2, '10年以上': 3.0}
+EDUCATION_FACTORS = {'大专': 0.9, '本科': 1.0, '硕士': 1.4, '博士': 1.8}
+LOCATION_FACTORS = {
+    '北京': 1.3, '上海': 1.25, '深圳': 1.2, '广州': 1.1, '杭州': 1.15,
+    '成都': 0.9, '武汉': 0.85, '西安': 0.8, '南京': 0.95, '其他': 0.8,
+}
+INDUSTRY_FACTORS = {
+    '互联网': 1.2, '金融': 1.15, '人工智能': 1.3, '医疗健康': 1.05, '教育培训': 0.9,
+    '电子商务': 1.1, '云计算': 1.25, '软件服务': 1.1, '游戏': 1.15, '移动互联网': 1.18,
+}
+
+JOB_TITLES = [
+    '后端开发工程师', '前端开发工程师', 'Java开发工程师', 'Python开发工程师', '算法工程师',
+    '数据分析师', '大数据开发工程师', '测试工程师', '运维工程师', '产品经理',
+]
+# 经验对应的职级前缀
+TITLE_PREFIXES = {'应届': '初级', '1-3年': '', '3-5年': '高级', '5-10年': '资深', '10年以上': '专家级'}
+
+SKILLS = [
+    'Python', 'Java', 'SQL', 'JavaScript', 'MySQL', 'Linux', 'Go', 'Redis', 'Vue', 'React',
+    'Spring', 'Django', 'Docker', 'Kubernetes', 'C++', 'Hadoop', 'Spark', 'TensorFlow', 'PyTorch',
+    '机器学习', '深度学习', '数据分析', '产品设计', '项目管理',
+]
+
+COLUMNS = [
+    'id', 'job_title', 'company_name', 'company_logo', 'location', 'experience', 'education',
+    'salary', 'company_type', 'company_size', 'industry', 'skills',
+]
+
+# 每块的行数：每块使用独立的随机数流，生成结果只取决于随机种子，与调用方如何分批写入无关
+BLOCK_SIZE = 100000
+
+DEFAULT_MAX_SKILLS = 5
+DEFAULT_COMPANIES = 10000
+
+
+def zipf_weights(n, skew):
+    """n个取值的出现概率，按列表顺序排名，第k个取值的概率与1/k^skew成正比，skew为0时为均匀分布"""
+    weights = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** skew
+    return weights / weights.sum()
+
+
+def _factors(values, factors):
+    return np.array([factors[value] for value in values], dtype=np.float64)
+
+
+def _join(*parts):
+    """逐元素拼接字符串，参数为数组或字符串常量"""
+    result = None
+    for part in parts:
+        if not isinstance(part, str):
+            part = np.asarray(part).astype(str).astype(object)
+        result = part if result is None else result + part
+    return result
+
+
+def format_salary(salary):
+    """将月薪格式化为薪资字符串：1万以上为'x.x-y.y万'，否则为'x-yk'（与模拟训练数据的格式相同）"""
+    salary = np.asarray(salary, dtype=np.float64)
+    in_wan = _join(
+        np.floor(salary * 0.9 / 10000 * 10) / 10, '-', np.floor(salary * 1.1 / 10000 * 10) / 10, '万'
+    )
+    in_k = _join(
+        np.floor(salary * 0.9 / 1000).astype(np.int64), '-', np.floor(salary * 1.1 / 1000).astype(np.int64), 'k'
+    )
+    return np.where(salary >= 10000, in_wan, in_k)
+
+
+def _sample_skills(rng, count, weights, max_skills):
+    """
+    每个职位按权重不放回地抽取1~max_skills个技能，以', '连接
+    使用Gumbel-top-k：对数权重加上Gumbel噪声后取最大的k个，等价于按权重依次不放回抽样
+    """
+    max_skills = min(max_skills, len(SKILLS))
+    keys = np.log(weights) - np.log(-np.log(rng.random((count, len(SKILLS)))))
+    top = np.argsort(-keys, axis=1)[:, :max_skills]
+    sizes = rng.integers(1, max_skills + 1, count)
+    names = np.array(SKILLS, dtype=object)
+    result = names[top[:, 0]]
+    for i in range(1, max_skills):
+        result = np.where(sizes > i, result + ', ' + names[top[:, i]], result)
+    return result
+
+
+def generate_block(rng, count, start_id=1, location_skew=0.0, industry_skew=0.0, skill_skew=0.0,
+                   max_skills=DEFAULT_MAX_SKILLS, companies=DEFAULT_COMPANIES):
+    """生成一块模拟招聘信息，返回DataFrame，列与job_postings表相同"""
+    location = rng.choice(len(LOCATIONS), count, p=zipf_weights(len(LOCATIONS), location_skew))
+    experience = rng.integers(0, len(EXPERIENCES), count)
+    education = rng.integers(0, len(EDUCATIONS), count)
+    company_type = rng.integers(0, len(COMPANY_TYPES), count)
+    company_size = rng.integers(0, len(COMPANY_SIZES), count)
+    industry = rng.choice(len(INDUSTRIES), count, p=zipf_weights(len(INDUSTRIES), industry_skew))
+    title = rng.integers(0, len(JOB_TITLES), count)
+    company = rng.integers(1, companies + 1, count)
+
+    salary = (
+        BASE_SALARY
+        * _factors(EXPERIENCES, EXPERIENCE_FACTORS)[experience]
+        * _factors(EDUCATIONS, EDUCATION_FACTORS)[education]
+        * _factors(LOCATIONS, LOCATION_FACTORS)[location]
+        * _factors(INDUSTRIES, INDUSTRY_FACTORS)[industry]
+        * (0.95 + rng.random(count) * 0.1)
+    )
+    skills = _sample_skills(rng, count, zipf_weights(len(SKILLS), skill_skew), max_skills)
+
+    prefixes = np.array([TITLE_PREFIXES[value] for value in EXPERIENCES], dtype=object)
+    return pd.DataFrame({
+        'id': np.arange(start_id, start_id + count, dtype=np.int64),
+        'job_title': prefixes[experience] + np.array(JOB_TITLES, dtype=object)[title],
+        'company_name': _join('模拟科技公司', company),
+        'company_logo': '',
+        'location': np.array(LOCATIONS, dtype=object)[location],
+        'experience': np.array(EXPERIENCES, dtype=object)[experience],
+        'education': np.array(EDUCATIONS, dtype=object)[education],
+        'salary': format_salary(salary),
+        'company_type': np.array(COMPANY_TYPES, dtype=object)[company_type],
+        'company_size': np.array(COMPANY_SIZES, dtype=object)[company_size],
+        'industry': np.array(INDUSTRIES, dtype=object)[industry],
+        'skills': skills,
+    }, columns=COLUMNS)
+
+
+def generate_frames(count, seed=None, start_id=1, **options):
+    """
+    按块生成count条模拟招聘信息，每块返回一个最多BLOCK_SIZE行的DataFrame
+    options为generate_block的倾斜度等参数；seed为None时每次生成不同的数据
+    """
+    n_blocks = -(-count // BLOCK_SIZE)
+    for i, block_seed in enumerate(np.random.SeedSequence(seed).spawn(n_blocks)):
+        offset = i * BLOCK_SIZE
+        yield generate_block(
+            np.random.default_rng(block_seed), min(BLOCK_SIZE, count - offset), start_id + offset, **options
+        )
+
+
+def generate_postings(count, seed=None, start_id=1, **options):
+    """生成count条模拟招聘信息，返回一个DataFrame"""
+    frames = list(generate_frames(count, seed, start_id, **options))
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(frames, ignore_index=True)
@@ -1,3 +1,1288 @@
-from django.test import TestCase
+"""
+job_app接口契约的测试
+job_postings表不由Django管理，测试数据库中由setUpModule单独创建；
+通过ORM创建的招聘信息会触发规范化流程（规范化表、取值字典、技能倒排索引、二元组索引）
 
-# Create your tests here.
+运行方式：python manage.py test job_app
+"""
+import base64
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock, skipIf
+
+import numpy as np
+import pandas as pd
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from . import versioning, warmup
+from .async_views import Overloaded
+from .columnar import dictionary_encode
+from .dimensions import dimension_cache
+from .features import iterate_posting_frames, load_features
+from .forest_artifacts import ESTIMATOR_FILE, export_forest, load_flat_forest, remove_estimators
+from .metrics import HISTOGRAMS, Histogram
+from .ml_model import SalaryPredictionModel, get_model
+from .model_registry import VersionedModel, current_version, publish, version_path
+from .models import JobPosting, NormalizedPosting
+from .ngram_index import candidate_posting_ids
+from .pagination import JobPostingPagination
+from .renderers import FastJSONRenderer, msgpack, orjson
+from .salary_parser import parse_salary, parse_salary_array, salary_average
+from .simple_ml_model import CATEGORICAL_FEATURES, DEFAULT_BIAS, DEFAULT_WEIGHTS, experience_years, get_simple_model
+from .streaming import iterate_chunks
+from .synthetic import COLUMNS, LOCATIONS, generate_frames, generate_postings
+from .trainers import (
+    INSUFFICIENT_ROWS, NO_NEW_ROWS, TRAINED, LinearSalaryTrainer, count_categories, load_training_stats,
+    train_from_database,
+)
+from .versioning import bump_data_version, schedule_bump
+
+
+def setUpModule():
+    with connection.schema_editor() as editor:
+        editor.create_model(JobPosting)
+
+
+def tearDownModule():
+    with connection.schema_editor() as editor:
+        editor.delete_model(JobPosting)
+
+
+# 测试数据：(id, 职位名称, 公司名称, 地点, 经验, 学历, 薪资, 公司类型, 公司规模, 行业, 技能)
+POSTINGS = [
+    (1, 'Python开发工程师', '字节跳动', '北京', '3-5年', '本科', '15-25K·13薪', '民营', '1000-9999人', '互联网',
+     'Python, Django, MySQL'),
+    (2, 'Java工程师', '阿里巴巴', '杭州', '1-3年', '本科', '1-1.5万', '上市公司', '10000人以上', '互联网',
+     'Java, Spring, MySQL'),
+    (3, '数据分析师', '招商银行', '上海', '3-5年', '硕士', '20-30万/年', '国企', '10000人以上', '金融', 'Python, SQL'),
+    (4, '前端工程师', '某创业公司', '北京朝阳区', '应届生', '大专', '面议', '民营', '20-99人', '互联网', 'Vue, JavaScript'),
+    (5, '兼职助教', '新东方', '广州', '不限', '本科', '200-300元/天', '上市公司', '10000人以上', '教育', '英语'),
+]
+
+FIELDS = ['id', 'job_title', 'company_name', 'location', 'experience', 'education', 'salary',
+          'company_type', 'company_size', 'industry', 'skills']
+
+
+def create_posting(*values):
+    return JobPosting.objects.create(**dict(zip(FIELDS, values)))
+
+
+def reset_caches():
+    """
+    清空查询结果、分页总数缓存和进程内的版本号、取值字典缓存
+    TestCase的事务不会提交，数据版本号不会递增，各测试之间的缓存需要手动清空
+    """
+    caches['default'].clear()
+    caches['job_results'].clear()
+    versioning._local['version'] = None
+    dimension_cache._version = None
+
+
+class JobPostingAPITestCase(TestCase):
+    """使用POSTINGS测试数据的接口测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for values in POSTINGS:
+            create_posting(*values)
+
+    def setUp(self):
+        reset_caches()
+        self.client = APIClient()
+
+    def get(self, url, params=None, status=200):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, status, response.content)
+        return response
+
+    def ids(self, params):
+        """列表接口返回的职位ID"""
+        return [row['id'] for row in self.get('/api/job_postings/', params).json()['results']]
+
+
+class SalaryParserTests(SimpleTestCase):
+
+    def test_parse_formats(self):
+        cases = {
+            '15-25K·13薪': (15000, 25000),
+            '15-25k': (15000, 25000),
+            '1-1.5万': (10000, 15000),
+            '8千-1万': (8000, 10000),
+            '8000-12000元/月': (8000, 12000),
+            '20-30万/年': (16667, 25000),
+            '200-300元/天': (4350, 6525),
+            '5k': (5000, 5000),
+        }
+        for salary, expected in cases.items():
+            with self.subTest(salary=salary):
+                self.assertEqual(parse_salary(salary), expected)
+
+    def test_unparseable(self):
+        for salary in ('面议', '', None, 123):
+            with self.subTest(salary=salary):
+                self.assertIsNone(parse_salary(salary))
+        self.assertIsNone(salary_average(None))
+
+    def test_average(self):
+        self.assertEqual(salary_average(parse_salary('15-25K')), 20000)
+
+    def test_parse_array_matches_scalar(self):
+        values = [
+            '15-25K', None, '面议', '1-1.5万', '15-25K', float('nan'), '200-300元/天', '15k-25k', '8千-1万',
+            '8000-12000元/月', '20-30万/年', '15-25K·13薪', ' 5k ', '10-20K以上', 123, '',
+        ]
+        salary_min, salary_max = parse_salary_array(values)
+        self.assertEqual(len(salary_min), len(values))
+        for value, low, high in zip(values, salary_min, salary_max):
+            expected = parse_salary(value) if isinstance(value, str) else None
+            if expected is None:
+                self.assertTrue(math.isnan(low) and math.isnan(high))
+            else:
+                self.assertEqual((low, high), expected)
+
+
+class FilterTests(JobPostingAPITestCase):
+
+    def test_normalized_salary(self):
+        normalized = NormalizedPosting.objects.get(posting_id=1)
+        self.assertEqual((normalized.salary_min, normalized.salary_max, normalized.salary_avg), (15000, 25000, 20000))
+        self.assertIsNone(NormalizedPosting.objects.get(posting_id=4).salary_avg)
+        row = self.get('/api/job_postings/1/').json()
+        self.assertEqual((row['salary_min'], row['salary_max'], row['salary_avg']), (15000, 25000, 20000))
+
+    def test_text_filters(self):
+        self.assertEqual(self.ids({'job_title': '工程师'}), [1, 2, 4])
+        self.assertEqual(self.ids({'company_name': '阿里'}), [2])
+
+    def test_dimension_filters(self):
+        # 匹配规范化取值中包含搜索词的记录
+        self.assertEqual(self.ids({'location': '北京'}), [1, 4])
+        self.assertEqual(self.ids({'industry': '互联网', 'education': '本科'}), [1, 2])
+        self.assertEqual(self.ids({'location': '深圳'}), [])
+
+    def test_salary_filters(self):
+        self.assertEqual(self.ids({'min_salary': '15000'}), [1, 3])
+        self.assertEqual(self.ids({'max_salary': '15000'}), [2, 5])
+        self.assertEqual(self.ids({'salary_from': '20000', 'salary_to': '22000'}), [1, 3])
+        self.assertEqual(self.ids({'location': '北京', 'min_salary': '10000'}), [1])
+        # 不是有效数字的参数被忽略
+        self.assertEqual(self.ids({'min_salary': 'abc'}), [1, 2, 3, 4, 5])
+
+    def test_skills_all(self):
+        self.assertEqual(self.ids({'skills_all': 'python,mysql'}), [1])
+        self.assertEqual(self.ids({'skills_all': 'Python'}), [1, 3])
+        # 有技能从未出现过时结果为空
+        self.assertEqual(self.ids({'skills_all': 'Python,Rust'}), [])
+
+    def test_skills_any(self):
+        self.assertEqual(self.ids({'skills_any': 'Vue,SQL'}), [3, 4])
+        self.assertEqual(self.ids({'skills_any': 'Rust,Java'}), [2])
+        self.assertEqual(self.ids({'skills_any': 'Rust'}), [])
+
+    def test_page_number_pagination(self):
+        data = self.get('/api/job_postings/', {'page': 2, 'page_size': 2}).json()
+        self.assertEqual(data['count'], 5)
+        self.assertEqual([row['id'] for row in data['results']], [3, 4])
+        self.get('/api/job_postings/', {'page': 9, 'page_size': 2}, status=404)
+
+
+class NgramSearchTests(JobPostingAPITestCase):
+
+    def test_matches_plain_icontains(self):
+        create_posting(6, 'ABA工程师', 'Data Lab', '北京', '不限', '本科', '10-15k', '民营', '20-99人', '互联网', '')
+        terms = ['工程师', '程师', '师', 'Python', 'python', 'JAVA', 'abab', 'aba', '数据分析', '字节', 'lab', '不存在']
+        for name in ('job_title', 'company_name'):
+            for term in terms:
+                expected = list(
+                    JobPosting.objects.filter(**{f'{name}__icontains': term}).order_by('pk').values_list('pk', flat=True)
+                )
+                self.assertEqual(self.ids({name: term, 'page_size': 100}), expected, (name, term))
+
+    def candidates(self, name, term):
+        return sorted(row['posting_id'] for row in candidate_posting_ids(name, term))
+
+    def test_candidates_narrow_search(self):
+        self.assertEqual(self.candidates('job_title', '工程师'), [1, 2, 4])
+        self.assertEqual(self.candidates('company_name', '阿里巴巴'), [2])
+        # 单个字无法组成二元组，不使用索引
+        self.assertIsNone(candidate_posting_ids('job_title', '师'))
+
+        # 二元组都出现但不相邻的职位是候选结果，由icontains排除
+        create_posting(6, 'ABA工程师', '某公司', '北京', '不限', '本科', '10-15k', '民营', '20-99人', '互联网', '')
+        self.assertEqual(self.candidates('job_title', 'ABAB'), [6])
+        self.assertEqual(self.ids({'job_title': 'ABAB'}), [])
+
+    def test_index_follows_updates(self):
+        posting = JobPosting.objects.get(pk=1)
+        posting.job_title = 'Go开发工程师'
+        posting.save()
+        reset_caches()
+        self.assertEqual(self.ids({'job_title': 'python'}), [])
+        self.assertEqual(self.ids({'job_title': 'go开发'}), [1])
+
+
+class StatsTests(JobPostingAPITestCase):
+
+    def test_salary_buckets(self):
+        data = self.get('/api/job_postings/stats/', {'salary_bins': '0,10000,20000'}).json()
+        self.assertEqual(data['total'], 5)
+        # 面议的职位没有平均月薪，不计入任何分段；平均月薪恰好为20000的职位计入以它为下界的分段
+        self.assertEqual(data['salary'], [
+            {'range': '0-10k', 'min': 0, 'max': 10000, 'count': 1},
+            {'range': '10-20k', 'min': 10000, 'max': 20000, 'count': 1},
+            {'range': '20k以上', 'min': 20000, 'max': None, 'count': 2},
+        ])
+
+    def test_distributions_follow_filters(self):
+        data = self.get('/api/job_postings/stats/', {'industry': '互联网', 'limit': 2}).json()
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(data['education'], [{'name': '本科', 'count': 2}, {'name': '大专', 'count': 1}])
+        self.assertEqual(data['industry'], [{'name': '互联网', 'count': 3}])
+        self.assertEqual(data['skills'][0], {'name': 'MySQL', 'count': 2})
+        self.assertEqual(len(data['skills']), 2)
+
+    def test_invalid_parameters(self):
+        self.get('/api/job_postings/stats/', {'salary_bins': '10000,5000'}, status=400)
+        self.get('/api/job_postings/stats/', {'salary_bins': 'a,b'}, status=400)
+        self.get('/api/job_postings/stats/', {'limit': '0'}, status=400)
+
+
+class CursorPaginationTests(JobPostingAPITestCase):
+
+    def walk(self, params, link='next'):
+        """从第一页开始沿next（或从最后一页沿previous）翻页，返回各页的职位ID"""
+        data = self.get('/api/job_postings/', {'pagination': 'cursor', **params}).json()
+        pages = [[row['id'] for row in data['results']]]
+        while data[link]:
+            data = self.client.get(data[link]).json()
+            pages.append([row['id'] for row in data['results']])
+        return pages, data
+
+    def test_round_trip(self):
+        pages, last = self.walk({'page_size': 2})
+        self.assertEqual(pages, [[1, 2], [3, 4], [5]])
+        self.assertEqual(last['count'], 5)
+        self.assertIsNone(last['next'])
+
+        # 从最后一页沿previous翻回第一页
+        data, back = last, []
+        while data['previous']:
+            data = self.client.get(data['previous']).json()
+            back.append([row['id'] for row in data['results']])
+        self.assertEqual(back, [[3, 4], [1, 2]])
+
+    def test_descending_salary(self):
+        # 没有薪资的职位（面议）排在最后，总数与页码分页相同
+        pages, last = self.walk({'page_size': 3, 'ordering': '-salary'})
+        self.assertEqual(pages, [[3, 1, 2], [5, 4]])
+        self.assertEqual(last['count'], 5)
+
+    def test_nulls_last_both_directions(self):
+        for ordering, expected in (('salary', [5, 2, 1, 3, 4]), ('-salary', [3, 1, 2, 5, 4])):
+            for page_size in (1, 2, 4):
+                pages, last = self.walk({'page_size': page_size, 'ordering': ordering})
+                self.assertEqual(sum(pages, []), expected)
+
+                # 沿previous翻回第一页，经过空值记录时顺序不变
+                data, back = last, [pages[-1]]
+                while data['previous']:
+                    data = self.client.get(data['previous']).json()
+                    back.insert(0, [row['id'] for row in data['results']])
+                self.assertEqual(back, pages)
+
+    def test_filters_apply(self):
+        pages, _ = self.walk({'page_size': 1, 'industry': '互联网'})
+        self.assertEqual(pages, [[1], [2], [4]])
+
+    def test_invalid_parameters(self):
+        self.get('/api/job_postings/', {'pagination': 'cursor', 'ordering': 'company'}, status=400)
+        self.get('/api/job_postings/', {'cursor': 'not-a-cursor'}, status=400)
+
+    def test_invalid_cursor_types(self):
+        def encode(data):
+            return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+
+        for ordering, data in (
+            ('id', {'v': 'abc', 'pk': 1}),
+            ('id', {'v': 1, 'pk': 'x'}),
+            ('salary', {'v': [1], 'pk': 1}),
+            ('id', {'v': None, 'pk': 1}),
+            ('salary', {'v': 20000, 'pk': True}),
+            ('salary', {'v': 20000, 'pk': 2 ** 70}),
+        ):
+            params = {'pagination': 'cursor', 'ordering': ordering, 'cursor': encode(data)}
+            self.get('/api/job_postings/', params, status=400)
+        params = {'pagination': 'cursor', 'ordering': 'salary', 'cursor': encode({'v': None, 'pk': 4})}
+        self.assertEqual(self.get('/api/job_postings/', params).json()['results'], [])
+
+
+# 查询结果缓存使用本地内存缓存（与settings_benchmark的DummyCache无关）
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'job_results': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'job-results-test'},
+})
+class CacheInvalidationTests(JobPostingAPITestCase):
+
+    def test_version_bump_invalidates_cached_results(self):
+        self.assertEqual(self.ids({'location': '广州'}), [5])
+        # 不经过ORM信号的修改不会递增数据版本号，仍返回缓存的结果
+        JobPosting.objects.filter(pk=5).update(job_title='兼职讲师')
+        data = self.get('/api/job_postings/', {'location': '广州'}).json()
+        self.assertEqual(data['results'][0]['job_title'], '兼职助教')
+
+        bump_data_version()
+        data = self.get('/api/job_postings/', {'location': '广州'}).json()
+        self.assertEqual(data['results'][0]['job_title'], '兼职讲师')
+
+    def test_cache_stats(self):
+        self.get('/api/job_postings/')
+        self.get('/api/job_postings/')
+        stats = self.get('/api/job_postings/cache_stats/').json()
+        self.assertGreaterEqual(stats['hits'], 1)
+
+
+class ScheduleBumpTests(TestCase):
+
+    def setUp(self):
+        reset_caches()
+        self.version = versioning.get_data_version()
+
+    def test_once_per_transaction(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for _ in range(3):
+                schedule_bump()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(versioning.get_data_version(), self.version + 1)
+
+        # 回调执行后，下一个事务重新登记
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            schedule_bump()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(versioning.get_data_version(), self.version + 2)
+
+    def test_rolled_back_callback_is_registered_again(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    schedule_bump()
+                    raise ValueError
+            except ValueError:
+                pass
+            # 保存点回滚时回调被丢弃，不能因此跳过之后的登记
+            schedule_bump()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(versioning.get_data_version(), self.version + 1)
+
+    def test_saved_posting_invalidates_cache(self):
+        client = APIClient()
+        self.assertEqual(client.get('/api/job_postings/').json()['count'], 0)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for values in POSTINGS:
+                create_posting(*values)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(client.get('/api/job_postings/').json()['count'], len(POSTINGS))
+
+
+@skipIf(orjson is None, '未安装orjson')
+class FastJSONTests(JobPostingAPITestCase):
+
+    def assertSameBytes(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_renderer_output_identical(self):
+        self.assertSameBytes([
+            {'id': 1, 'job_title': 'Python开发\u2028工程师\u2029', 'company_logo': None, 'salary_avg': 20000},
+            {'id': 2, 'skills': 'a"b\\c\n\t\x00', 'emoji': '\U0001f600', 'flag': True, 'nested': {'values': [1, -2]}},
+        ])
+        # 超出64位的整数由orjson无法编码，退回标准库json
+        self.assertSameBytes({'n': 2 ** 70})
+        self.assertSameBytes([])
+
+    def test_endpoint_output_identical(self):
+        for url in ('/api/job_postings/', '/api/job_postings/1/', '/api/job_postings/all_data/'):
+            with self.subTest(url=url):
+                response = self.get(url)
+                self.assertEqual(response.content, JSONRenderer().render(response.json()))
+
+
+class NDJSONStreamingTests(JobPostingAPITestCase):
+
+    def stream(self, params=None, **headers):
+        response = self.client.get('/api/job_postings/all_data/', params or {}, **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode('utf-8').splitlines()]
+
+    def test_rows_match_json(self):
+        expected = self.get('/api/job_postings/all_data/').json()
+        self.assertEqual(self.stream({'format': 'ndjson'}), expected)
+        self.assertEqual(self.stream(HTTP_ACCEPT='application/x-ndjson'), expected)
+
+    def test_filters_and_fields(self):
+        rows = self.stream({'format': 'ndjson', 'industry': '互联网', 'fields': 'id,job_title'})
+        self.assertEqual(rows, [
+            {'id': 1, 'job_title': 'Python开发工程师'},
+            {'id': 2, 'job_title': 'Java工程师'},
+            {'id': 4, 'job_title': '前端工程师'},
+        ])
+
+    def test_chunks_follow_primary_key(self):
+        chunks = iterate_chunks(JobPosting.objects.order_by('-pk'), chunk_size=2)
+        self.assertEqual([[posting.pk for posting in chunk] for chunk in chunks], [[1, 2], [3, 4], [5]])
+
+
+def decode_columnar(data):
+    """将列式数据还原为字典列表，字典编码的字段通过取值字典还原"""
+    columns = {}
+    for name in data['fields']:
+        column = data['columns'][name]
+        if name in data['dictionaries']:
+            column = [data['dictionaries'][name][code] for code in column]
+        columns[name] = column
+    return [{name: columns[name][i] for name in data['fields']} for i in range(data['count'])]
+
+
+class ColumnarTests(JobPostingAPITestCase):
+
+    def test_dictionary_encode(self):
+        self.assertEqual(dictionary_encode(['北京', '上海', '北京', None]), (['北京', '上海', None], [0, 1, 0, 2]))
+
+    def test_columnar_round_trip(self):
+        expected = self.get('/api/job_postings/all_data/').json()
+        data = self.get('/api/job_postings/all_data/', {'format': 'columnar'}).json()
+        self.assertEqual(data['count'], len(POSTINGS))
+        # 低基数字段字典编码，其余字段按列输出
+        self.assertEqual(data['dictionaries']['industry'], ['互联网', '金融', '教育'])
+        self.assertEqual(data['columns']['industry'], [0, 0, 1, 0, 2])
+        self.assertNotIn('job_title', data['dictionaries'])
+        self.assertEqual(decode_columnar(data), expected)
+
+    def test_columnar_fields_and_filters(self):
+        data = self.get('/api/job_postings/all_data/', {
+            'format': 'columnar', 'fields': 'id,location', 'industry': '互联网',
+        }).json()
+        self.assertEqual(data['fields'], ['id', 'location'])
+        self.assertEqual(decode_columnar(data), [
+            {'id': 1, 'location': '北京'}, {'id': 2, 'location': '杭州'}, {'id': 4, 'location': '北京朝阳区'},
+        ])
+
+    @skipIf(msgpack is None, '未安装msgpack')
+    def test_msgpack_matches_columnar(self):
+        response = self.get('/api/job_postings/all_data/', {'format': 'msgpack'})
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        data = msgpack.unpackb(response.content, raw=False)
+        self.assertEqual(data, self.get('/api/job_postings/all_data/', {'format': 'columnar'}).json())
+
+
+@override_settings(JOB_METRICS_ENABLED=True)
+class MetricsTests(JobPostingAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        # 中间件在创建客户端时读取JOB_METRICS_ENABLED
+        self.client = APIClient()
+        for histogram in HISTOGRAMS:
+            histogram.reset()
+
+    def test_server_timing_header(self):
+        response = self.get('/api/job_postings/', {'industry': '互联网'})
+        entries = {entry.split(';')[0]: entry for entry in response['Server-Timing'].split(', ')}
+        self.assertTrue({'query', 'serialize', 'render', 'sql', 'total'} <= set(entries), entries)
+        queries = int(entries['sql'].split('desc="')[1].split()[0])
+        self.assertGreater(queries, 0)
+
+    def test_metrics_endpoint(self):
+        # 参数不同，两个请求都不会命中查询结果缓存
+        self.get('/api/job_postings/', {'page_size': 1})
+        self.get('/api/job_postings/', {'page_size': 2})
+        self.get('/api/job_postings/999/', status=404)
+        text = self.get('/api/metrics').content.decode('utf-8')
+        self.assertIn('job_http_request_duration_seconds_count{endpoint="jobposting-list",method="GET",status="200"} 2', text)
+        self.assertIn('job_http_request_phase_duration_seconds_count{endpoint="jobposting-list",phase="query"} 2', text)
+        self.assertIn('job_http_request_sql_queries_count{endpoint="jobposting-list"} 2', text)
+        self.assertIn('job_http_request_duration_seconds_count{endpoint="jobposting-detail",method="GET",status="404"} 1', text)
+
+    def test_histogram_buckets(self):
+        histogram = Histogram('test_seconds', '测试', ['endpoint'], buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(('a',), value)
+        self.assertEqual(histogram.render().splitlines()[2:], [
+            'test_seconds_bucket{endpoint="a",le="0.1"} 2',
+            'test_seconds_bucket{endpoint="a",le="1.0"} 3',
+            'test_seconds_bucket{endpoint="a",le="+Inf"} 4',
+            'test_seconds_sum{endpoint="a"} 2.65',
+            'test_seconds_count{endpoint="a"} 4',
+        ])
+
+    @override_settings(JOB_METRICS_ENABLED=False)
+    def test_disabled(self):
+        self.client = APIClient()
+        self.assertNotIn('Server-Timing', self.get('/api/job_postings/'))
+        self.assertNotIn('jobposting-list', self.get('/api/metrics').content.decode('utf-8'))
+
+
+class FieldsetTests(JobPostingAPITestCase):
+
+    def test_fields(self):
+        rows = self.get('/api/job_postings/', {'fields': 'salary_avg,id,job_title'}).json()['results']
+        # 按序列化器的字段顺序输出
+        self.assertEqual(list(rows[0]), ['id', 'salary_avg', 'job_title'])
+        self.assertEqual(rows[0], {'id': 1, 'job_title': 'Python开发工程师', 'salary_avg': 20000})
+
+    def test_exclude(self):
+        rows = self.get('/api/job_postings/', {'exclude': 'skills,company_logo,salary_min'}).json()['results']
+        self.assertFalse({'skills', 'company_logo', 'salary_min'} & set(rows[0]))
+        self.assertIn('salary_max', rows[0])
+
+    def test_detail_and_all_data(self):
+        self.assertEqual(self.get('/api/job_postings/2/', {'fields': 'id,location'}).json(), {'id': 2, 'location': '杭州'})
+        rows = self.get('/api/job_postings/all_data/', {'fields': 'id', 'industry': '金融'}).json()
+        self.assertEqual(rows, [{'id': 3}])
+
+    def test_invalid_fields(self):
+        self.get('/api/job_postings/', {'fields': 'id,unknown'}, status=400)
+        self.get('/api/job_postings/', {'fields': 'id', 'exclude': 'id'}, status=400)
+
+
+class FacetTests(JobPostingAPITestCase):
+
+    def test_dimension_facets(self):
+        data = self.get('/api/job_postings/', {'facets': 'industry,education', 'page_size': 1}).json()
+        self.assertEqual(len(data['results']), 1)
+        self.assertEqual(data['facets']['industry'], [
+            {'name': '互联网', 'count': 3}, {'name': '教育', 'count': 1}, {'name': '金融', 'count': 1},
+        ])
+        self.assertEqual(data['facets']['education'][0], {'name': '本科', 'count': 3})
+
+    def test_facets_follow_filters(self):
+        data = self.get('/api/job_postings/', {'facets': 'location,skills', 'industry': '互联网'}).json()
+        self.assertEqual([item['name'] for item in data['facets']['location']], ['北京', '北京朝阳区', '杭州'])
+        self.assertEqual(data['facets']['skills'][0], {'name': 'MySQL', 'count': 2})
+
+    def test_facet_limit(self):
+        data = self.get('/api/job_postings/', {'facets': 'industry', 'facet_limit': 1}).json()
+        self.assertEqual(data['facets']['industry'], [{'name': '互联网', 'count': 3}])
+
+    def test_empty_result(self):
+        data = self.get('/api/job_postings/', {'facets': 'industry', 'skills_all': 'Rust'}).json()
+        self.assertEqual(data['facets'], {'industry': []})
+
+    def test_unpaginated(self):
+        # 异步接口的查询在测试请求所在的线程中执行，使用测试事务中的数据
+        with mock.patch.object(JobPostingPagination, 'page_size', None), \
+                mock.patch('job_app.async_views.in_thread', sync_to_async):
+            self.assertEqual(len(self.get('/api/job_postings/').json()), len(POSTINGS))
+            for url in ('/api/job_postings/', '/api/async/job_postings/'):
+                data = self.get(url, {'facets': 'industry', 'facet_limit': 1}).json()
+                self.assertEqual(len(data['results']), len(POSTINGS))
+                self.assertEqual(data['facets'], {'industry': [{'name': '互联网', 'count': 3}]})
+
+    def test_invalid_facets(self):
+        self.get('/api/job_postings/', {'facets': 'salary'}, status=400)
+        self.get('/api/job_postings/', {'facets': 'industry', 'facet_limit': '0'}, status=400)
+
+
+class LoadJobsTests(JobPostingAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def load(self, name, content):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        stdout, stderr = StringIO(), StringIO()
+        call_command('load_jobs', path, workers=0, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_csv_upsert_and_skip(self):
+        header = ','.join(FIELDS)
+        stdout, stderr = self.load('jobs.csv', '\n'.join([
+            header,
+            '1,高级Python工程师,字节跳动,北京,5-10年,本科,30-50K,民营,10000人以上,互联网,"Python, Go"',
+            '6,运维工程师,美团,北京,3-5年,本科,20-30k,上市公司,10000人以上,互联网,"Linux, Docker"',
+            'abc,无效记录,某公司,北京,不限,不限,面议,民营,20-99人,互联网,',
+        ]))
+        self.assertIn('跳过 1 条无效记录', stdout)
+        self.assertIn('无效的ID', stderr)
+
+        # 已存在的记录被覆盖，新记录被插入，其他记录不受影响
+        self.assertEqual(JobPosting.objects.count(), 6)
+        self.assertEqual(JobPosting.objects.get(pk=1).job_title, '高级Python工程师')
+        self.assertEqual(JobPosting.objects.get(pk=2).job_title, 'Java工程师')
+        self.assertEqual(NormalizedPosting.objects.get(posting_id=1).salary_avg, 40000)
+        self.assertEqual(NormalizedPosting.objects.get(posting_id=6).salary_min, 20000)
+        self.assertEqual(self.ids({'skills_all': 'docker'}), [6])
+        self.assertEqual(self.ids({'skills_all': 'python'}), [1, 3])
+        # 覆盖后原有的技能关联被替换
+        self.assertEqual(self.ids({'skills_all': 'django'}), [])
+
+    def test_read_errors(self):
+        with self.assertRaisesMessage(CommandError, '读取'):
+            call_command('load_jobs', os.path.join(self.tmp_dir, 'missing.csv'), workers=0, stdout=StringIO())
+        path = os.path.join(self.tmp_dir, 'jobs.jsonl')
+        with open(path, 'wb') as f:
+            f.write(b'{"id": 1}\n\xff\xfe\n')
+        with self.assertRaisesMessage(CommandError, '读取'):
+            call_command('load_jobs', path, workers=0, stdout=StringIO())
+
+    def test_backfill_missing(self):
+        # bulk_create不发送post_save信号，与直接写入job_postings表相同，没有规范化数据
+        JobPosting.objects.bulk_create([JobPosting(**dict(zip(FIELDS, (
+            8, '测试工程师', '腾讯', '深圳', '3-5年', '本科', '20-30k', '上市公司', '10000人以上', '互联网', 'Selenium',
+        ))))])
+        self.assertEqual(self.ids({'min_salary': '16000'}), [3])
+        stdout = StringIO()
+        call_command('backfill_postings', missing=True, stdout=stdout)
+        self.assertIn('共处理 1 条记录', stdout.getvalue())
+        reset_caches()
+        self.assertEqual(self.ids({'min_salary': '16000'}), [3, 8])
+        self.assertEqual(self.ids({'location': '深圳', 'skills_all': 'selenium'}), [8])
+
+    def test_jsonl(self):
+        lines = [
+            {'id': 7, 'job_title': '算法工程师', 'company_name': '百度', 'location': '北京', 'experience': '3-5年',
+             'education': '硕士', 'salary': '40-60K', 'company_type': '上市公司', 'company_size': '10000人以上',
+             'industry': '互联网', 'skills': ['PyTorch', 'Python']},
+            {'job_title': '缺少ID'},
+        ]
+        content = '\n'.join(json.dumps(line, ensure_ascii=False) for line in lines)
+        # 无效的JSON行与无效的ID一样跳过并计数，不中断导入
+        stdout, stderr = self.load('jobs.jsonl', content + '\n\n{"id": 8,\n[1, 2]\n')
+        self.assertIn('共 1 条记录，跳过 3 条无效记录', stdout)
+        self.assertIn('第4行: 不是有效的JSON', stderr)
+        self.assertIn('第5行: 不是JSON对象', stderr)
+        self.assertEqual(JobPosting.objects.get(pk=7).skills, 'PyTorch, Python')
+        self.assertIsNone(JobPosting.objects.get(pk=7).company_logo)
+        self.assertEqual(self.ids({'skills_any': 'pytorch'}), [7])
+
+
+def true_salary(experience, education, location, industry):
+    """按默认权重计算的薪资"""
+    return (experience_years(experience) * DEFAULT_WEIGHTS['experience'] + DEFAULT_BIAS
+            + DEFAULT_WEIGHTS['education'][education] + DEFAULT_WEIGHTS['location'][location]
+            + DEFAULT_WEIGHTS['industry'][industry])
+
+
+def predict(weights, bias, experience, education, location, industry):
+    salary = experience_years(experience) * weights['experience'] + bias
+    for feature, value in zip(CATEGORICAL_FEATURES, (education, location, industry)):
+        salary += weights[feature].get(value, weights[feature]['其他'])
+    return salary
+
+
+class SyntheticGeneratorTests(SimpleTestCase):
+
+    def test_same_seed_same_data(self):
+        first = generate_postings(500, seed=7)
+        pd.testing.assert_frame_equal(first, generate_postings(500, seed=7))
+        self.assertFalse(first.equals(generate_postings(500, seed=8)))
+        self.assertEqual(list(first.columns), COLUMNS)
+        self.assertEqual(first['id'].tolist(), list(range(1, 501)))
+        # 生成的薪资都能被解析
+        self.assertTrue(all(parse_salary(salary) is not None for salary in first['salary']))
+
+    def test_blocks_do_not_depend_on_count(self):
+        with mock.patch('job_app.synthetic.BLOCK_SIZE', 100):
+            frames = list(generate_frames(250, seed=7, start_id=11))
+            self.assertEqual([len(frame) for frame in frames], [100, 100, 50])
+            self.assertEqual(frames[2]['id'].tolist(), list(range(211, 261)))
+            # 每块使用独立的随机数流，前几块与总数无关
+            pd.testing.assert_frame_equal(frames[0], generate_postings(100, seed=7, start_id=11))
+
+    def test_skew(self):
+        data = generate_postings(2000, seed=7, location_skew=2.0)
+        self.assertEqual(data['location'].value_counts().index[0], LOCATIONS[0])
+
+    def test_command_output_is_deterministic(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            contents = []
+            for name in ('a.csv', 'b.csv'):
+                path = os.path.join(tmp_dir, name)
+                call_command('generate_jobs', 300, seed=3, output=path, stdout=StringIO())
+                with open(path, encoding='utf-8') as f:
+                    contents.append(f.read())
+            self.assertEqual(contents[0], contents[1])
+            self.assertEqual(len(contents[0].splitlines()), 301)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+class LinearSalaryTrainerTests(SimpleTestCase):
+
+    def setUp(self):
+        # 按默认权重生成的无噪声样本（每种组合一条）
+        self.rows = [
+            (experience, education, location, industry)
+            for experience in ('1年', '3年', '5-10年')
+            for education in DEFAULT_WEIGHTS['education']
+            for location in DEFAULT_WEIGHTS['location']
+            for industry in DEFAULT_WEIGHTS['industry']
+        ]
+        self.salaries = [true_salary(*row) for row in self.rows]
+        # 先验为全0的权重
+        self.zero_weights = {'experience': 0, **{feature: {'其他': 0} for feature in CATEGORICAL_FEATURES}}
+
+    def fit(self, trainer, rows, salaries):
+        trainer.partial_fit(*zip(*rows), salaries)
+        return trainer
+
+    def test_recovers_generating_weights(self):
+        trainer = self.fit(
+            LinearSalaryTrainer(self.zero_weights, 0, ridge=1e-3, extra_categories={
+                feature: list(DEFAULT_WEIGHTS[feature]) for feature in CATEGORICAL_FEATURES
+            }),
+            self.rows, self.salaries,
+        )
+        weights, bias = trainer.solve()
+        self.assertEqual(trainer.count, len(self.rows))
+        # 独热编码与偏差项共线，各项权重不唯一，但预测值与生成数据的权重相同
+        for row, salary in zip(self.rows, self.salaries):
+            self.assertAlmostEqual(predict(weights, bias, *row), salary, delta=1)
+        self.assertAlmostEqual(weights['experience'], DEFAULT_WEIGHTS['experience'], delta=1)
+
+    def test_chunks_match_single_pass(self):
+        single = self.fit(LinearSalaryTrainer(DEFAULT_WEIGHTS, DEFAULT_BIAS), self.rows, self.salaries)
+        chunked = LinearSalaryTrainer(DEFAULT_WEIGHTS, DEFAULT_BIAS)
+        for start in range(0, len(self.rows), 7):
+            self.fit(chunked, self.rows[start:start + 7], self.salaries[start:start + 7])
+        np.testing.assert_allclose(chunked.xtx, single.xtx)
+        np.testing.assert_allclose(chunked.xty, single.xty)
+        self.assertEqual(chunked.solve(), single.solve())
+
+    def test_restore_statistics(self):
+        half = len(self.rows) // 2
+        first = self.fit(LinearSalaryTrainer(DEFAULT_WEIGHTS, DEFAULT_BIAS), self.rows[:half], self.salaries[:half])
+        # 恢复统计量后继续累加，与一次累加全部数据的结果相同；新增的类别列按名称对齐
+        resumed = LinearSalaryTrainer(DEFAULT_WEIGHTS, DEFAULT_BIAS, extra_categories={'location': ['成都']})
+        resumed.restore(first.statistics())
+        self.fit(resumed, self.rows[half:], self.salaries[half:])
+        full = self.fit(
+            LinearSalaryTrainer(DEFAULT_WEIGHTS, DEFAULT_BIAS, extra_categories={'location': ['成都']}),
+            self.rows, self.salaries,
+        )
+        self.assertEqual(resumed.count, len(self.rows))
+        self.assertEqual(resumed.solve(), full.solve())
+
+    def test_prior_stays_fixed(self):
+        half = len(self.rows) // 2
+        first = self.fit(LinearSalaryTrainer(self.zero_weights, 0), self.rows[:half], self.salaries[:half])
+        # 增量训练时当前权重已变化，恢复保存的先验后与使用原先验一次训练全部数据的结果相同
+        resumed = LinearSalaryTrainer(*first.solve(), extra_categories={'location': ['成都']})
+        resumed.restore(first.statistics())
+        resumed.restore_prior(first.statistics())
+        self.fit(resumed, self.rows[half:], self.salaries[half:])
+        full = self.fit(
+            LinearSalaryTrainer(self.zero_weights, 0, extra_categories={'location': ['成都']}), self.rows, self.salaries,
+        )
+        self.assertEqual(resumed.solve(), full.solve())
+
+    def test_unknown_categories_use_other(self):
+        trainer = self.fit(LinearSalaryTrainer(DEFAULT_WEIGHTS, DEFAULT_BIAS), [('3年', '高中', '成都', '农业')], [6000])
+        column = trainer.columns
+        self.assertEqual(trainer.xtx[column['education']['其他'], column['location']['其他']], 1)
+
+
+class ForestArtifactTests(SimpleTestCase):
+
+    def setUp(self):
+        from sklearn.ensemble import RandomForestRegressor
+
+        self.root = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        self.X = rng.integers(0, 5, size=(60, 6))
+        self.estimator = RandomForestRegressor(n_estimators=5, random_state=0).fit(self.X, rng.normal(15000, 3000, 60))
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def export(self, version, save_estimator):
+        path = os.path.join(self.root, version)
+        os.makedirs(path)
+        export_forest(self.estimator, {}, None, path, save_estimator=save_estimator)
+        return path
+
+    def test_flat_forest_matches_estimator(self):
+        forest, _, _ = load_flat_forest(self.export('1', save_estimator=False))
+        np.testing.assert_allclose(forest.predict(self.X), self.estimator.predict(self.X))
+
+    def test_estimator_kept_only_for_current_version(self):
+        self.assertFalse(os.path.exists(os.path.join(self.export('1', save_estimator=False), ESTIMATOR_FILE)))
+        old = self.export('2', save_estimator=True)
+        current = self.export('3', save_estimator=True)
+        remove_estimators(self.root, keep='3')
+        self.assertFalse(os.path.exists(os.path.join(old, ESTIMATOR_FILE)))
+        self.assertTrue(os.path.exists(os.path.join(current, ESTIMATOR_FILE)))
+
+
+class SimpleModelMixin:
+    """使用默认权重、不添加随机波动的简化版模型（单例，测试结束后恢复原来的状态）"""
+
+    def setUp(self):
+        super().setUp()
+        self.model = get_simple_model()
+        self.saved = (self.model._state, self.model.version, self.model.is_trained, self.model.noise_mode)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.artifact_dir = override_settings(SALARY_MODEL_ARTIFACT_DIR=self.tmp_dir)
+        self.artifact_dir.enable()
+        self.model.update_weights(DEFAULT_WEIGHTS, DEFAULT_BIAS)
+        self.model.version, self.model.is_trained, self.model.noise_mode = None, True, 'off'
+
+    def tearDown(self):
+        self.artifact_dir.disable()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        state, version, self.model.is_trained, self.model.noise_mode = self.saved
+        self.model._swap(state, version)
+        super().tearDown()
+
+
+class BatchPredictionTests(SimpleModelMixin, TestCase):
+
+    JOBS = [
+        {'experience': '3-5年', 'education': '本科', 'location': '北京', 'industry': '互联网'},
+        {'experience': '应届生', 'education': '博士', 'location': '成都', 'industry': '医疗'},
+        {'location': '上海'},
+    ]
+
+    def post(self, data, status=200):
+        response = APIClient().post('/api/job_postings/predict_salary_batch/', data, format='json')
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def test_results_follow_input_order(self):
+        data = self.post(self.JOBS)
+        self.assertEqual(data['count'], 3)
+        # 缺失的字段使用默认值（未知取值计入'其他'，经验按3年计算）
+        self.assertEqual([row['predicted_salary'] for row in data['results']], [42000, 33000, 33000])
+        self.assertEqual(data['results'][0]['min_salary'], 37800)
+
+        # 与逐条调用预测接口的结果相同
+        for job, row in zip(self.JOBS, data['results']):
+            single = APIClient().post('/api/job_postings/predict_salary/', job, format='json').json()
+            self.assertEqual(single['predicted_salary'], row['predicted_salary'])
+
+        reversed_data = self.post({'jobs': self.JOBS[::-1]})
+        self.assertEqual(reversed_data['results'], data['results'][::-1])
+
+    def test_limit_setting(self):
+        with override_settings(SALARY_PREDICTION_BATCH_LIMIT=2):
+            self.assertIn('2', self.post(self.JOBS, status=400)['error'])
+            self.assertEqual(self.post(self.JOBS[:2])['count'], 2)
+
+    def test_invalid_body(self):
+        self.post({'jobs': 'abc'}, status=400)
+        self.post([1, 2], status=400)
+        self.assertEqual(self.post([])['results'], [])
+
+
+class CompiledPredictorTests(SimpleModelMixin, SimpleTestCase):
+
+    INPUTS = [
+        ('3-5年', '本科', '北京', '互联网'),
+        (' 应届生 ', '博士', '成都', '医疗'),
+        ('10年以上', '硕士', '深圳', '金融'),
+        ('1年以下', 'Unknown', 'Unknown', 'Unknown'),
+        (5, '大专', '杭州', '教育'),
+    ]
+
+    def reference(self, experience, education, location, industry):
+        """逐个字段查字典计算的参考结果"""
+        row = {'experience': experience, 'education': education, 'location': location, 'industry': industry}
+        return max(3000, int(self.model._calculate_salary(row)))
+
+    def test_matches_reference(self):
+        weights = json.loads(json.dumps(DEFAULT_WEIGHTS))
+        weights['location']['成都'] = 6500
+        for weights, bias in ((DEFAULT_WEIGHTS, DEFAULT_BIAS), (weights, -2000)):
+            self.model.update_weights(weights, bias)
+            for inputs in self.INPUTS:
+                normalized = self.model.normalize_inputs(*inputs)
+                self.assertEqual(self.model.predict_salary(*inputs), self.reference(*normalized), inputs)
+            batch = self.model.predict_salary_batch(*zip(*self.INPUTS))
+            self.assertEqual(batch.tolist(), [self.model.predict_salary(*inputs) for inputs in self.INPUTS])
+
+    def test_seeded_noise(self):
+        self.model.noise_mode = 'seeded'
+        first = [self.model.predict_salary(*inputs) for inputs in self.INPUTS]
+        self.assertEqual([self.model.predict_salary(*inputs) for inputs in self.INPUTS], first)
+        self.assertEqual(self.model.predict_salary_batch(*zip(*self.INPUTS)).tolist(), first)
+        # 首尾空白不影响随机种子
+        self.assertEqual(self.model.predict_salary('3-5年 ', '本科', ' 北京', '互联网'), first[0])
+        self.assertNotEqual(first[0], self.reference(*self.INPUTS[0]))
+
+    def test_random_noise(self):
+        self.model.noise_mode = 'random'
+        with mock.patch('job_app.simple_ml_model.np.random.normal', return_value=1234.0):
+            self.assertEqual(self.model.predict_salary(*self.INPUTS[0]), self.reference(*self.INPUTS[0]) + 1234)
+
+    def test_lru_cache(self):
+        state = self.model._state
+        for _ in range(3):
+            self.model.predict_salary(*self.INPUTS[0])
+        info = state.base_salary.cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 1))
+        self.assertEqual(info.maxsize, self.model.cache_size)
+
+        # 更新权重后整体替换缓存，不会返回旧权重的结果
+        weights = json.loads(json.dumps(DEFAULT_WEIGHTS))
+        weights['location']['北京'] += 1000
+        self.model.update_weights(weights, DEFAULT_BIAS)
+        self.assertEqual(self.model.predict_salary(*self.INPUTS[0]), 43000)
+        self.assertEqual(self.model._state.base_salary.cache_info().misses, 1)
+
+
+class DummyModel(VersionedModel):
+    """测试用的模型，版本目录中的state.txt即为模型状态"""
+    artifact_name = 'dummy'
+
+    def __init__(self):
+        self._init_versioning()
+        self._state = None
+        # 训练开始时设置trained，设置release后训练结束
+        self.trained = threading.Event()
+        self.release = threading.Event()
+
+    def _load_version(self, version):
+        with open(os.path.join(version_path(self.artifact_name, version), 'state.txt'), encoding='utf-8') as f:
+            return f.read()
+
+    def train(self):
+        self.trained.set()
+        self.release.wait(5)
+
+
+def write_state(content):
+    def write(path):
+        with open(os.path.join(path, 'state.txt'), 'w', encoding='utf-8') as f:
+            f.write(content)
+    return write
+
+
+@override_settings(SALARY_MODEL_KEEP_VERSIONS=2, SALARY_MODEL_CHECK_INTERVAL=0)
+class ModelRegistryTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.artifact_dir = override_settings(SALARY_MODEL_ARTIFACT_DIR=self.tmp_dir)
+        self.artifact_dir.enable()
+
+    def tearDown(self):
+        self.artifact_dir.disable()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_publish_switches_current(self):
+        self.assertIsNone(current_version('dummy'))
+        versions = [publish('dummy', write_state(f'v{i}')) for i in range(3)]
+        self.assertEqual(current_version('dummy'), versions[-1])
+        # 只保留最近的两个版本
+        self.assertEqual(sorted(os.listdir(os.path.join(self.tmp_dir, 'dummy'))), versions[1:] + ['CURRENT'])
+
+    def test_failed_write_keeps_current(self):
+        version = publish('dummy', write_state('v1'))
+
+        def fail(path):
+            write_state('v2')(path)
+            raise OSError('磁盘已满')
+
+        with self.assertRaises(OSError):
+            publish('dummy', fail)
+        self.assertEqual(current_version('dummy'), version)
+        # 写了一半的临时目录被删除
+        self.assertEqual(sorted(os.listdir(os.path.join(self.tmp_dir, 'dummy'))), [version, 'CURRENT'])
+
+    def test_hot_swap_in_background(self):
+        model = DummyModel()
+        model.load_version(publish('dummy', write_state('v1')))
+        self.assertEqual(model._state, 'v1')
+
+        version = publish('dummy', write_state('v2'))
+        model.check_for_update()
+        for _ in range(500):
+            if model.version == version:
+                break
+            time.sleep(0.01)
+        self.assertEqual((model.version, model._state), (version, 'v2'))
+
+    def test_single_training_task(self):
+        model = DummyModel()
+        self.assertTrue(model.train_in_background())
+        model.trained.wait(5)
+        self.assertTrue(model.is_training)
+        self.assertFalse(model.train_in_background())
+        model.release.set()
+        for _ in range(500):
+            if not model.is_training:
+                break
+            time.sleep(0.01)
+        self.assertFalse(model.is_training)
+
+    def test_abstract_load_version(self):
+        class Incomplete(VersionedModel):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+async def collect(chunks):
+    return b''.join([chunk async for chunk in chunks])
+
+
+class AsyncViewTests(SimpleModelMixin, JobPostingAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        # 异步接口的查询在测试请求所在的线程中执行，使用测试事务中的数据
+        patcher = mock.patch('job_app.async_views.in_thread', sync_to_async)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertSameResponse(self, path, params=None, **headers):
+        sync = self.client.get(f'/api/job_postings/{path}', params or {}, **headers)
+        reset_caches()
+        async_response = self.client.get(f'/api/async/job_postings/{path}', params or {}, **headers)
+        self.assertEqual(async_response.status_code, sync.status_code)
+        self.assertEqual(async_response['Content-Type'], sync['Content-Type'])
+        if sync.streaming:
+            # 异步视图的流式响应由异步迭代器产生
+            self.assertEqual(async_to_sync(collect)(async_response.streaming_content), b''.join(sync.streaming_content))
+        else:
+            self.assertEqual(async_response.content, sync.content)
+        return sync
+
+    def test_detail(self):
+        self.assertEqual(self.assertSameResponse('3/').json()['job_title'], '数据分析师')
+        self.assertSameResponse('3/', {'fields': 'id,salary_avg'})
+        self.assertSameResponse('999/')
+        self.assertSameResponse('abc/')
+
+    def test_all_data(self):
+        self.assertSameResponse('all_data/', {'industry': '互联网'})
+        self.assertSameResponse('all_data/', {'format': 'ndjson', 'fields': 'id,job_title'})
+        self.assertSameResponse('all_data/', {'format': 'columnar'})
+
+    def test_list(self):
+        sync = self.get('/api/job_postings/', {'page_size': 2, 'location': '北京'}).json()
+        data = self.get('/api/async/job_postings/', {'page_size': 2, 'location': '北京'}).json()
+        # 分页链接包含请求路径，其余内容相同
+        self.assertEqual({**data, 'next': None}, {**sync, 'next': None})
+        self.get('/api/async/job_postings/', {'pagination': 'cursor', 'ordering': 'company'}, status=400)
+
+    def test_predict_salary(self):
+        job = {'experience': '3-5年', 'education': '本科', 'location': '北京', 'industry': '互联网'}
+        sync = APIClient().post('/api/job_postings/predict_salary/', job, format='json')
+        response = APIClient().post('/api/async/job_postings/predict_salary/', job, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), sync.json())
+        self.assertEqual(response.json()['predicted_salary'], 42000)
+        self.assertEqual(self.client.get('/api/async/job_postings/predict_salary/').status_code, 405)
+
+    def test_predict_overloaded(self):
+        executor = mock.Mock()
+        executor.run = mock.AsyncMock(side_effect=Overloaded)
+        with mock.patch('job_app.async_views.get_inference_executor', return_value=executor):
+            response = APIClient().post('/api/async/job_postings/predict_salary/', {}, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.json()['success'])
+
+
+class WarmupTests(SimpleTestCase):
+
+    def test_warm_up_marks_ready(self):
+        saved = warmup._ready.is_set()
+        warmup._ready.clear()
+        try:
+            self.assertEqual(APIClient().get('/api/job_postings/ready/').status_code, 503)
+            with override_settings(SALARY_MODEL_WARMUP_FOREST=False):
+                warmup.warm_up()
+            self.assertTrue(warmup.is_ready())
+            response = APIClient().get('/api/job_postings/ready/')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('simple', response.json()['models'])
+        finally:
+            if not saved:
+                warmup._ready.clear()
+
+    def test_post_fork_respects_forest_flag(self):
+        saved = SalaryPredictionModel._instance
+        SalaryPredictionModel._instance = None
+        try:
+            with override_settings(SALARY_MODEL_WARMUP_FOREST=False):
+                warmup.reset_after_fork()
+            # 关闭随机森林预热时工作进程启动不加载随机森林
+            self.assertIsNone(SalaryPredictionModel._instance)
+        finally:
+            SalaryPredictionModel._instance = saved
+
+    def test_no_training_by_default(self):
+        model = mock.Mock(model=None)
+        with mock.patch.object(SalaryPredictionModel, 'get_instance', return_value=model):
+            get_model()
+        model.train_in_background.assert_not_called()
+
+
+class FeatureCacheTests(JobPostingAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = override_settings(SALARY_FEATURE_CACHE_DIR=self.tmp_dir)
+        self.cache_dir.enable()
+
+    def tearDown(self):
+        self.cache_dir.disable()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def load(self):
+        """读取训练特征，返回(特征, 是否查询了职位数据)"""
+        with mock.patch('job_app.features.iterate_posting_frames', wraps=iterate_posting_frames) as frames:
+            features = load_features()
+        return features, frames.called
+
+    def test_cache_hit_and_invalidation(self):
+        features, queried = self.load()
+        self.assertTrue(queried)
+        # 面议的职位没有平均月薪，不参与训练
+        self.assertEqual(features.ids.tolist(), [1, 2, 3, 5])
+
+        cached, queried = self.load()
+        self.assertFalse(queried)
+        self.assertEqual(cached.ids.tolist(), features.ids.tolist())
+        np.testing.assert_array_equal(cached.codes, features.codes)
+
+        # 绕过ORM插入的记录不会递增数据版本号，但会改变表指纹
+        values = (6, '运维工程师', '美团', '北京', '3-5年', '本科', '20-30k', '上市公司', '10000人以上', '互联网', 'Linux')
+        columns = [JobPosting._meta.get_field(field).column for field in FIELDS]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {JobPosting._meta.db_table} ({", ".join(columns)}) '
+                f'VALUES ({", ".join(["%s"] * len(values))})',
+                values,
+            )
+        features, queried = self.load()
+        self.assertTrue(queried)
+        self.assertEqual(features.ids.tolist(), [1, 2, 3, 5, 6])
+        self.assertEqual(len(os.listdir(self.tmp_dir)), 1)
+
+        bump_data_version()
+        reset_caches()
+        self.assertTrue(self.load()[1])
+
+
+def flatten_weights(weights, bias):
+    values = {'bias': bias, 'experience': weights['experience']}
+    for feature in CATEGORICAL_FEATURES:
+        values.update({f'{feature}:{category}': value for category, value in weights[feature].items()})
+    return values
+
+
+class TrainFromDatabaseTests(JobPostingAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        # 简化版模型是单例，测试结束后恢复原来的状态
+        self.model = get_simple_model()
+        self.saved = (self.model._state, self.model.version, self.model.is_trained)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.artifact_dir = override_settings(SALARY_MODEL_ARTIFACT_DIR=self.tmp_dir)
+        self.artifact_dir.enable()
+        self.model.update_weights(DEFAULT_WEIGHTS, DEFAULT_BIAS)
+        self.model.version = None
+
+    def tearDown(self):
+        self.artifact_dir.disable()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        state, version, self.model.is_trained = self.saved
+        self.model._swap(state, version)
+
+    def train(self, **kwargs):
+        return train_from_database(self.model, min_rows=1, min_support=1000, **kwargs)
+
+    def assertSameWeights(self, first, second):
+        first, second = flatten_weights(*first), flatten_weights(*second)
+        self.assertEqual(first.keys(), second.keys())
+        for name, value in first.items():
+            self.assertAlmostEqual(value, second[name], delta=0.011, msg=name)
+
+    def test_incremental_matches_full(self):
+        # 面议的职位没有平均月薪，不参与训练
+        self.assertEqual(self.train(), (TRAINED, 4))
+        first_version = self.model.version
+
+        create_posting(6, '运维工程师', '美团', '北京', '3-5年', '本科', '20-30k', '上市公司', '10000人以上', '互联网', 'Linux')
+        create_posting(7, '会计', '某事务所', '成都', '1-3年', '大专', '6-8k', '民营', '20-99人', '金融', 'Excel')
+        self.assertEqual(self.train(), (TRAINED, 6))
+        self.assertNotEqual(self.model.version, first_version)
+        stats = load_training_stats(self.model)
+        self.assertEqual((stats['high_water_mark'], stats['incremental_updates']), (7, 1))
+        incremental = (self.model.weights, self.model.bias)
+
+        # 没有新入库的职位时保留当前版本
+        version = self.model.version
+        self.assertEqual(self.train(), (NO_NEW_ROWS, 6))
+        self.assertEqual(self.model.version, version)
+
+        # 先验权重保持不变，完整训练的结果与增量训练相同
+        self.assertEqual(self.train(full=True), (TRAINED, 6))
+        self.assertEqual(load_training_stats(self.model)['incremental_updates'], 0)
+        self.assertSameWeights((self.model.weights, self.model.bias), incremental)
+
+    def test_insufficient_rows(self):
+        outcome = train_from_database(self.model, min_rows=100, min_support=1000)
+        self.assertEqual(outcome, (INSUFFICIENT_ROWS, 4))
+        self.assertIsNone(self.model.version)
+
+    def test_script_reports_outcome(self):
+        from . import train_model
+
+        messages = {
+            TRAINED: '已使用数据库中的 6 条职位数据训练模型',
+            NO_NEW_ROWS: '没有新入库的职位，未重新训练',
+            INSUFFICIENT_ROWS: '改用模拟数据训练',
+        }
+        for outcome, message in messages.items():
+            stdout = StringIO()
+            with mock.patch.object(train_model, 'train_from_database', return_value=(outcome, 6)), \
+                    mock.patch.object(train_model, 'get_simple_model', return_value=mock.MagicMock()) as model, \
+                    mock.patch('sys.argv', ['train_model.py']), redirect_stdout(stdout):
+                train_model.main()
+            self.assertIn(message, stdout.getvalue())
+            self.assertEqual(model.return_value.train.called, outcome == INSUFFICIENT_ROWS)
+
+    def test_category_counts_are_incremental(self):
+        self.train()
+        stats = load_training_stats(self.model)
+        self.assertEqual(stats['category_counts']['industry:互联网'], 3)
+        self.assertEqual(stats['category_high_water_mark'], 5)
+
+        # 增量训练只对新入库的职位分组计数
+        create_posting(6, '运维工程师', '美团', '北京', '3-5年', '本科', '20-30k', '上市公司', '10000人以上', '互联网', 'Linux')
+        with mock.patch('job_app.trainers.count_categories', wraps=count_categories) as count:
+            self.train()
+        self.assertEqual(count.call_args.args[1], 5)
+        stats = load_training_stats(self.model)
+        self.assertEqual(stats['category_counts']['industry:互联网'], 4)
+        self.assertEqual(stats['category_high_water_mark'], 6)
+
+        # 完整训练重新统计全表，结果相同
+        self.train(full=True)
+        self.assertEqual(load_training_stats(self.model)['category_counts'], stats['category_counts'])
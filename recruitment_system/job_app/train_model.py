@@ -4,6 +4,7 @@
 薪资预测模型训练脚本
 用于训练和保存机器学习模型，以便系统启动时可以直接加载使用
 """
+import argparse
 import os
 import sys
 
@@ -13,23 +14,46 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'recruitment_system.settings')
 import django
 django.setup()
 
+from job_app.ml_model import SalaryPredictionModel
 from job_app.simple_ml_model import get_simple_model
+from job_app.trainers import DEFAULT_CHUNK_SIZE, DEFAULT_MIN_ROWS, NO_NEW_ROWS, TRAINED, train_from_database
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='训练薪资预测模型')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='每次从数据库读取的记录数')
+    parser.add_argument('--sample', action='store_true', help='使用模拟数据训练，不读取数据库')
+    parser.add_argument('--forest', action='store_true', help='同时训练随机森林模型')
+    parser.add_argument('--full', action='store_true', help='完整训练（默认只使用上次训练之后入库的职位增量训练；增量训练按职位ID判断新数据，原地修改的已有职位需要完整训练才会生效）')
+    return parser.parse_args()
 
 
 def main():
     """主函数，训练并保存薪资预测模型"""
+    args = parse_args()
     print("===== 开始训练薪资预测模型 =====")
     
     try:
         # 获取模型实例（这会自动加载已训练的模型或训练新模型）
         model = get_simple_model()
         
-        # 训练模型
-        model.train()
-        
+        # 训练模型：优先使用数据库中的职位数据，数据不足时使用模拟数据
+        if args.sample:
+            print("使用模拟数据训练模型")
+            model.train()
+        else:
+            outcome, rows = train_from_database(model, chunk_size=args.chunk_size, full=args.full)
+            if outcome == TRAINED:
+                print(f"已使用数据库中的 {rows} 条职位数据训练模型，发布为版本 {model.version}")
+            elif outcome == NO_NEW_ROWS:
+                print(f"没有新入库的职位，未重新训练，继续使用版本 {model.version}（已累计 {rows} 条职位数据）")
+            else:
+                print(f"数据库中可用于训练的职位只有 {rows} 条（少于 {DEFAULT_MIN_ROWS} 条），改用模拟数据训练")
+                model.train()
+
         # 获取模型信息
         model_info = model.get_model_info()
-        print("\n模型训练成功！")
         print("\n模型信息:")
         print(f"- 模型类型: {model_info['model_type']}")
         print(f"- 是否已训练: {'是' if model_info['is_trained'] else '否'}")
@@ -46,6 +70,12 @@ def main():
         print(f"\n测试预测结果:")
         print(f"- 测试职位信息: 经验={experience}年, 学历={education}, 地点={location}, 行业={industry}")
         print(f"- 预测薪资: {predicted_salary} 元")
+
+        # 训练随机森林模型并发布新版本，服务进程会在后台自动切换到新版本
+        if args.forest:
+            forest_model = SalaryPredictionModel.get_instance()
+            if forest_model.train(full=args.full):
+                print(f"\n随机森林模型已发布为版本 {forest_model.version}")
             
     except Exception as e:
         print(f"训练模型时发生错误: {e}")
@@ -0,0 +1,279 @@
+"""
+简化版薪资模型的流式训练
+分块读取数据库中的职位数据，只累加充分统计量XᵀX、Xᵀy，最后以闭式解一次求出全部权重，
+内存占用只与特征数有关，与数据行数无关
+统计量、岭回归的先验权重、类别取值的出现次数和已训练到的最大职位ID随模型版本一起保存，
+下一次训练只需读取新入库的职位（ID大于上次的最大职位ID）；
+先验权重在第一次训练时确定后保持不变，增量训练与在全部数据上完整训练的结果相同。
+增量训练按职位ID划分新旧数据，原地修改的已有职位（ID不变）不会被增量训练读取，需要完整训练
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .model_registry import version_path
+from .models import JobPosting, NormalizedPosting
+from .simple_ml_model import CATEGORICAL_FEATURES, TRAINING_STATS_FILE, experience_years
+
+# 岭回归系数：把权重拉向先验（第一次训练前的权重），同时消除类别独热编码与偏差项之间的共线性
+DEFAULT_RIDGE = 1.0
+
+# 数据库中出现次数不少于该值的类别取值会成为新的类别
+DEFAULT_MIN_SUPPORT = 30
+
+# 每次从数据库读取的记录数
+DEFAULT_CHUNK_SIZE = 5000
+
+# 参与训练的记录数少于该值时不更新权重
+DEFAULT_MIN_ROWS = 50
+
+# train_from_database的训练结果
+TRAINED = 'trained'  # 已训练并发布新版本
+NO_NEW_ROWS = 'no_new_rows'  # 增量训练没有新入库的职位，保留当前版本
+INSUFFICIENT_ROWS = 'insufficient_rows'  # 记录数少于min_rows，保留原有权重
+
+
+class LinearSalaryTrainer:
+    """
+    线性薪资模型训练器
+    特征：[经验年数, 偏差项, 学历独热编码..., 城市独热编码..., 行业独热编码...]，未知类别计入'其他'
+    """
+
+    def __init__(self, weights, bias, ridge=DEFAULT_RIDGE, extra_categories=None):
+        self.ridge = ridge
+
+        # 特征列：先验权重中已有的类别在前，数据中新出现的类别在后
+        self.columns = {}
+        self.names = ['experience', 'bias']
+        self.prior = [float(weights['experience']), float(bias)]
+        offset = 2
+        for feature in CATEGORICAL_FEATURES:
+            categories = list(weights[feature].keys())
+            if '其他' not in categories:
+                categories.append('其他')
+            for category in (extra_categories or {}).get(feature, []):
+                if category not in categories:
+                    categories.append(category)
+            self.columns[feature] = {category: offset + i for i, category in enumerate(categories)}
+            self.names.extend(f'{feature}:{category}' for category in categories)
+            # 新类别以'其他'的权重作为先验
+            other = weights[feature].get('其他', 0)
+            self.prior.extend(float(weights[feature].get(category, other)) for category in categories)
+            offset += len(categories)
+
+        self.prior = np.array(self.prior)
+        self.xtx = np.zeros((offset, offset))
+        self.xty = np.zeros(offset)
+        self.count = 0
+
+    def restore(self, stats):
+        """
+        累加之前保存的统计量，按特征列名称对齐
+        新增的类别列在旧数据中全为0（旧数据中这些取值计入了'其他'，定期完整训练可以修正）
+        """
+        index = {name: i for i, name in enumerate(self.names)}
+        positions = np.array([index[name] for name in stats['columns']])
+        self.xtx[np.ix_(positions, positions)] += stats['xtx']
+        self.xty[positions] += stats['xty']
+        self.count += int(stats['count'])
+
+    def restore_prior(self, stats):
+        """
+        使用之前保存的先验权重（按特征列名称对齐），新增的类别列使用所属特征'其他'列的先验
+        不随每次训练改为当前权重，否则增量训练的岭回归目标会逐次漂移
+        """
+        if 'prior' not in stats:
+            return
+        saved = dict(zip(stats['columns'].tolist(), stats['prior'].tolist()))
+        for i, name in enumerate(self.names):
+            feature = name.split(':', 1)[0]
+            self.prior[i] = saved.get(name, saved.get(f'{feature}:其他', self.prior[i]))
+
+    def statistics(self):
+        """当前累加的统计量和先验权重，保存后可通过restore、restore_prior恢复"""
+        return {
+            'columns': np.array(self.names),
+            'xtx': self.xtx,
+            'xty': self.xty,
+            'count': np.array(self.count),
+            'prior': self.prior,
+        }
+
+    def _column_indices(self, values, feature):
+        """将类别取值转换为特征列编号"""
+        columns = self.columns[feature]
+        values = pd.Series(values, dtype=object).astype(str).str.strip()
+        return values.map(columns).fillna(columns['其他']).to_numpy(dtype=int)
+
+    def partial_fit(self, experiences, educations, locations, industries, salaries):
+        """累加一批数据的充分统计量"""
+        salaries = np.asarray(salaries, dtype=float)
+        n = len(salaries)
+        if n == 0:
+            return
+
+        codes, uniques = pd.factorize(pd.Series(experiences, dtype=object).astype(str).str.strip())
+        years = np.array([experience_years(value) for value in uniques], dtype=float)[codes]
+
+        X = np.zeros((n, len(self.prior)))
+        X[:, 0] = years
+        X[:, 1] = 1.0
+        rows = np.arange(n)
+        for feature, values in zip(CATEGORICAL_FEATURES, (educations, locations, industries)):
+            X[rows, self._column_indices(values, feature)] = 1.0
+
+        self.xtx += X.T @ X
+        self.xty += X.T @ salaries
+        self.count += n
+
+    def solve(self):
+        """以闭式解求出权重，返回(weights, bias)"""
+        # 岭回归：(XᵀX + λI)θ = Xᵀy + λθ₀
+        identity = np.eye(len(self.prior))
+        theta = np.linalg.solve(self.xtx + self.ridge * identity, self.xty + self.ridge * self.prior)
+
+        weights = {'experience': round(float(theta[0]), 2)}
+        for feature in CATEGORICAL_FEATURES:
+            weights[feature] = {
+                category: round(float(theta[column]), 2) for category, column in self.columns[feature].items()
+            }
+        return weights, round(float(theta[1]), 2)
+
+
+def count_categories(counts=None, after_id=None):
+    """
+    通过分组计数统计职位中各类别取值的出现次数，累加到counts（{'特征:取值': 次数}）上
+    after_id不为None时只统计ID大于该值的职位（按主键范围查询，不扫描全表）
+    返回(累加后的次数, 已统计到的最大职位ID)
+    """
+    counts = dict(counts or {})
+    queryset = JobPosting.objects.order_by()
+    if after_id is not None:
+        queryset = queryset.filter(pk__gt=after_id)
+    # 先确定统计范围的上界，分组计数期间新入库的职位留给下一次统计
+    max_id = queryset.aggregate(max_id=Max('pk'))['max_id']
+    if max_id is None:
+        return counts, after_id
+    queryset = queryset.filter(pk__lte=max_id)
+    for feature in CATEGORICAL_FEATURES:
+        for row in queryset.values(feature).annotate(count=Count('pk')):
+            value = (row[feature] or '').strip()
+            if value:
+                key = f'{feature}:{value}'
+                counts[key] = counts.get(key, 0) + row['count']
+    return counts, max_id
+
+
+def frequent_categories(counts, min_support=DEFAULT_MIN_SUPPORT):
+    """从类别取值的出现次数中找出出现次数足够多的取值"""
+    categories = {feature: [] for feature in CATEGORICAL_FEATURES}
+    for key, count in counts.items():
+        feature, value = key.split(':', 1)
+        if count >= min_support:
+            categories[feature].append(value)
+    return {feature: sorted(values) for feature, values in categories.items()}
+
+
+def iterate_training_chunks(chunk_size=DEFAULT_CHUNK_SIZE, after_id=None):
+    """
+    按主键分块读取有平均月薪的职位，每块返回(职位ID, 经验, 学历, 城市, 行业, 平均月薪)六个数组
+    after_id：只读取ID大于该值的职位
+    """
+    fields = ['posting__experience', 'posting__education', 'posting__location', 'posting__industry', 'salary_avg']
+    queryset = NormalizedPosting.objects.filter(salary_avg__isnull=False).order_by('pk')
+    last_pk = after_id
+    while True:
+        chunk_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk_queryset.values_list('pk', *fields)[:chunk_size])
+        if not rows:
+            return
+        yield tuple(np.array(column, dtype=object) for column in zip(*rows))
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][0]
+
+
+def load_training_stats(model):
+    """读取模型当前版本保存的统计量和训练元数据，没有时返回None"""
+    if not model.version:
+        return None
+    path = os.path.join(version_path(model.artifact_name, model.version), TRAINING_STATS_FILE)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        stats = {name: data[name] for name in data.files}
+    stats['high_water_mark'] = int(stats['high_water_mark'])
+    stats['incremental_updates'] = int(stats['incremental_updates'])
+    if 'category_counts' in stats:
+        stats['category_counts'] = dict(zip(stats['category_names'].tolist(), stats['category_counts'].tolist()))
+        stats['category_high_water_mark'] = int(stats['category_high_water_mark'])
+    return stats
+
+
+def train_from_database(model, chunk_size=DEFAULT_CHUNK_SIZE, ridge=DEFAULT_RIDGE,
+                        min_support=DEFAULT_MIN_SUPPORT, min_rows=DEFAULT_MIN_ROWS, full=False):
+    """
+    使用数据库中的职位数据训练简化版模型并发布新版本，返回(训练结果, 记录总数)
+    训练结果为TRAINED、NO_NEW_ROWS或INSUFFICIENT_ROWS，记录总数包括从保存的统计量中恢复的记录
+    默认增量训练：恢复上一版本保存的统计量和类别取值的出现次数，只读取ID大于上次最大职位ID的职位；
+    ID不变的原地修改不会被增量训练读取，需要完整训练；
+    full为True、没有保存的统计量或增量训练次数达到SALARY_MODEL_FULL_REBUILD_EVERY时完整训练
+    完整训练和增量训练都使用上一版本保存的先验权重，没有保存的先验时以当前权重作为先验
+    记录数少于min_rows时不更新权重
+    """
+    previous = load_training_stats(model)
+    stats = None if full else previous
+    if stats is not None and stats['incremental_updates'] >= getattr(settings, 'SALARY_MODEL_FULL_REBUILD_EVERY', 10):
+        print("增量训练次数已达上限，执行完整训练")
+        stats = None
+
+    # 增量训练只统计上次统计之后入库的职位，旧版本没有保存出现次数时统计全表
+    if stats is not None and 'category_counts' in stats:
+        category_counts, category_mark = count_categories(stats['category_counts'], stats['category_high_water_mark'])
+    else:
+        category_counts, category_mark = count_categories()
+
+    trainer = LinearSalaryTrainer(
+        model.weights, model.bias, ridge=ridge, extra_categories=frequent_categories(category_counts, min_support)
+    )
+    if previous is not None:
+        trainer.restore_prior(previous)
+    high_water_mark = None
+    incremental_updates = 0
+    if stats is not None:
+        trainer.restore(stats)
+        high_water_mark = stats['high_water_mark']
+        incremental_updates = stats['incremental_updates'] + 1
+        print(f"增量训练：已有 {trainer.count} 条记录的统计量，读取职位ID > {high_water_mark} 的数据")
+
+    restored = trainer.count
+    for ids, experiences, educations, locations, industries, salaries in iterate_training_chunks(
+        chunk_size, after_id=high_water_mark
+    ):
+        trainer.partial_fit(experiences, educations, locations, industries, salaries)
+        high_water_mark = int(ids[-1])
+        print(f"已累加 {trainer.count} 条记录")
+
+    if trainer.count < min_rows:
+        print(f"可用于训练的记录数不足（{trainer.count} < {min_rows}），保留原有权重")
+        return INSUFFICIENT_ROWS, trainer.count
+    if stats is not None and trainer.count == restored:
+        print("没有新入库的职位，保留当前版本")
+        return NO_NEW_ROWS, trainer.count
+
+    model.update_weights(*trainer.solve())
+    model.is_trained = True
+    training_stats = trainer.statistics()
+    training_stats['high_water_mark'] = np.array(high_water_mark)
+    training_stats['incremental_updates'] = np.array(incremental_updates)
+    training_stats['category_names'] = np.array(list(category_counts), dtype=str)
+    training_stats['category_counts'] = np.array(list(category_counts.values()), dtype=np.int64)
+    training_stats['category_high_water_mark'] = np.array(category_mark or 0)
+    model.save_model(
+        training_stats=training_stats,
+        metadata={'high_water_mark': high_water_mark, 'rows': trainer.count, 'incremental_updates': incremental_updates},
+    )
+    return TRAINED, trainer.count
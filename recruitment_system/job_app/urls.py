@@ -1,10 +1,17 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
-from .views import JobPostingViewSet
+from . import async_views
+from .views import JobPostingViewSet, metrics
 
 router = DefaultRouter()
 router.register(r'job_postings', JobPostingViewSet)
 
 urlpatterns = [
+    path('metrics', metrics, name='metrics'),  # Prometheus指标
+    # 异步（ASGI）接口，输出与同名的同步接口相同
+    path('async/job_postings/', async_views.job_list, name='async-jobposting-list'),
+    path('async/job_postings/all_data/', async_views.job_all_data, name='async-jobposting-all-data'),
+    path('async/job_postings/predict_salary/', async_views.predict_salary, name='async-jobposting-predict-salary'),
+    re_path(r'^async/job_postings/(?P<pk>[^/.]+)/$', async_views.job_detail, name='async-jobposting-detail'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+数据版本
+job_postings的数据发生变化（入库、规范化、删除）时递增版本号，版本号保存在数据库中，
+所有工作进程共享；查询缓存、分页总数缓存等把版本号作为缓存键的一部分，版本变化后旧缓存自然失效
+"""
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .models import DataVersion
+
+# 招聘信息数据的版本名称
+JOB_POSTINGS = 'job_postings'
+
+# 进程内缓存的版本号及读取时间
+_local = {'version': None, 'checked_at': 0.0}
+_lock = threading.Lock()
+
+# 当前线程（数据库连接）中已登记、尚未执行的版本号递增回调，只保存弱引用
+_pending = threading.local()
+
+
+def get_data_version():
+    """获取当前数据版本号，进程内最多每隔JOB_DATA_VERSION_CHECK_INTERVAL秒查询一次数据库"""
+    interval = getattr(settings, 'JOB_DATA_VERSION_CHECK_INTERVAL', 1)
+    now = time.monotonic()
+    if _local['version'] is not None and now - _local['checked_at'] < interval:
+        return _local['version']
+
+    version = DataVersion.objects.filter(name=JOB_POSTINGS).values_list('version', flat=True).first() or 0
+    with _lock:
+        _local['version'], _local['checked_at'] = version, now
+    return version
+
+
+def bump_data_version():
+    """递增数据版本号"""
+    updated = DataVersion.objects.filter(name=JOB_POSTINGS).update(version=F('version') + 1)
+    if not updated:
+        DataVersion.objects.get_or_create(name=JOB_POSTINGS, defaults={'version': 1})
+    with _lock:
+        _local['version'] = None
+
+
+def schedule_bump():
+    """
+    在当前事务提交后递增数据版本号，同一事务中多次调用只登记一次回调
+    事务提交时回调执行并清除登记；事务或保存点回滚时Django丢弃回调而不执行，弱引用随之失效，之后的调用重新登记
+    """
+    pending = getattr(_pending, 'callback', None)
+    if pending is not None and pending() is not None:
+        return
+
+    def callback():
+        _pending.callback = None
+        bump_data_version()
+
+    _pending.callback = weakref.ref(callback)
+    transaction.on_commit(callback)
@@ -1,79 +1,286 @@
+from django.conf import settings
+from django.http import HttpResponse
 from rest_framework import viewsets
 from .models import JobPosting
 from .serializers import JobPostingSerializer
-import re
-from django.db.models import Q
 from rest_framework import viewsets, decorators, response
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from .cache import cached_response, result_cache
+from .columnar import encode_columnar
+from .facets import FACET_LIMIT_PARAM, FACETS_PARAM, compute_facets, parse_facets
+from .fieldsets import available_fields, narrow_queryset, parse_fieldset
+from .filters import filter_job_postings
+from .metrics import phase, render_metrics
+from .pagination import JobPostingCursorPagination, JobPostingPagination
+from .read_plan import ReadPlan, read_plan
+from .renderers import COLUMNAR_RENDERERS, FastJSONRenderer, NDJSONRenderer
 from .simple_ml_model import get_simple_model
+from .stats import compute_stats, parse_bins, parse_limit
+from .streaming import plan_chunks, serialized_chunks, stream_ndjson
+from .warmup import is_ready, model_versions
+
+def format_salary(salary):
+    """格式化为友好的薪资表示"""
+    if salary >= 10000:
+        return f"{salary/10000:.1f}万"
+    else:
+        return f"{salary/1000:.0f}k"
+
+
+def format_prediction(predicted_salary):
+    """生成薪资预测结果，包括预测值及其上下浮动10%的薪资范围"""
+    min_salary = int(predicted_salary * 0.9)  # 预测薪资范围的下限（90%）
+    max_salary = int(predicted_salary * 1.1)  # 预测薪资范围的上限（110%）
+    return {
+        'predicted_salary': predicted_salary,
+        'salary_range': f"{format_salary(min_salary)}-{format_salary(max_salary)}",
+        'min_salary': min_salary,
+        'max_salary': max_salary
+    }
+
+
+# 薪资预测使用的字段，缺失时使用默认值
+PREDICTION_FIELDS = ['experience', 'education', 'location', 'company_type', 'company_size', 'industry']
+
+
+def predict_job_salary(request):
+    """根据请求中的职位信息预测薪资，返回(响应数据, 状态码)"""
+    try:
+        # 获取请求数据
+        job_info = request.data
+        
+        # 验证必要的字段
+        for field in PREDICTION_FIELDS:
+            if field not in job_info or not job_info[field]:
+                job_info[field] = 'Unknown'  # 使用默认值
+        
+        # 获取简化模型实例
+        model = get_simple_model()
+        
+        # 进行薪资预测
+        # 从job_info字典中提取各个字段作为单独参数
+        predicted_salary = model.predict_salary(
+            job_info['experience'],
+            job_info['education'],
+            job_info['location'],
+            job_info['industry']
+        )
+        
+        if predicted_salary is not None:
+            # 格式化预测结果
+            return {
+                'success': True,
+                **format_prediction(predicted_salary)
+            }, 200
+        else:
+            return {
+                'success': False,
+                'error': '无法进行薪资预测，模型可能未正确初始化'
+            }, 500
+            
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }, 500
+
+
+# 使用orjson渲染JSON的接口（输出只包含整数和字符串）
+FAST_JSON_ACTIONS = ('list', 'retrieve', 'all_data')
+
+# 支持稀疏字段集（?fields= / ?exclude=）的接口
+FIELDSET_ACTIONS = ('list', 'retrieve', 'all_data')
+
 
 class JobPostingViewSet(viewsets.ReadOnlyModelViewSet):
     """招聘信息的只读视图集"""
-    queryset = JobPosting.objects.all()
+    queryset = JobPosting.objects.select_related('normalized').order_by('id')
     serializer_class = JobPostingSerializer
+    pagination_class = JobPostingPagination
+    # 游标分页（?pagination=cursor 或携带cursor参数时使用）
+    cursor_pagination_class = JobPostingCursorPagination
+
+    @property
+    def paginator(self):
+        """根据请求参数选择页码分页或游标分页"""
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action in FAST_JSON_ACTIONS:
+            renderers = [FastJSONRenderer() if type(renderer) is JSONRenderer else renderer for renderer in renderers]
+        return renderers
+
+    def get_fieldset(self):
+        """请求的稀疏字段集（字段名元组），未指定fields/exclude参数时返回None"""
+        if self.action not in FIELDSET_ACTIONS:
+            return None
+        if not hasattr(self, '_fieldset'):
+            try:
+                self._fieldset = parse_fieldset(self.request.query_params, available_fields(self.get_serializer_class()))
+            except ValueError as e:
+                raise ParseError(str(e))
+        return self._fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        fieldset = self.get_fieldset()
+        if fieldset is not None:
+            kwargs['fields'] = fieldset
+        return super().get_serializer(*args, **kwargs)
+
+    def get_read_plan(self):
+        """序列化器的字段计划，序列化器包含不支持直接读取的字段时返回None"""
+        return read_plan(self.get_serializer_class(), self.get_fieldset())
     
-    @decorators.action(detail=False, methods=['get'])
+    def get_facets(self):
+        """请求的分面统计（?facets=location,industry），返回(分面名称列表, 每个分面的条目数)"""
+        params = self.request.query_params
+        try:
+            return parse_facets(params.get(FACETS_PARAM)), parse_limit(params.get(FACET_LIMIT_PARAM), FACET_LIMIT_PARAM)
+        except ValueError as e:
+            raise ParseError(str(e))
+    
+    @cached_response('list')
+    def list(self, request, *args, **kwargs):
+        # 分面统计与当前页一起返回
+        facets, facet_limit = self.get_facets()
+
+        # 与ListModelMixin.list相同，分别记录查询和序列化的耗时
+        with phase('query'):
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+        plan = self.get_read_plan()
+        with phase('serialize'):
+            if plan is None:
+                data = self.get_serializer(queryset if page is None else page, many=True).data
+            elif page is None:
+                data = plan.serialize(queryset)
+            else:
+                # 分页结果已是模型对象，直接按字段计划读取属性
+                data = plan.serialize_instances(page)
+        if page is None:
+            if not facets:
+                return response.Response(data)
+            # 不分页时结果列表放在results中，与分页响应相同，以便附带分面统计
+            data = {'results': data}
+        else:
+            data = self.get_paginated_response(data).data
+        if facets:
+            with phase('facets'):
+                data['facets'] = compute_facets(queryset, facets, facet_limit)
+        return response.Response(data)
+
+    @cached_response('retrieve')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @decorators.action(detail=False, methods=['get'],
+                       renderer_classes=api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer] + COLUMNAR_RENDERERS)
+    @cached_response('all_data', skip_formats=(NDJSONRenderer.format,))
     def all_data(self, request):
         """获取所有职位数据（不分页）"""
         # 调用get_queryset方法来应用相同的过滤逻辑
         queryset = self.get_queryset()
+        # 字段计划：直接读取values_list元组，不实例化模型对象
+        plan = self.get_read_plan()
+        # 流式输出模式（?format=ndjson 或 Accept: application/x-ndjson）：分块查询并逐块序列化
+        if isinstance(request.accepted_renderer, NDJSONRenderer):
+            if plan is None:
+                return stream_ndjson(serialized_chunks(queryset, lambda chunk: self.get_serializer(chunk, many=True).data))
+            return stream_ndjson(plan_chunks(queryset, plan))
+        # 列式输出模式（?format=columnar 或 ?format=msgpack）：按列输出，低基数字段字典编码
+        if type(request.accepted_renderer) in COLUMNAR_RENDERERS:
+            with phase('serialize'):
+                data = encode_columnar(queryset, plan or ReadPlan(self.get_serializer()))
+            return response.Response(data)
         # 序列化数据
-        serializer = self.get_serializer(queryset, many=True)
+        with phase('serialize'):
+            data = self.get_serializer(queryset, many=True).data if plan is None else plan.serialize(queryset)
         # 返回未分页的数据
-        return response.Response(serializer.data)
+        return response.Response(data)
+    
+    @decorators.action(detail=False, methods=['get'])
+    def stats(self, request):
+        """获取数据分析所需的统计分布（薪资、学历、行业、经验、技能）"""
+        try:
+            # 薪资分段边界，如 salary_bins=0,5000,10000,20000
+            bins = parse_bins(request.query_params.get('salary_bins', None))
+            limit = parse_limit(request.query_params.get('limit', None))
+        except ValueError as e:
+            return response.Response({
+                'success': False,
+                'error': str(e)
+            }, status=400)
+
+        # 与列表接口使用相同的过滤条件
+        queryset = self.get_queryset()
+        return response.Response(compute_stats(queryset, bins, limit))
+    
+    @decorators.action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        """获取查询结果缓存的命中统计"""
+        return response.Response(result_cache.stats())
+    
+    @decorators.action(detail=False, methods=['get'])
+    def ready(self, request):
+        """就绪检查：进程已加载薪资预测模型时返回200，否则返回503"""
+        return response.Response({
+            'ready': is_ready(),
+            'models': model_versions()
+        }, status=200 if is_ready() else 503)
     
     @decorators.action(detail=False, methods=['post'])
     def predict_salary(self, request):
         """根据职位信息预测薪资"""
+        data, status = predict_job_salary(request)
+        return response.Response(data, status=status)
+        
+    @decorators.action(detail=False, methods=['post'])
+    def predict_salary_batch(self, request):
+        """批量预测薪资，请求体为职位信息列表（或{"jobs": [...]}），结果按输入顺序返回"""
+        jobs = request.data.get('jobs') if isinstance(request.data, dict) else request.data
+        if not isinstance(jobs, list) or not all(isinstance(job, dict) for job in jobs):
+            return response.Response({
+                'success': False,
+                'error': '请求体必须是职位信息对象的列表'
+            }, status=400)
+
+        limit = getattr(settings, 'SALARY_PREDICTION_BATCH_LIMIT', 1000)
+        if len(jobs) > limit:
+            return response.Response({
+                'success': False,
+                'error': f'单次最多预测{limit}条职位信息'
+            }, status=400)
+
         try:
-            # 获取请求数据
-            job_info = request.data
-            
-            # 验证必要的字段
-            required_fields = ['experience', 'education', 'location', 'company_type', 'company_size', 'industry']
-            for field in required_fields:
-                if field not in job_info or not job_info[field]:
-                    job_info[field] = 'Unknown'  # 使用默认值
-            
-            # 获取简化模型实例
+            # 缺失的字段使用默认值
+            columns = {
+                field: [job.get(field) or 'Unknown' for job in jobs]
+                for field in PREDICTION_FIELDS
+            }
+
+            # 一次向量化计算完成所有预测
             model = get_simple_model()
-            
-            # 进行薪资预测
-            # 从job_info字典中提取各个字段作为单独参数
-            predicted_salary = model.predict_salary(
-                job_info['experience'],
-                job_info['education'],
-                job_info['location'],
-                job_info['industry']
+            predicted = model.predict_salary_batch(
+                columns['experience'],
+                columns['education'],
+                columns['location'],
+                columns['industry']
             )
-            
-            if predicted_salary is not None:
-                # 格式化预测结果
-                min_salary = int(predicted_salary * 0.9)  # 预测薪资范围的下限（90%）
-                max_salary = int(predicted_salary * 1.1)  # 预测薪资范围的上限（110%）
-                
-                # 格式化为友好的薪资表示
-                def format_salary(salary):
-                    if salary >= 10000:
-                        return f"{salary/10000:.1f}万"
-                    else:
-                        return f"{salary/1000:.0f}k"
-                
-                formatted_min = format_salary(min_salary)
-                formatted_max = format_salary(max_salary)
-                
-                return response.Response({
-                    'success': True,
-                    'predicted_salary': predicted_salary,
-                    'salary_range': f"{formatted_min}-{formatted_max}",
-                    'min_salary': min_salary,
-                    'max_salary': max_salary
-                })
-            else:
-                return response.Response({
-                    'success': False,
-                    'error': '无法进行薪资预测，模型可能未正确初始化'
-                }, status=500)
-                
+
+            return response.Response({
+                'success': True,
+                'count': len(jobs),
+                'results': [format_prediction(int(salary)) for salary in predicted]
+            })
         except Exception as e:
             return response.Response({
                 'success': False,
@@ -81,94 +288,16 @@ class JobPostingViewSet(viewsets.ReadOnlyModelViewSet):
             }, status=500)
         
     def get_queryset(self):
-        # 可以在这里添加过滤逻辑
         queryset = super().get_queryset()
-        
-        # 构建Q对象用于复杂查询
-        q_objects = Q()
-        
-        # 按职位名称搜索
-        job_title = self.request.query_params.get('job_title', None)
-        if job_title:
-            q_objects &= Q(job_title__icontains=job_title)
-        
-        # 按公司名称搜索
-        company_name = self.request.query_params.get('company_name', None)
-        if company_name:
-            q_objects &= Q(company_name__icontains=company_name)
-        
-        # 按地点搜索
-        location = self.request.query_params.get('location', None)
-        if location:
-            q_objects &= Q(location__icontains=location)
-        
-        # 按技能搜索
-        skills = self.request.query_params.get('skills', None)
-        if skills:
-            q_objects &= Q(skills__icontains=skills)
-            
-        # 按学历要求搜索
-        education = self.request.query_params.get('education', None)
-        if education:
-            q_objects &= Q(education__icontains=education)
-            
-        # 按行业搜索
-        industry = self.request.query_params.get('industry', None)
-        if industry:
-            q_objects &= Q(industry__icontains=industry)
-            
-        # 应用所有过滤条件
-        if q_objects:
-            queryset = queryset.filter(q_objects)
-            
-        # 按最低薪资搜索（单独处理，因为需要特殊逻辑解析薪资字符串）
-        min_salary = self.request.query_params.get('min_salary', None)
-        if min_salary:
-            try:
-                min_salary = float(min_salary)
-                
-                # 从已过滤的queryset中获取所有职位
-                valid_job_ids = []
-                
-                # 优化查询：只获取必要的字段
-                for job in queryset.values('id', 'salary'):
-                    # 尝试从薪资字符串中提取数值
-                    salary_str = job['salary'] or ''
-                    # 改进正则表达式，支持更多薪资格式
-                    # 提取所有可能的薪资数值，如'15k-25k', '15000-25000', '15000元/月', '25k'等
-                    salary_matches = re.findall(r'(\d+(?:\.\d+)?)\s*[kK]?', salary_str)
-                    
-                    if salary_matches:
-                        try:
-                            # 使用最低薪资数值作为比较依据
-                            min_salary_value = float('inf')
-                            
-                            for match in salary_matches:
-                                salary_value = float(match)
-                                # 如果薪资包含'k'或'K'，则乘以1000
-                                if 'k' in salary_str.lower():
-                                    salary_value *= 1000
-                                # 如果薪资包含'万'，则乘以10000
-                                elif '万' in salary_str:
-                                    salary_value *= 10000
-                                
-                                if salary_value < min_salary_value:
-                                    min_salary_value = salary_value
-                            
-                            # 保留薪资大于等于最低薪资的职位
-                            if min_salary_value <= float('inf') and min_salary_value >= min_salary:
-                                valid_job_ids.append(job['id'])
-                        except ValueError:
-                            pass
-                
-                # 过滤出符合条件的职位
-                if valid_job_ids:
-                    queryset = queryset.filter(id__in=valid_job_ids)
-                else:
-                    # 如果没有符合条件的职位，返回空查询集
-                    queryset = queryset.none()
-            except ValueError:
-                # 如果min_salary不是有效的数字，则忽略该过滤条件
-                pass
-                
-        return queryset
+        # 稀疏字段集：只查询输出字段对应的列
+        fieldset = self.get_fieldset()
+        if fieldset is not None:
+            sources = available_fields(self.get_serializer_class())
+            queryset = narrow_queryset(queryset, [sources[name] for name in fieldset])
+        # 应用查询参数中的过滤条件
+        return filter_job_postings(queryset, self.request.query_params)
+
+
+def metrics(request):
+    """Prometheus指标：各接口的请求耗时、各阶段耗时和SQL查询的直方图（当前进程）"""
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,62 @@
+"""
+进程启动时的预热
+在wsgi/asgi入口加载薪资预测模型并执行一次预测，使第一个请求不必承担加载开销。
+预热只加载已发布的模型，从不启动训练：gunicorn开启preload_app时预热在主进程中执行，
+在这里启动的训练线程会留在主进程中，工作进程还会继承可能正被持有的训练锁
+"""
+import threading
+
+from django.conf import settings
+
+from .ml_model import SalaryPredictionModel, get_model
+from .simple_ml_model import get_simple_model
+
+# 预热使用的职位信息
+WARMUP_JOB = {'experience': '3-5年', 'education': '本科', 'location': '北京', 'industry': '互联网'}
+
+_ready = threading.Event()
+
+
+def warm_up():
+    """加载模型并执行一次预测，完成后进程进入就绪状态"""
+    try:
+        simple_model = get_simple_model()
+        simple_model.predict_salary(
+            WARMUP_JOB['experience'], WARMUP_JOB['education'], WARMUP_JOB['location'], WARMUP_JOB['industry']
+        )
+        if getattr(settings, 'SALARY_MODEL_WARMUP_FOREST', True):
+            # 没有已发布的模型时使用基于规则的预测
+            get_model(train_if_missing=False).predict_salary(WARMUP_JOB)
+        _ready.set()
+        print("薪资预测模型预热完成")
+    except Exception as e:
+        print(f"薪资预测模型预热失败: {e}")
+
+
+def reset_after_fork():
+    """
+    在fork出的工作进程中调用（gunicorn的post_fork）：重置从主进程继承的模型锁并重新检查模型版本
+    SALARY_MODEL_WARMUP_FOREST关闭时不在这里加载随机森林，只重置主进程中已经创建的实例
+    """
+    models = [get_simple_model()]
+    if getattr(settings, 'SALARY_MODEL_WARMUP_FOREST', True) or SalaryPredictionModel._instance is not None:
+        models.append(get_model(train_if_missing=False))
+    for model in models:
+        model.reset_after_fork()
+
+
+def is_ready():
+    """进程是否已完成预热"""
+    return _ready.is_set()
+
+
+def model_versions():
+    """各模型当前使用的版本号"""
+    versions = {'simple': get_simple_model().version}
+    if getattr(settings, 'SALARY_MODEL_WARMUP_FOREST', True):
+        forest_model = get_model(train_if_missing=False)
+        versions['forest'] = forest_model.version
+        versions['forest_training'] = forest_model.is_training
+        # 当前版本在本进程中的加载耗时和内存占用
+        versions['forest_load_stats'] = getattr(forest_model.model, 'load_stats', None)
+    return versions
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'recruitment_system.settings')
 
 application = get_asgi_application()
+
+# 进程启动时加载薪资预测模型，避免第一个请求承担加载开销
+from job_app.warmup import warm_up  # noqa: E402
+
+warm_up()
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'job_app.metrics.ServerTimingMiddleware',  # 各阶段耗时（Server-Timing响应头）和Prometheus指标，放在最前面以覆盖完整的请求
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -156,6 +157,47 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20  # 设置合理的分页大小，实现分页功能
 }
 
+# 缓存配置
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # 招聘信息查询结果缓存（LRU淘汰，超过MAX_ENTRIES条时淘汰最久未使用的缓存）
+    # 多进程部署时可改用文件缓存：'django.core.cache.backends.filebased.FileBasedCache'，LOCATION设为缓存目录
+    'job_results': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'job-results',
+        'TIMEOUT': 300,  # 缓存过期时间（秒）
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
+    },
+}
+
+# 招聘信息接口配置
+JOB_RESULT_CACHE_ALIAS = 'job_results'  # 查询结果缓存使用的缓存
+JOB_DATA_VERSION_CHECK_INTERVAL = 1  # 每个进程检查数据版本号的最小间隔（秒）
+SALARY_PREDICTION_BATCH_LIMIT = 1000  # 批量薪资预测单次请求的最大条数
+SALARY_PREDICTION_NOISE = 'random'  # 预测结果的随机波动：random（每次随机）、seeded（以输入为种子，结果确定）、off（不添加）
+SALARY_PREDICTION_CACHE_SIZE = 4096  # 预测缓存的最大条目数
+SALARY_MODEL_ARTIFACT_DIR = BASE_DIR / 'job_app' / 'model_artifacts'  # 模型版本文件的保存目录
+SALARY_MODEL_KEEP_VERSIONS = 3  # 每个模型保留的版本数
+SALARY_MODEL_CHECK_INTERVAL = 5  # 每个进程检查模型新版本的最小间隔（秒）
+SALARY_MODEL_TRAIN_IF_MISSING = False  # 没有训练好的随机森林模型时，get_model()是否在调用它的工作进程中后台训练（会与请求处理争抢CPU，多个工作进程同时写模型目录）；默认不训练，由train_model.py或独立的定时任务训练
+SALARY_MODEL_WARMUP_FOREST = True  # 进程启动时是否同时预热随机森林模型
+SALARY_MODEL_MMAP = True  # 随机森林的节点数组以内存映射方式加载，多个工作进程共享同一份页缓存
+SALARY_MODEL_FULL_REBUILD_EVERY = 10  # 连续增量训练达到该次数后，下一次训练自动执行完整训练
+SALARY_MODEL_INCREMENTAL_TREES = 10  # 随机森林每次增量训练新增的决策树数量
+SALARY_MODEL_INCREMENTAL_MIN_ROWS = 10  # 随机森林增量训练至少需要的新增职位数
+SALARY_MODEL_SAVE_ESTIMATOR = True  # 当前版本是否保存完整的随机森林模型（forest.joblib，只在增量训练时加载，旧版本中的会被删除）；关闭后每次都完整训练
+SALARY_FEATURE_CACHE_DIR = SALARY_MODEL_ARTIFACT_DIR / 'feature_cache'  # 训练特征缓存目录（按数据版本号缓存编码后的特征）
+JOB_COUNT_CACHE_TIMEOUT = 300  # 分页总数的缓存时间（秒）
+JOB_COUNT_ESTIMATE_THRESHOLD = 100000  # 估算行数超过该值时，分页总数使用数据库估算值
+JOB_METRICS_ENABLED = True  # 记录请求各阶段耗时和SQL查询，输出Server-Timing响应头和/api/metrics指标
+JOB_ASYNC_QUERY_WORKERS = 16  # 异步接口中执行过滤条件解析、分页总数、分面统计等同步查询的线程数
+SALARY_PREDICTION_WORKERS = 4  # 异步接口中执行薪资预测的线程数
+SALARY_PREDICTION_MAX_PENDING = 64  # 异步接口中正在执行和排队的薪资预测数上限，超过时直接返回503
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
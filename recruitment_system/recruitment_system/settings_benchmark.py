@@ -0,0 +1,37 @@
+"""
+性能基准测试使用的配置
+使用本地SQLite数据库代替MySQL，每种数据量对应BENCHMARK_DATA_DIR下的一个数据库文件；
+关闭查询结果缓存和分页总数缓存，测量的是每次请求实际的查询和序列化开销
+
+使用方式：python manage.py benchmark --settings=recruitment_system.settings_benchmark
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+# DEBUG模式会记录每条SQL，影响耗时和内存的测量结果
+DEBUG = False
+ALLOWED_HOSTS = ['testserver', 'localhost', '127.0.0.1']
+
+BENCHMARK_DATA_DIR = BASE_DIR / 'benchmark_data'  # 基准测试数据库和模型文件的保存目录
+BENCHMARK_SIZES = [10000, 100000, 1000000]  # 默认测试的数据量
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BENCHMARK_DATA_DIR / 'benchmark.sqlite3',
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+    'job_results': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+
+SALARY_MODEL_ARTIFACT_DIR = BENCHMARK_DATA_DIR / 'model_artifacts'
+SALARY_FEATURE_CACHE_DIR = SALARY_MODEL_ARTIFACT_DIR / 'feature_cache'
+SALARY_MODEL_TRAIN_IF_MISSING = False
+SALARY_MODEL_WARMUP_FOREST = False